@@ -3,6 +3,8 @@ import sys
 import os
 import json
 
+from isatools.io.staging import STAGING_MODES
+
 
 def main(argv=None):
     """Run **isatools** from the command line
@@ -18,19 +20,53 @@ def main(argv=None):
                                 )
 
     p.add_argument('-c', dest='cmd', help='isatools API command to run', required=True,
-                   choices=['isatab2json', 'json2isatab', 'sampletab2isatab', 'sampletab2json'])
-    p.add_argument('-i', dest='in_path', help='in  (files or directory will be read from here)', required=True)
+                   choices=['isatab2json', 'json2isatab', 'sampletab2isatab', 'sampletab2json', 'validate'])
+    p.add_argument('-i', dest='in_path', help='in  (files or directory will be read from here)')
     p.add_argument('-o', dest='out_path', help='out (file will be written out here or written to directory if ISA-Tab '
-                                               'archive out)', required=True)
+                                               'archive out; the directory of the outputs in batch mode)',
+                   required=True)
+    p.add_argument('--batch', dest='batch', action='store_true', default=False,
+                   help='run the command on each input found in the -i directory')
+    p.add_argument('--manifest', dest='manifest', help='run the command on each input listed in this file, one '
+                                                       'path per line, optionally followed by a tab and the '
+                                                       'output path')
+    p.add_argument('--jobs', dest='jobs', type=int, default=1,
+                   help='number of inputs to run at the same time in batch mode [default: %(default)s]')
+    p.add_argument('--datafile-staging', dest='datafile_staging', default='copy',
+                   choices=STAGING_MODES,
+                   help='how json2isatab puts data files next to the ISA-Tab [default: %(default)s]')
+    p.add_argument('--summary', dest='summary', help='file to write the JSON summary of a batch run to '
+                                                     '[default: batch_summary.json in the output directory]')
     p.add_argument('--version', action='version', version='isatools {}'.format("0.7"))
     p.add_argument('-v', dest='verbose', help="show more output", action='store_true', default=False)
 
     args = p.parse_args(argv or sys.argv[1:])
+    if args.in_path is None and args.manifest is None:
+        p.error('one of -i or --manifest is required')
 
     if args.verbose:
-        print("{} input: {}".format(os.linesep, args.in_path))
+        print("{} input: {}".format(os.linesep, args.in_path or args.manifest))
         print("output: {}".format(args.out_path))
 
+    if args.batch or args.manifest is not None:
+        from isatools import batch
+        if not os.path.exists(args.out_path):
+            os.makedirs(args.out_path)
+        if args.manifest is not None:
+            with open(args.manifest) as manifest_fp:
+                items = batch.read_manifest(manifest_fp, args.cmd, args.out_path)
+        else:
+            items = batch.find_inputs(args.cmd, args.in_path, args.out_path)
+        summary = batch.run_batch(args.cmd, items, jobs=args.jobs, datafile_staging=args.datafile_staging)
+        with open(args.summary or os.path.join(args.out_path, 'batch_summary.json'), 'w') as out_fp:
+            json.dump(summary, out_fp, indent=4)
+        print("{}: {} ok, {} failed in {:.1f}s".format(args.cmd, summary['ok'], summary['failed'],
+                                                       summary['seconds']))
+        for record in summary['items']:
+            if record['status'] != 'ok':
+                print("{} {}: {}".format(record['status'], record['input'], record['error']))
+        return 1 if summary['failed'] > 0 else 0
+
     if args.cmd == 'isatab2json':
         from isatools.convert import isatab2json
         J = isatab2json.convert(args.in_path)
@@ -40,7 +76,7 @@ def main(argv=None):
     elif args.cmd == 'json2isatab':
         from isatools.convert import json2isatab
         with open(args.in_path) as in_fp:
-            json2isatab.convert(in_fp, args.out_path)
+            json2isatab.convert(in_fp, args.out_path, datafile_staging=args.datafile_staging)
 
     elif args.cmd == 'sampletab2isatab':
         from isatools.convert import sampletab2isatab
@@ -53,5 +89,13 @@ def main(argv=None):
             with open(args.out_path, 'w') as out_fp:
                 sampletab2json.convert(in_fp, out_fp)
 
+    elif args.cmd == 'validate':
+        from isatools import batch
+        try:
+            batch.run_item(args.cmd, args.in_path, args.out_path)
+        except batch.InvalidInputError as e:
+            print(e)
+            return 1
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
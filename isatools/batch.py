@@ -0,0 +1,261 @@
+"""Run isatools conversions and validations over many inputs at once
+
+Converting a mirror of ISA-Tab one command line invocation at a time pays
+for starting Python and importing isatools and its dependencies for every
+input. run_batch() runs the same command over a list of inputs in a pool of
+worker processes, each of which pays for the imports once, and keeps going
+past inputs that fail, recording the status and timing of each.
+
+Example usage:
+
+    >>> from isatools import batch
+    >>> items = batch.find_inputs('isatab2json', '/path/to/mirror', '/path/to/out')
+    >>> summary = batch.run_batch('isatab2json', items, jobs=8)
+    >>> summary['failed']
+"""
+from __future__ import absolute_import
+import glob
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import ZipFile
+
+
+log = logging.getLogger('isatools')
+
+COMMANDS = ('isatab2json', 'json2isatab', 'sampletab2isatab', 'sampletab2json', 'validate')
+
+# whether each command writes a file (True) or a directory (False)
+_OUTPUT_FILE = {
+    'isatab2json': True,
+    'json2isatab': False,
+    'sampletab2isatab': False,
+    'sampletab2json': True,
+    'validate': True
+}
+
+
+class InvalidInputError(Exception):
+    """Raised when an input is not converted because it does not validate"""
+    pass
+
+
+def _isatab_dir(path, tmp_dir):
+    # ISA-Tab inputs are directories or ZIP archives of one
+    if os.path.isdir(path):
+        return path
+    with ZipFile(path) as zip_file:
+        zip_file.extractall(tmp_dir)
+    i_files = glob.glob(os.path.join(tmp_dir, 'i_*.txt')) or glob.glob(os.path.join(tmp_dir, '*', 'i_*.txt'))
+    if len(i_files) != 1:
+        raise ValueError("Could not find an investigation file in {}".format(path))
+    return os.path.dirname(i_files[0])
+
+
+def run_item(cmd, in_path, out_path, datafile_staging='copy'):
+    """Run a command on one input
+
+    :param cmd: One of COMMANDS
+    :param in_path: Path of the input file, or directory or ZIP archive for
+        ISA-Tab inputs
+    :param out_path: Path of the file or directory to write the output to
+    :param datafile_staging: How json2isatab puts the data files next to the
+        ISA-Tab, one of isatools.io.staging.STAGING_MODES
+    :raises InvalidInputError: If the input did not validate, or for
+        validate, if the validation report has errors
+    """
+    if cmd not in COMMANDS:
+        raise ValueError("Unknown command {}, expected one of {}".format(cmd, COMMANDS))
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        if cmd == 'isatab2json':
+            from isatools.convert import isatab2json
+            J = isatab2json.convert(_isatab_dir(in_path, tmp_dir))
+            if J is None:
+                raise InvalidInputError("Could not convert {}, it has validation errors".format(in_path))
+            with open(out_path, 'w') as out_fp:
+                json.dump(J, out_fp)
+
+        elif cmd == 'json2isatab':
+            from isatools.convert import json2isatab
+            with open(in_path) as in_fp:
+                json2isatab.convert(in_fp, out_path, datafile_staging=datafile_staging)
+            if not os.path.exists(os.path.join(out_path, 'i_investigation.txt')):
+                raise InvalidInputError("Could not convert {}, it has validation errors".format(in_path))
+
+        elif cmd == 'sampletab2isatab':
+            from isatools.convert import sampletab2isatab
+            with open(in_path) as in_fp:
+                sampletab2isatab.convert(in_fp, out_path)
+
+        elif cmd == 'sampletab2json':
+            from isatools.convert import sampletab2json
+            with open(in_path) as in_fp:
+                with open(out_path, 'w') as out_fp:
+                    sampletab2json.convert(in_fp, out_fp)
+
+        elif cmd == 'validate':
+            from isatools import validation_server
+            path = in_path
+            if not path.lower().endswith('.json'):
+                path = _isatab_dir(path, tmp_dir)
+            result = validation_server.run_job(validation_server.parse_job({"path": path}))
+            with open(out_path, 'w') as out_fp:
+                json.dump(result['report'], out_fp)
+            if len(result['report']['errors']) > 0:
+                raise InvalidInputError("{} has {} validation errors".format(
+                    in_path, len(result['report']['errors'])))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _run_batch_item(cmd, in_path, out_path, datafile_staging):
+    # run_item() for the worker processes, reporting instead of raising
+    start = time.time()
+    record = {
+        "input": in_path,
+        "output": out_path,
+        "status": "ok"
+    }
+    try:
+        run_item(cmd, in_path, out_path, datafile_staging=datafile_staging)
+    except InvalidInputError as e:
+        record["status"] = "invalid"
+        record["error"] = str(e)
+    except Exception as e:
+        log.debug(traceback.format_exc())
+        record["status"] = "error"
+        record["error"] = "{}: {}".format(type(e).__name__, e)
+    record["seconds"] = round(time.time() - start, 3)
+    return record
+
+
+def output_path(cmd, in_path, out_dir):
+    """Get the path of the output of a command for an input
+
+    :param cmd: One of COMMANDS
+    :param in_path: Path of the input
+    :param out_dir: Directory the outputs are written to
+    :return: The path in out_dir named after the input, with a .json
+        extension for commands writing a file
+    """
+    name, ext = os.path.splitext(os.path.basename(os.path.normpath(in_path)))
+    if ext.lower() not in ('.zip', '.json', '.txt'):
+        name += ext
+    if _OUTPUT_FILE[cmd]:
+        name += '.json'
+    return os.path.join(out_dir, name)
+
+
+def find_inputs(cmd, dirname, out_dir):
+    """Find the inputs of a command in a directory
+
+    For isatab2json, the inputs are the subdirectories with an investigation
+    file and the ZIP archives; for json2isatab, the .json files; for the
+    SampleTab commands, the .txt files; and for validate, any of these but
+    the SampleTab files.
+
+    :param cmd: One of COMMANDS
+    :param dirname: Path of the directory of the inputs
+    :param out_dir: Directory the outputs are to be written to
+    :return: List of (input path, output path) tuples, sorted
+    """
+    if cmd not in COMMANDS:
+        raise ValueError("Unknown command {}, expected one of {}".format(cmd, COMMANDS))
+    items = list()
+    for name in sorted(os.listdir(dirname)):
+        path = os.path.join(dirname, name)
+        lower = name.lower()
+        if os.path.isdir(path):
+            found = cmd in ('isatab2json', 'validate') and len(glob.glob(os.path.join(path, 'i_*.txt'))) > 0
+        elif lower.endswith('.zip'):
+            found = cmd in ('isatab2json', 'validate')
+        elif lower.endswith('.json'):
+            found = cmd in ('json2isatab', 'validate')
+        elif lower.endswith('.txt'):
+            found = cmd in ('sampletab2isatab', 'sampletab2json')
+        else:
+            found = False
+        if found:
+            items.append((path, output_path(cmd, path, out_dir)))
+    return items
+
+
+def read_manifest(fp, cmd, out_dir):
+    """Read the inputs of a command from a manifest file
+
+    Each line of the manifest has the path of an input, and optionally a tab
+    and the path of its output. Relative paths are relative to the directory
+    of the manifest; blank lines and lines starting with # are skipped.
+
+    :param fp: File pointer to the manifest
+    :param cmd: One of COMMANDS
+    :param out_dir: Directory the outputs with no path in the manifest are
+        written to
+    :return: List of (input path, output path) tuples, in manifest order
+    """
+    base_dir = os.path.dirname(os.path.abspath(fp.name)) if hasattr(fp, 'name') else os.curdir
+    items = list()
+    for line in fp:
+        line = line.rstrip('\r\n')
+        if line.strip() == '' or line.startswith('#'):
+            continue
+        fields = line.split('\t')
+        in_path = os.path.join(base_dir, fields[0].strip())
+        if len(fields) > 1 and fields[1].strip() != '':
+            out_path = os.path.join(base_dir, fields[1].strip())
+        else:
+            out_path = output_path(cmd, in_path, out_dir)
+        items.append((in_path, out_path))
+    return items
+
+
+def run_batch(cmd, items, jobs=1, datafile_staging='copy'):
+    """Run a command over a list of inputs
+
+    :param cmd: One of COMMANDS
+    :param items: List of (input path, output path) tuples
+    :param jobs: Number of worker processes; with 1, the inputs are run in
+        this process
+    :param datafile_staging: How json2isatab puts the data files next to the
+        ISA-Tab, one of isatools.io.staging.STAGING_MODES
+    :return: Summary dict of the command, the number of inputs ok and
+        failed, the total seconds, and a record of the status ("ok",
+        "invalid" or "error"), error and seconds of each input, in order
+    """
+    if cmd not in COMMANDS:
+        raise ValueError("Unknown command {}, expected one of {}".format(cmd, COMMANDS))
+    start = time.time()
+    cmds = [cmd] * len(items)
+    in_paths = [item[0] for item in items]
+    out_paths = [item[1] for item in items]
+    stagings = [datafile_staging] * len(items)
+    executor = None
+    if jobs > 1 and len(items) > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        if executor is not None:
+            results = executor.map(_run_batch_item, cmds, in_paths, out_paths, stagings)
+        else:
+            results = map(_run_batch_item, cmds, in_paths, out_paths, stagings)
+        records = list()
+        for record in results:
+            log.info("%s %s (%.1fs)", record["status"], record["input"], record["seconds"])
+            records.append(record)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    ok = len([r for r in records if r["status"] == "ok"])
+    return {
+        "command": cmd,
+        "jobs": jobs,
+        "ok": ok,
+        "failed": len(records) - ok,
+        "seconds": round(time.time() - start, 3),
+        "items": records
+    }
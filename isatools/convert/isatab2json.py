@@ -2,16 +2,18 @@ import json
 import os
 from os.path import join
 from isatools.io.isatab_parser import parse
-from jsonschema import RefResolver, Draft4Validator
 from uuid import uuid4
 from enum import Enum
 import re
 import glob
 import logging
+import shutil
+import tempfile
+import weakref
 
 
 from isatools import isatab
-from isatools.isajson import ISAJSONEncoder
+from isatools.isajson import ISAJSONEncoder, get_schema_validator
 
 
 log = logging.getLogger('isatools')
@@ -56,6 +58,116 @@ def convert(work_dir, identifier_type=IdentifierType.name,
         return converter.convert(work_dir)
 
 
+class _StreamingISAJSONEncoder(ISAJSONEncoder):
+    """ISA-JSON encoder for objects that do not all exist at the same time
+
+    The ISAJSONEncoder derives @ids from id(), which CPython reuses once an
+    object is freed, so the objects of an assay written and dropped early
+    could share @ids with the objects of the next one. This encoder numbers
+    the objects instead, and keeps a weak reference to each to tell when a
+    number belongs to an object since freed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        ISAJSONEncoder.__init__(self, *args, **kwargs)
+        self._ids = dict()  # id(o) -> (identifier, weak reference to o)
+        self._next_id = 0
+
+    def object_id(self, o):
+        try:
+            o_id, ref = self._ids[id(o)]
+            if ref() is o:
+                return o_id
+        except KeyError:
+            pass
+        self._next_id += 1
+        o_id = str(self._next_id)
+        self._ids[id(o)] = (o_id, weakref.ref(o, self._forget(id(o), o_id)))
+        return o_id
+
+    def _forget(self, key, o_id):
+        def callback(_):
+            if self._ids.get(key, (None,))[0] == o_id:
+                del self._ids[key]
+        return callback
+
+
+def _dump_open_object(d, fp, key, encoder):
+    # write a dict as JSON, leaving it open with an array at key last
+    s = encoder.encode(d)
+    fp.write(s[:-1])
+    fp.write('{}"{}": ['.format(', ' if len(d) > 0 else '', key))
+
+
+def stream_convert(work_dir, out_fp, validate_first=True, config_dir=isatab.default_config_dir):
+    """Convert ISA-Tab to ISA-JSON, writing it out one table at a time
+
+    Unlike convert(), the ISA model is never built whole: each study table is
+    loaded, then each of its assay tables, whose JSON is written out before
+    the next assay is loaded. Only the objects of the study (the samples,
+    protocols and factors the assays refer to) are kept for the whole study.
+
+    :param work_dir: Path of the ISA-Tab directory
+    :param out_fp: File-like object to write the ISA-JSON to
+    :param validate_first: Whether to validate the ISA-Tab first, and not
+        convert it if there are errors
+    :param config_dir: Path of the configurations to validate against
+    :return: True if the ISA-JSON was written, False otherwise
+    """
+    i_files = glob.glob(os.path.join(work_dir, 'i_*.txt'))
+    if len(i_files) != 1:
+        log.fatal("Could not resolve input investigation file, please check input ISA tab directory")
+        return False
+    if validate_first:
+        log.info("Validating input ISA tab before conversion")
+        with open(i_files[0], 'r', encoding='utf-8') as validate_fp:
+            report = isatab.validate(fp=validate_fp, config_dir=config_dir,
+                                     log_level=logging.ERROR)
+            if len(report['errors']) > 0:
+                log.fatal("Could not proceed with conversion as there are some fatal validation errors. Check log")
+                return False
+    log.info("Loading ISA-Tab investigation: %s", i_files[0])
+    with open(i_files[0], 'r', encoding='utf-8') as fp:
+        investigation = isatab.load(fp, skip_load_tables=True)
+    studies = investigation.studies
+    investigation.studies = []
+    encoder = _StreamingISAJSONEncoder()
+    investigation_json = encoder.default(investigation)
+    del investigation_json['studies']
+    _dump_open_object(investigation_json, out_fp, 'studies', encoder)
+    for i, study in enumerate(studies):
+        if i > 0:
+            out_fp.write(', ')
+        protocol_map = dict((protocol.name, protocol) for protocol in study.protocols)
+        log.info("Loading study table: %s", study.filename)
+        isatab.load_study_table(study, os.path.join(work_dir, study.filename),
+                                investigation.ontology_source_references, protocol_map)
+        assays = study.assays
+        study.assays = []
+        # the assays are written to a spool first, since loading them may
+        # add an unknown protocol to the study protocols that precede them
+        with tempfile.SpooledTemporaryFile(max_size=1 << 24, mode='w+', encoding='utf-8') as spool:
+            while len(assays) > 0:
+                assay = assays.pop(0)
+                log.info("Loading assay table: %s", assay.filename)
+                isatab.load_assay_table(assay, study, os.path.join(work_dir, assay.filename),
+                                        investigation.ontology_source_references, protocol_map)
+                if spool.tell() > 0:
+                    spool.write(', ')
+                spool.write(encoder.encode(encoder.default(assay)))
+                del assay
+            study_json = encoder.default(study)
+            del study_json['assays']
+            _dump_open_object(study_json, out_fp, 'assays', encoder)
+            spool.seek(0)
+            shutil.copyfileobj(spool, out_fp)
+        out_fp.write(']}')
+        # the study is not needed anymore once written
+        studies[i] = None
+    out_fp.write(']}')
+    return True
+
+
 class ISATab2ISAjson_v1:
 
     MATERIAL_TYPE = "Material Type"
@@ -68,17 +180,16 @@ class ISATab2ISAjson_v1:
     ARRAY_DESIGN_REF = "Array Design REF"
 
     def __init__(self, identifier_type):
-        self.identifiers = list() #list of dictionaries
+        self.identifiers = dict() #(type, name) -> identifier
         self.counters = dict()
         self.identifier_type = identifier_type
 
     def setIdentifier(self, type, name, identifier):
-        self.identifiers.append(dict([("type", type), ("name", name), ("identifier", identifier)]))
+        # the first identifier set for a (type, name) is the one kept
+        self.identifiers.setdefault((type, name), identifier)
 
     def getIdentifier(self, type, name):
-        for subVal in self.identifiers:
-            if subVal["type"]==type and subVal["name"]==name:
-                return subVal["identifier"]
+        return self.identifiers.get((type, name))
 
     def generateIdentifier(self, type, name):
         try:
@@ -131,14 +242,11 @@ class ISATab2ISAjson_v1:
                     ])
 
                 # validate json
-                with open(join(SCHEMAS_PATH, INVESTIGATION_SCHEMA)) as json_fp:
-                    schema = json.load(json_fp)
-                    resolver = RefResolver('file://'+join(SCHEMAS_PATH, INVESTIGATION_SCHEMA), schema)
-                    validator = Draft4Validator(schema, resolver=resolver)
-                    validator.validate(isa_json, schema)
-
-                    log.info("Conversion finished")
-                    return isa_json
+                validator = get_schema_validator(join(SCHEMAS_PATH, INVESTIGATION_SCHEMA))
+                validator.validate(isa_json)
+
+                log.info("Conversion finished")
+                return isa_json
 
     def createComments(self, isadict):
         comments = []
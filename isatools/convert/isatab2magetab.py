@@ -1,4 +1,5 @@
 import logging
+import os
 
 
 from isatools import isatab
@@ -14,6 +15,8 @@ def convert(source_inv_fp, output_path):
     :param output_dir: Path to directory to write output MAGE-TAB files to
     """
     log.info("loading isatab %s", source_inv_fp.name)
-    ISA = isatab.load(source_inv_fp)
+    isatab_dir = os.path.dirname(source_inv_fp.name)
+    # the SDRFs are translated straight from the table files, so only the investigation file is loaded
+    ISA = isatab.load(source_inv_fp, skip_load_tables=True)
     log.info("dumping magetab %s", output_path)
-    magetab.dump(ISA, output_path)
+    magetab.dump(ISA, output_path, isatab_dir=isatab_dir)
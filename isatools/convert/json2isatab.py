@@ -1,23 +1,27 @@
 import os
-import shutil
 import logging
 
 
 from isatools import isajson
 from isatools import isatab
+from isatools.io.file_index import FileIndex
+from isatools.io.staging import Stager
 
 
 log = logging.getLogger('isatools')
 
 
 def convert(json_fp, path, i_file_name='i_investigation.txt', config_dir=isajson.default_config_dir,
-            validate_first=True):
+            validate_first=True, datafile_staging='copy'):
     """ Converter for ISA JSON to ISA Tab. Currently only converts investigation file contents
     :param json_fp: File pointer to ISA JSON input
     :param path: Directory to ISA tab output
     :param i_file_name: Investigation file name, default is i_investigation.txt
     :param config_dir: Directory to config directory
     :param validate_first: Validate JSON before conversion, default is True
+    :param datafile_staging: How to put the data files next to the ISA tab, one of
+        'copy' (default), 'hardlink', 'symlink', 'reflink' or 'manifest' (list their
+        paths in data_files_manifest.tsv instead); see isatools.io.staging
 
     Example usage:
         Read from a JSON and write to an investigation file, make sure to create/open relevant
@@ -29,6 +33,7 @@ def convert(json_fp, path, i_file_name='i_investigation.txt', config_dir=isajson
         json2isatab.convert(json_file, path)
 
     """
+    stager = Stager(path, mode=datafile_staging)
     if validate_first:
         log.info("Validating input JSON before conversion")
         report = isajson.validate(fp=json_fp, config_dir=config_dir, log_level=logging.ERROR)
@@ -42,11 +47,12 @@ def convert(json_fp, path, i_file_name='i_investigation.txt', config_dir=isajson
     log.debug("Using configuration from %s", config_dir)
     isatab.dump(isa_obj=isa_obj, output_path=path, i_file_name=i_file_name)
     #  copy data files across from source directory where JSON is located
-    log.info("Copying data files from source to target")
-    for file in [f for f in os.listdir(os.path.dirname(json_fp.name))
-                 if not (f.endswith('.txt') and (f.startswith('i_') or f.startswith('s_') or f.startswith('a_'))) and
-                 not (f.endswith('.json'))]:
-        filepath = os.path.join(os.path.dirname(json_fp.name), file)
-        if os.path.isfile(filepath):
-            log.debug("Copying %s to %s", filepath, path)
-            shutil.copy(filepath, path)
+    log.info("Staging data files from source to target (%s)", datafile_staging)
+    source_files = FileIndex(os.path.dirname(json_fp.name)).listdir()
+    with stager:
+        for file in sorted(f for f in source_files
+                           if not (f.endswith('.txt') and (f.startswith('i_') or f.startswith('s_') or f.startswith('a_'))) and
+                           not (f.endswith('.json'))):
+            filepath = source_files[file]
+            log.debug("Staging %s to %s", filepath, path)
+            stager.stage(filepath)
@@ -10,7 +10,8 @@ log = logging.getLogger('isatools')
 
 
 def convert(json_fp, path, config_dir=None, sra_settings=None,
-            datafilehashes=None, validate_first=True):
+            datafilehashes=None, validate_first=True, datafile_root=None,
+            hash_workers=None, hash_cache=None):
     """ Converter for ISA-JSON to SRA.
     :param json_fp: File pointer to ISA JSON input
     :param path: Directory for output SRA XMLs to be written
@@ -18,6 +19,10 @@ def convert(json_fp, path, config_dir=None, sra_settings=None,
         embedded in API
     :param sra_settings: SRA settings dict
     :param datafilehashes: Data files with hashes, in a dict
+    :param datafile_root: Directory of the data files to hash, if no
+        datafilehashes are given
+    :param hash_workers: Number of data files hashed at the same time
+    :param hash_cache: Checksum cache, see sra.hash_datafiles()
     """
     if validate_first:
         log.info("Validating input JSON before conversion")
@@ -32,7 +37,8 @@ def convert(json_fp, path, config_dir=None, sra_settings=None,
     log.info("Exporting SRA to {}".format(path))
     log.debug("Using SRA settings ".format(sra_settings))
     sra.export(isa, path, sra_settings=sra_settings,
-               datafilehashes=datafilehashes)
+               datafilehashes=datafilehashes, datafile_root=datafile_root,
+               hash_workers=hash_workers, hash_cache=hash_cache)
 
 """
 sra_settings = {
@@ -0,0 +1,113 @@
+"""An index of the files in a directory, for resolving data file references
+
+ISA-Tab and ISA-JSON refer to their data files by paths relative to the
+directory of the investigation. Checking each of them with os.path.isfile()
+costs a stat() per file, which is slow for studies with hundreds of
+thousands of data files, above all on network filesystems. A FileIndex
+lists each directory referred to once, with os.scandir(), and then resolves
+every reference to a file in it with a dict lookup.
+"""
+from __future__ import absolute_import
+import os
+
+
+class FileIndex(object):
+    """Index of the files under a root directory
+
+    Directories are listed the first time a path in them is looked up, so
+    only the directories actually referred to are ever read. The size and
+    modification time of a file are only stat()ed when asked for, and are
+    then kept.
+
+    Example usage:
+
+        >>> index = FileIndex('/path/to/isatab')
+        >>> 'raw/file1.mzML' in index
+        >>> index.missing(['raw/file1.mzML', 'raw/file2.mzML'])
+    """
+
+    def __init__(self, root):
+        """
+        :param root: Path of the directory the paths looked up are relative to
+        """
+        self.root = root
+        self._dirs = dict()
+        self._stats = dict()
+
+    def _split(self, path):
+        path = os.path.normpath(path)
+        return os.path.dirname(path), os.path.basename(path)
+
+    def listdir(self, dirname=''):
+        """List the files (not directories) of a directory of the index
+
+        :param dirname: Path of the directory, relative to the root
+        :return: Dict of file names to their paths, joined to the root;
+            empty if the directory does not exist
+        """
+        dirname = os.path.normpath(dirname) if dirname else ''
+        if dirname not in self._dirs:
+            files = dict()
+            path = os.path.join(self.root, dirname) or os.curdir
+            try:
+                if hasattr(os, 'scandir'):
+                    for entry in os.scandir(path):
+                        if entry.is_file():
+                            files[entry.name] = entry.path
+                else:
+                    for name in os.listdir(path):
+                        if os.path.isfile(os.path.join(path, name)):
+                            files[name] = os.path.join(path, name)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+            self._dirs[dirname] = files
+        return self._dirs[dirname]
+
+    def resolve(self, path):
+        """Resolve a file reference against the index
+
+        :param path: Path of a file, relative to the root, or an absolute
+            path, which is checked as it is
+        :return: The path of the file, joined to the root, or None if there
+            is no such file
+        """
+        if not path:
+            return None
+        if os.path.isabs(path):
+            return path if os.path.isfile(path) else None
+        dirname, name = self._split(path)
+        return self.listdir(dirname).get(name)
+
+    def __contains__(self, path):
+        return self.resolve(path) is not None
+
+    def stat(self, path):
+        """Get the size and modification time of an indexed file
+
+        :param path: Path of a file, relative to the root
+        :return: Tuple of (size in bytes, mtime), or None if there is no such
+            file
+        """
+        filepath = self.resolve(path)
+        if filepath is None:
+            return None
+        if filepath not in self._stats:
+            st = os.stat(filepath)
+            self._stats[filepath] = (st.st_size, st.st_mtime)
+        return self._stats[filepath]
+
+    def missing(self, paths):
+        """Find the file references that do not resolve
+
+        :param paths: Iterable of paths of files, relative to the root
+        :return: List of the paths with no such file, in order and without
+            repeats
+        """
+        missing = list()
+        seen = set()
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                if path not in self:
+                    missing.append(path)
+        return missing
@@ -16,6 +16,9 @@ from lxml import etree as etree_
 import os
 import glob
 import logging
+import pickle
+import tempfile
+import threading
 
 
 
@@ -54,6 +57,134 @@ def get_config(config_dict, measurement_type=None, technology_type=None):
     return sorted_config
 
 
+class CompiledConfig(object):
+    """Lookup tables over one parsed ISA-Tab table configuration
+
+    Built once from the object tree returned by parse(), so that validation
+    rules can find fields by header or position without walking the tree.
+    get_isatab_configuration() is forwarded to the tree, so a CompiledConfig
+    can be used wherever a parsed configuration is expected.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        table_config = config.get_isatab_configuration()[0]
+        self.fields = tuple(table_config.get_field())
+        self.unit_fields = tuple(table_config.get_unit_field())
+        self.protocol_fields = tuple(table_config.get_protocol_field())
+        # Headers and positions matched by more than one field are left out,
+        # as the rules only check fields that they can match unambiguously
+        self.fields_by_header = _unique_by(self.fields, lambda f: f.header)
+        self.fields_by_lower_header = _unique_by(self.fields, lambda f: f.header.lower())
+        self.unit_fields_by_pos = _unique_by(self.unit_fields, lambda f: f.pos)
+        self.headers = tuple(f.header for f in self.fields)
+        self.required_headers = tuple(f.header for f in self.fields if f.is_required)
+        self.required_header_set = frozenset(self.required_headers)
+        self.list_values = dict(
+            (header, frozenset(i.lower() for i in field.list_values.split(',')))
+            for header, field in self.fields_by_header.items() if field.list_values is not None)
+        self.protocol_types = tuple((f.pos, f.protocol_type) for f in self.protocol_fields)
+
+    @property
+    def isatab_configuration(self):
+        return self.config.isatab_configuration
+
+    def get_isatab_configuration(self):
+        return self.config.get_isatab_configuration()
+
+    def protocol_types_between(self, left_pos, right_pos):
+        """Protocol types the configuration expects between two field positions"""
+        return [protocol_type for pos, protocol_type in self.protocol_types if left_pos < pos < right_pos]
+
+
+def _unique_by(fields, key):
+    matches = dict()
+    for field in fields:
+        matches.setdefault(key(field), []).append(field)
+    return dict((k, v[0]) for k, v in matches.items() if len(v) == 1)
+
+
+def compiled(config):
+    """Get a CompiledConfig for a parsed configuration, compiling it if needed"""
+    if isinstance(config, CompiledConfig):
+        return config
+    return CompiledConfig(config)
+
+
+_COMPILED_CACHE_VERSION = 1
+_compiled_configs = dict()
+_compiled_configs_lock = threading.Lock()
+
+
+def config_dir_signature(config_dir):
+    signature = list()
+    for file in sorted(glob.iglob(os.path.join(config_dir, '*.xml'))):
+        stat = os.stat(file)
+        signature.append((os.path.basename(file), stat.st_mtime, stat.st_size))
+    return tuple(signature)
+
+
+def _read_compiled_cache(cache_file, config_dir, signature):
+    try:
+        with open(cache_file, 'rb') as fp:
+            cached = pickle.load(fp)
+        if cached['version'] == _COMPILED_CACHE_VERSION and cached['config_dir'] == config_dir \
+                and cached['signature'] == signature:
+            return cached['configs']
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning("Ignoring unreadable configuration cache {}: {}".format(cache_file, e))
+    return None
+
+
+def _write_compiled_cache(cache_file, config_dir, signature, configs):
+    cache_dir = os.path.dirname(os.path.abspath(cache_file))
+    try:
+        fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump({
+                'version': _COMPILED_CACHE_VERSION,
+                'config_dir': config_dir,
+                'signature': signature,
+                'configs': configs
+            }, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        log.warning("Could not write configuration cache {}: {}".format(cache_file, e))
+
+
+def load_compiled(config_dir, cache_file=None):
+    """Load the configurations of a directory as CompiledConfig objects
+
+    Compiled configurations are kept in-process per directory and reused for
+    as long as none of the XML files of the directory change. If a
+    cache_file is given the compiled configurations are also pickled to it,
+    so that other processes can load them without parsing the XML again.
+
+    :param config_dir: Path to a directory of XML configurations
+    :param cache_file: Optional path to an on-disk cache of the compilation
+    :return: A dict of CompiledConfig keyed by (measurement type, technology
+        type), as returned by load()
+    """
+    config_dir = os.path.abspath(config_dir)
+    signature = config_dir_signature(config_dir)
+    with _compiled_configs_lock:
+        cached = _compiled_configs.get(config_dir)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1])
+    configs = None
+    if cache_file is not None:
+        configs = _read_compiled_cache(cache_file, config_dir, signature)
+    if configs is None:
+        configs = dict((k, CompiledConfig(v)) for k, v in load(config_dir).items())
+        if cache_file is not None:
+            _write_compiled_cache(cache_file, config_dir, signature, configs)
+    with _compiled_configs_lock:
+        _compiled_configs[config_dir] = (signature, configs)
+    return dict(configs)
+
+
 Validate_simpletypes_ = True
 
 
@@ -233,6 +233,19 @@ class InvestigationParser:
         return out, line
 
 
+# a study or assay file, read once for both its nodes and process nodes
+_Table = collections.namedtuple('_Table', ['headers', 'hgroups', 'htypes', 'rows'])
+
+# the columns a processing column of a table takes its values from
+_ProcessPlan = collections.namedtuple('_ProcessPlan', [
+    'processing_column', 'processing_header', 'input_columns', 'input_headers', 'output_columns',
+    'output_headers', 'qualifier_indices', 'qualifier_headers', 'parameters_indices', 'parameter_headers',
+    'assay_name_column'])
+
+# named tuple types of collapsed attributes, by field names
+_attrs_types = {}
+
+
 class StudyAssayParser:
     """Parse row oriented metadata associated with study and assay samples.
     This currently does not attempt to be complete, but rather to extract the
@@ -266,172 +279,189 @@ class StudyAssayParser:
 
     def parse(self, rec):
         """Retrieve row data from files associated with the ISATabRecord.
+        Each study and assay file is read once, and its nodes and process
+        nodes are built from the same rows.
         """
         final_studies = []
         for study in rec.studies:
-            source_data = self._parse_study(study.metadata["Study File Name"],
-                                            self._col_types["node"])
+            study_table = self._read_table(study.metadata["Study File Name"])
+            source_data = self._parse_study(study_table, self._col_types["node"])
                                             #["Source Name", "Sample Name", "Comment[ENA_SAMPLE]"])
             if source_data:
                 study.nodes = source_data
                 final_assays = []
                 for assay in study.assays:
                     cur_assay = ISATabAssayRecord(assay)
-                    assay_data = self._parse_study(assay["Study Assay File Name"],
-                                                   self._col_types["node"])
+                    assay_table = self._read_table(assay["Study Assay File Name"])
+                    assay_data = self._parse_study(assay_table, self._col_types["node"])
                     cur_assay.nodes = assay_data
-                    assay_process_nodes = self._get_process_nodes(assay["Study Assay File Name"], cur_assay)
+                    assay_process_nodes = self._get_process_nodes(assay_table, cur_assay)
 
                     cur_assay.process_nodes = assay_process_nodes
                     final_assays.append(cur_assay)
                 study.assays = final_assays
 
                 #get process nodes
-                study_process_nodes = self._get_process_nodes(study.metadata["Study File Name"], study)
+                study_process_nodes = self._get_process_nodes(study_table, study)
                 study.process_nodes = study_process_nodes
                 final_studies.append(study)
         rec.studies = final_studies
         return rec
 
-    def _get_process_nodes(self, fname, study):
-        """Building the process nodes"""
+    def _read_table(self, fname):
+        """Read a study or assay file and characterize its header
+        :return: A _Table of the header, its groups and types, and the rows
+            of the file, or None if the file does not exist
+        """
         if not os.path.exists(os.path.join(self._dir, fname)):
-            return {}
-        process_nodes = {}
-
+            return None
         with self._preprocess(os.path.join(self._dir, fname)) as in_handle:
             reader = csv.reader(in_handle, dialect="excel-tab")
             headers = self._swap_synonyms(next(reader))
             hgroups = self._collapse_header(headers)
             htypes = self._characterize_header(headers, hgroups)
-            processing_indices = [i for i, x in enumerate(htypes) if x == "processing"]
-            all_parameters_indices = [i for i, x in enumerate(htypes) if x == "parameter"]
-            node_indices = [i for i, x in enumerate(htypes) if x == "node"]
-            node_assay_indices = [i for i, x in enumerate(htypes) if x == "node_assay"]
-            line_number = 0
-            max_number = 0
-            process_counters = {}
-            assay_name_map = {}
-            input_process_map = {}
-            output_process_map = {}
-
-            for line in reader:
-                    previous_processing_node = None
-                    for processing_index in processing_indices:
-
-                        processing_name = line[hgroups[processing_index][0]]
-                        if not processing_name:
-                            continue
-                        next_processing_index = find_gt(processing_indices, processing_index)
-                        previous_processing_index = find_lt(processing_indices, processing_index)
-
-                        input_indices = find_in_between(node_indices, previous_processing_index, processing_index)
-                        output_indices = find_in_between(node_indices, processing_index, next_processing_index)
-                        parameters_indices = find_in_between(all_parameters_indices, processing_index, next_processing_index)
-                        assay_name_indices = find_in_between(node_assay_indices, processing_index, next_processing_index)
-                        qualifier_indices = hgroups[processing_index][1:]
-
-                        input_headers = [headers[hgroups[x][0]] for i, x in enumerate(input_indices)]
-                        output_headers = [headers[hgroups[x][0]] for i, x in enumerate(output_indices)]
-                        processing_header = headers[hgroups[processing_index][0]]
-
-                        qualifier_headers = [headers[x] for i, x in enumerate(qualifier_indices)]
-                        qualifier_values = [line[x] for i, x in enumerate(qualifier_indices)]
-
-                        parameters_values = [line[x] for i, x in enumerate(parameters_indices)]
-
-                        input_values = [line[hgroups[x][0]] for i, x in enumerate(input_indices)]
-                        input_node_indices = [self._build_node_index(input_headers[i],input_values[i]) for i, x in enumerate(input_values)]
-
-                        output_values = [ line[hgroups[x][0]] for i, x in enumerate(output_indices)]
-                        output_node_indices = [self._build_node_index(output_headers[i], output_values[i]) for i, x in enumerate(output_values)]
-
-                        qualifier_indices_string = '-'.join(qualifier_values)
-                        input_node_indices_string = "-".join(input_node_indices)
-                        output_node_indices_string = "-".join(output_node_indices)
-                        parameters_indices_string = '-'.join(parameters_values)
-
-                        assay_name = ""
-                        if assay_name_indices:
-                            if len(assay_name_indices) == 1:
-                                assay_name = line[hgroups[assay_name_indices[0]][0]]
-
-                        if assay_name:
-                           unique_process_name = assay_name
-                        else:
-                            try:
-                                unique_process_name = input_process_map[qualifier_indices_string+input_node_indices_string]
-                                if not (unique_process_name.startswith(processing_name)):
-                                    raise KeyError
-                            except KeyError:
-                                try:
-                                    unique_process_name = output_process_map[qualifier_indices_string+output_node_indices_string]
-                                    if not (unique_process_name.startswith(processing_name)):
-                                        raise KeyError
-                                except KeyError:
-                                    try:
-                                        process_number = process_counters[processing_name]
-                                    except KeyError:
-                                        process_number = 0
-
-                                    process_number +=1
-                                    process_counters.update({processing_name: process_number})
-                                    unique_process_name = processing_name+str(process_number)
+            return _Table(headers, hgroups, htypes, list(reader))
+
+    def _process_plans(self, table):
+        """Work out, from the header alone, the columns each processing
+        (Protocol REF) column of a table takes its inputs, outputs,
+        parameters and assay name from"""
+        headers, hgroups, htypes = table.headers, table.hgroups, table.htypes
+        processing_indices = [i for i, x in enumerate(htypes) if x == "processing"]
+        all_parameters_indices = [i for i, x in enumerate(htypes) if x == "parameter"]
+        node_indices = [i for i, x in enumerate(htypes) if x == "node"]
+        node_assay_indices = [i for i, x in enumerate(htypes) if x == "node_assay"]
+        plans = []
+        for processing_index in processing_indices:
+            next_processing_index = find_gt(processing_indices, processing_index)
+            previous_processing_index = find_lt(processing_indices, processing_index)
+
+            input_indices = find_in_between(node_indices, previous_processing_index, processing_index)
+            output_indices = find_in_between(node_indices, processing_index, next_processing_index)
+            parameters_indices = find_in_between(all_parameters_indices, processing_index, next_processing_index)
+            assay_name_indices = find_in_between(node_assay_indices, processing_index, next_processing_index)
+            qualifier_indices = hgroups[processing_index][1:]
+
+            plans.append(_ProcessPlan(
+                processing_column=hgroups[processing_index][0],
+                processing_header=headers[hgroups[processing_index][0]],
+                input_columns=[hgroups[x][0] for x in input_indices],
+                input_headers=[headers[hgroups[x][0]] for x in input_indices],
+                output_columns=[hgroups[x][0] for x in output_indices],
+                output_headers=[headers[hgroups[x][0]] for x in output_indices],
+                qualifier_indices=qualifier_indices,
+                qualifier_headers=[headers[x] for x in qualifier_indices],
+                parameters_indices=parameters_indices,
+                parameter_headers=[headers[hgroups[x][0]] for x in parameters_indices],
+                assay_name_column=hgroups[assay_name_indices[0]][0] if len(assay_name_indices) == 1 else None))
+        return plans
+
+    def _get_process_nodes(self, table, study):
+        """Building the process nodes"""
+        if table is None:
+            return {}
+        process_nodes = {}
+        headers, hgroups, htypes = table.headers, table.hgroups, table.htypes
+        plans = self._process_plans(table)
+        process_counters = {}
+        assay_name_map = {}
+        input_process_map = {}
+        output_process_map = {}
+
+        for line in table.rows:
+            previous_processing_node = None
+            for plan in plans:
+
+                processing_name = line[plan.processing_column]
+                if not processing_name:
+                    continue
+
+                qualifier_values = [line[x] for x in plan.qualifier_indices]
+
+                parameters_values = [line[x] for x in plan.parameters_indices]
 
+                input_values = [line[x] for x in plan.input_columns]
+                input_node_indices = [self._build_node_index(plan.input_headers[i], input_values[i]) for i, x in enumerate(input_values)]
+
+                output_values = [line[x] for x in plan.output_columns]
+                output_node_indices = [self._build_node_index(plan.output_headers[i], output_values[i]) for i, x in enumerate(output_values)]
+
+                qualifier_indices_string = '-'.join(qualifier_values)
+                input_node_indices_string = "-".join(input_node_indices)
+                output_node_indices_string = "-".join(output_node_indices)
+                parameters_indices_string = '-'.join(parameters_values)
+
+                assay_name = ""
+                if plan.assay_name_column is not None:
+                    assay_name = line[plan.assay_name_column]
+
+                if assay_name:
+                   unique_process_name = assay_name
+                else:
+                    try:
+                        unique_process_name = input_process_map[qualifier_indices_string+input_node_indices_string]
+                        if not (unique_process_name.startswith(processing_name)):
+                            raise KeyError
+                    except KeyError:
                         try:
-                            process_node = process_nodes[unique_process_name]
+                            unique_process_name = output_process_map[qualifier_indices_string+output_node_indices_string]
+                            if not (unique_process_name.startswith(processing_name)):
+                                raise KeyError
                         except KeyError:
-                            # create process node
-                            process_node = ProcessNodeRecord(unique_process_name, processing_header, study, processing_name)
-
-                        if previous_processing_node:
-                            previous_processing_node.next_process = process_node
-                            process_node.previous_process = previous_processing_node
-
-                        previous_processing_node = process_node
-                        # previous_protocol = line[hgroups[next_processing_index]]
-
-                        if assay_name:
-                            process_node.assay_name = assay_name
-                            assay_name_map.update({assay_name : process_node})
-
-                        # Add qualifiers (performer and date)
-                        for qualifier_index in qualifier_indices:
-                            qualifier_header = headers[qualifier_index]
-                            if qualifier_header == "Date":
-                                process_node.date = line[qualifier_index]
-                            elif qualifier_header == "Performer":
-                                process_node.performer = line[qualifier_index]
-
-                        if not (input_node_indices in process_node.inputs):
-                            in_first = set(process_node.inputs)
-                            in_second = set(input_node_indices)
-                            in_second_but_not_in_first = in_second - in_first
-                            process_node.inputs = process_node.inputs + list(in_second_but_not_in_first)
-                        if not (output_node_indices in process_node.outputs):
-                            in_first = set(process_node.outputs)
-                            in_second = set(output_node_indices)
-                            in_second_but_not_in_first = in_second - in_first
-                            process_node.outputs = process_node.outputs + list(in_second_but_not_in_first)
-
-                        input_process_map[qualifier_indices_string+input_node_indices_string] = unique_process_name
-                        output_process_map[qualifier_indices_string+output_node_indices_string] = unique_process_name
-
-                        # Add parameters
-                        for parameter_index in parameters_indices:
-                            parameter_header = headers[hgroups[parameter_index][0]]
-                            process_node.parameters.append(parameter_header)
-                            # creating the metadata object
-                            process_node.metadata = collections.defaultdict(set)
-                            attrs = self._line_keyvals(line, headers, hgroups, htypes, process_node.metadata)
-                            process_node.metadata = attrs
-
-                        # max_number = max(len(process_node.inputs), len(process_node.outputs))
-                        line_number += 1
-                        process_nodes[unique_process_name] = process_node
-                    else:
-                        line_number += 1
-                # study.process_nodes = process_nodes
+                            try:
+                                process_number = process_counters[processing_name]
+                            except KeyError:
+                                process_number = 0
+
+                            process_number +=1
+                            process_counters.update({processing_name: process_number})
+                            unique_process_name = processing_name+str(process_number)
+
+                try:
+                    process_node = process_nodes[unique_process_name]
+                except KeyError:
+                    # create process node
+                    process_node = ProcessNodeRecord(unique_process_name, plan.processing_header, study, processing_name)
+
+                if previous_processing_node:
+                    previous_processing_node.next_process = process_node
+                    process_node.previous_process = previous_processing_node
+
+                previous_processing_node = process_node
+
+                if assay_name:
+                    process_node.assay_name = assay_name
+                    assay_name_map.update({assay_name : process_node})
+
+                # Add qualifiers (performer and date)
+                for qualifier_index, qualifier_header in zip(plan.qualifier_indices, plan.qualifier_headers):
+                    if qualifier_header == "Date":
+                        process_node.date = line[qualifier_index]
+                    elif qualifier_header == "Performer":
+                        process_node.performer = line[qualifier_index]
+
+                if not (input_node_indices in process_node.inputs):
+                    in_first = set(process_node.inputs)
+                    in_second = set(input_node_indices)
+                    in_second_but_not_in_first = in_second - in_first
+                    process_node.inputs = process_node.inputs + list(in_second_but_not_in_first)
+                if not (output_node_indices in process_node.outputs):
+                    in_first = set(process_node.outputs)
+                    in_second = set(output_node_indices)
+                    in_second_but_not_in_first = in_second - in_first
+                    process_node.outputs = process_node.outputs + list(in_second_but_not_in_first)
+
+                input_process_map[qualifier_indices_string+input_node_indices_string] = unique_process_name
+                output_process_map[qualifier_indices_string+output_node_indices_string] = unique_process_name
+
+                # Add parameters
+                if plan.parameter_headers:
+                    process_node.parameters.extend(plan.parameter_headers)
+                    # creating the metadata object
+                    process_node.metadata = self._line_keyvals(line, headers, hgroups, htypes,
+                                                               collections.defaultdict(set))
+
+                process_nodes[unique_process_name] = process_node
         return dict([(k, self._finalize_metadata(v)) for k, v in process_nodes.items()])
 
     def _preprocess(self, fname):
@@ -442,79 +472,68 @@ class StudyAssayParser:
         out_handle.seek(0)
         return out_handle
 
-    def _parse_study(self, fname, node_types):
+    def _parse_study(self, table, node_types):
         """Parse study or assay row oriented file around the supplied base node.
         """
 
-        if not os.path.exists(os.path.join(self._dir, fname)):
+        if table is None:
             return None
         nodes = {}
-        with self._preprocess(os.path.join(self._dir, fname)) as in_handle:
-            reader = csv.reader(in_handle, dialect="excel-tab")
-            headers = self._swap_synonyms(next(reader))
-            hgroups = self._collapse_header(headers)
-            htypes = self._characterize_header(headers, hgroups)
-
-            node_indices = [i for i, x in enumerate(htypes) if x == "node"]
-            all_attribute_indices = [i for i, x in enumerate(htypes) if x == "attribute"]
-
-            for node_index in node_indices:
-
-                node_type = headers[hgroups[node_index][0]]
-                if node_type not in node_types:
+        headers, hgroups, htypes = table.headers, table.hgroups, table.htypes
+
+        node_indices = [i for i, x in enumerate(htypes) if x == "node"]
+        all_attribute_indices = [i for i, x in enumerate(htypes) if x == "attribute"]
+
+        for node_index in node_indices:
+
+            node_type = headers[hgroups[node_index][0]]
+            if node_type not in node_types:
+                continue
+            try:
+                header_index = hgroups[node_index][0]
+
+            except ValueError:
+                header_index = None
+
+            if header_index is None:
+                #print "Could not find standard header name: %s in %s" \
+                #                        % (node_type, header)
+                continue
+
+            next_node_index = find_gt(node_indices, node_index)
+            previous_node_index = find_lt(node_indices, node_index)
+            attribute_indices = find_in_between(all_attribute_indices, node_index, next_node_index)
+            attribute_headers = []
+            for attribute_index in attribute_indices:
+                attribute_header = headers[hgroups[attribute_index][0]]
+                if attribute_header.startswith("Factor Value") and node_type != "Sample Name":
                     continue
-                try:
-                    header_index = hgroups[node_index][0]
-
-                except ValueError:
-                    header_index = None
+                attribute_headers.append(attribute_header)
 
-                if header_index is None:
-                    #print "Could not find standard header name: %s in %s" \
-                    #                        % (node_type, header)
+            for line in table.rows:
+                if (line[0].startswith("#")):
                     continue
+                name = self._swap_synonyms([line[header_index]])[0]
+                #skip the header line and empty lines
+                if (not name or name in headers):
+                    continue
+                #to deal with same name used for different node types (e.g. Source Name and Sample Name using the same string)
+                node_index_name = self._build_node_index(node_type,name)
 
-                next_node_index = find_gt(node_indices, node_index)
-                previous_node_index = find_lt(node_indices, node_index)
-                attribute_indices = find_in_between(all_attribute_indices, node_index, next_node_index)
-
-                in_handle.seek(0, 0)
-                for line in reader:
-                    if (line[0].startswith("#")):
-                        continue
-                    name = self._swap_synonyms([line[header_index]])[0]
-                    #skip the header line and empty lines
-                    if (not name or name in headers):
-                        continue
-                    #to deal with same name used for different node types (e.g. Source Name and Sample Name using the same string)
-                    node_index_name = self._build_node_index(node_type,name)
-
-                    try:
-                        node = nodes[node_index_name]
+                try:
+                    node = nodes[node_index_name]
+                except KeyError:
+                    node = NodeRecord(name, node_type, node_index_name)
+                    nodes[node_index_name] = node
+                    node.metadata = self._line_keyvals(line, headers, hgroups, htypes,
+                                                       collections.defaultdict(set))
 
-                        for attribute_index in attribute_indices:
-                            attribute_header = headers[hgroups[attribute_index][0]]
-                            if attribute_header.startswith("Factor Value") and node_type != "Sample Name":
-                                continue
-                            if attribute_header not in node.attributes:
-                                node.attributes.append(attribute_header)
+                for attribute_header in attribute_headers:
+                    if attribute_header not in node.attributes:
+                        node.attributes.append(attribute_header)
 
-                    except KeyError:
-                        node = NodeRecord(name, node_type, node_index_name)
-                        node.metadata = collections.defaultdict(set)
-                        nodes[node_index_name] = node
-                        attrs = self._line_keyvals(line, headers, hgroups, htypes, node.metadata)
-                        nodes[node_index_name].metadata = attrs
-
-                        for attribute_index in attribute_indices:
-                            attribute_header = headers[hgroups[attribute_index][0]]
-                            if attribute_header.startswith("Factor Value") and node_type != "Sample Name":
-                                continue
-                            if attribute_header not in node.attributes:
-                                node.attributes.append(attribute_header)
-
-                    if not (previous_node_index == -1):
-                        node.derivesFrom.append(line[previous_node_index])
+                if not (previous_node_index == -1):
+                    node.derivesFrom.append(line[previous_node_index])
 
         return dict([(k, self._finalize_metadata(v)) for k, v in nodes.items()])
 
@@ -565,7 +584,11 @@ class StudyAssayParser:
             if header[i]:
                 names.append(_RX_COLLAPSE_ATTRIBUTE.sub("_", self._clean_header(header[i])))
                 vals.append(line[i])
-        Attrs = collections.namedtuple('Attrs', names)
+        names = tuple(names)
+        try:
+            Attrs = _attrs_types[names]
+        except KeyError:
+            Attrs = _attrs_types[names] = collections.namedtuple('Attrs', names)
         return Attrs(*vals)
 
     @staticmethod
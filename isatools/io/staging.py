@@ -0,0 +1,127 @@
+"""Staging of data files into the output of a conversion
+
+Conversions such as json2isatab put the data files referred to by the
+metadata next to the files they write. Copying them duplicates what can be
+terabytes of sequencing or mass spectrometry data, when a link, a
+copy-on-write clone or just a list of where the files are is enough. Stager
+puts files in place with one of these strategies:
+
+- 'copy': copy the file (the default, and the fallback of the others)
+- 'hardlink': hard link the file, when on the same filesystem
+- 'symlink': symbolic link to the absolute path of the file
+- 'reflink': copy-on-write clone of the file, where the filesystem supports
+  it (Btrfs, XFS, ...), via the Linux FICLONE ioctl
+- 'manifest': leave the file where it is and list its path in a manifest
+  file of the output directory instead
+"""
+from __future__ import absolute_import
+import logging
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # fcntl is not available on Windows
+    fcntl = None
+
+
+log = logging.getLogger('isatools')
+
+STAGING_MODES = ('copy', 'hardlink', 'symlink', 'reflink', 'manifest')
+
+MANIFEST_FILENAME = 'data_files_manifest.tsv'
+
+_FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+
+
+def reflink(src, dst):
+    """Clone a file as a copy-on-write copy sharing its blocks
+
+    :param src: Path of the file to clone
+    :param dst: Path of the clone to create
+    :raises OSError: If the platform or filesystem does not support it
+    """
+    if fcntl is None or not hasattr(fcntl, 'ioctl'):
+        raise OSError("Reflinks are not supported on this platform")
+    with open(src, 'rb') as src_fp:
+        with open(dst, 'wb') as dst_fp:
+            try:
+                fcntl.ioctl(dst_fp.fileno(), _FICLONE, src_fp.fileno())
+            except OSError:
+                dst_fp.close()
+                os.remove(dst)
+                raise
+    shutil.copystat(src, dst)
+
+
+class Stager(object):
+    """Puts data files into an output directory with a staging strategy
+
+    Strategies other than copy fall back to copying a file they cannot
+    handle, e.g. hard links across filesystems, logging it once.
+
+    Example usage:
+
+        >>> with Stager('/path/to/out', mode='hardlink') as stager:
+        ...     stager.stage('/path/to/in/file1.raw')
+    """
+
+    def __init__(self, target_dir, mode='copy'):
+        """
+        :param target_dir: Path of the directory to put the files in
+        :param mode: One of STAGING_MODES
+        """
+        if mode not in STAGING_MODES:
+            raise ValueError("Unknown staging mode {}, expected one of {}".format(mode, STAGING_MODES))
+        self.target_dir = target_dir
+        self.mode = mode
+        self.manifest = list()
+        self._fell_back = False
+
+    def stage(self, filepath):
+        """Stage a file into the target directory, under its own name
+
+        :param filepath: Path of the file to stage
+        :return: The path of the staged file, or of the file itself in
+            manifest mode
+        """
+        name = os.path.basename(filepath)
+        target = os.path.join(self.target_dir, name)
+        if self.mode == 'manifest':
+            self.manifest.append((name, os.path.abspath(filepath)))
+            return filepath
+        if os.path.abspath(target) == os.path.abspath(filepath):
+            return target
+        # replace, rather than write through, links left by an earlier run
+        if os.path.lexists(target):
+            os.remove(target)
+        if self.mode != 'copy':
+            try:
+                if self.mode == 'hardlink':
+                    os.link(filepath, target)
+                elif self.mode == 'symlink':
+                    os.symlink(os.path.abspath(filepath), target)
+                else:
+                    reflink(filepath, target)
+                return target
+            except (OSError, NotImplementedError) as e:
+                if not self._fell_back:
+                    log.warning("Could not %s %s, copying instead: %s", self.mode, filepath, e)
+                    self._fell_back = True
+        shutil.copy(filepath, target)
+        return target
+
+    def close(self):
+        """Write out the manifest in manifest mode"""
+        if self.mode == 'manifest':
+            with open(os.path.join(self.target_dir, MANIFEST_FILENAME), 'w', encoding='utf-8') as manifest_fp:
+                manifest_fp.write('Name\tPath\n')
+                for name, path in self.manifest:
+                    manifest_fp.write('{}\t{}\n'.format(name, path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
@@ -0,0 +1,301 @@
+"""A ZIP archive writer for streams, compressing members in parallel
+
+zipfile.ZipFile compresses each member in the thread writing it, one member
+after the other, so building an archive of large data files is bound to one
+core. ZipStreamWriter splits the members into chunks that worker threads
+read and deflate at the same time (zlib releases the GIL while it works),
+the way pigz does: each chunk is primed with the 32KB before it and ends on
+a byte boundary with a sync flush, so the chunks of a member join into one
+deflate stream. The CRC-32s of the chunks are combined as in zlib's
+crc32_combine().
+
+The archive is written out in order as the chunks complete, to any binary
+file object without seeking, so it can be a pipe or a socket: sizes and
+CRC-32s go in a data descriptor after each member, and ZIP64 records are
+used for members and archives above 2GB.
+
+Example usage:
+
+    >>> with ZipStreamWriter(sys.stdout.buffer, workers=8) as zip_stream:
+    ...     zip_stream.write_files([('/path/to/file1.mzML', 'file1.mzML', ZIP_DEFLATED)])
+"""
+from __future__ import absolute_import
+import collections
+import functools
+import logging
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import ZIP_DEFLATED
+
+
+log = logging.getLogger('isatools')
+
+DEFAULT_CHUNK_SIZE = 1 << 22
+
+_ZIP64_LIMIT = (1 << 31) - 1
+_ZIP_MAX = 0xFFFFFFFF
+_WINDOW_SIZE = 1 << 15  # the deflate window, primed from the previous chunk
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_DATA_DESCRIPTOR = struct.Struct('<IIII')
+_DATA_DESCRIPTOR64 = struct.Struct('<IIQQ')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+_END_RECORD64 = struct.Struct('<IQHHIIQQQQ')
+_END_LOCATOR64 = struct.Struct('<IIQI')
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+
+
+def _gf2_times(mat, vec):
+    s = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            s ^= mat[i]
+        vec >>= 1
+        i += 1
+    return s
+
+
+def _gf2_compose(a, b):
+    return [_gf2_times(a, col) for col in b]
+
+
+@functools.lru_cache(maxsize=32)
+def _crc32_shift(length):
+    # the GF(2) operator moving a CRC-32 over length zero bytes
+    op = [0xEDB88320] + [1 << n for n in range(31)]  # one zero bit
+    for _ in range(3):
+        op = _gf2_compose(op, op)
+    shift = [1 << n for n in range(32)]
+    while length:
+        if length & 1:
+            shift = _gf2_compose(op, shift)
+        length >>= 1
+        if length:
+            op = _gf2_compose(op, op)
+    return shift
+
+
+def crc32_combine(crc1, crc2, length2):
+    """Combine the CRC-32s of two consecutive pieces of data
+
+    :param crc1: CRC-32 of the first piece
+    :param crc2: CRC-32 of the second piece
+    :param length2: Length of the second piece in bytes
+    :return: The CRC-32 of the two pieces joined
+    """
+    if length2 == 0:
+        return crc1
+    return _gf2_times(_crc32_shift(length2), crc1) ^ crc2
+
+
+def _read_chunk(path, offset, length, compress_type, level, last):
+    # read one chunk of a member and compress it, in a worker thread
+    with open(path, 'rb') as fp:
+        zdict_length = min(offset, _WINDOW_SIZE) if compress_type == ZIP_DEFLATED else 0
+        fp.seek(offset - zdict_length)
+        zdict = fp.read(zdict_length)
+        data = fp.read(length)
+    crc = zlib.crc32(data)
+    if compress_type == ZIP_DEFLATED:
+        if zdict:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        data_length = len(data)
+        data = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        return crc, data_length, data
+    return crc, len(data), data
+
+
+def _dos_date_time(mtime):
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return (1 << 5) | 1, 0
+    return ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday, \
+           (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+
+
+class _Entry(object):
+
+    def __init__(self, arcname, compress_type, size, st, offset):
+        self.name = arcname.encode('utf-8')
+        self.flags = _FLAG_DATA_DESCRIPTOR
+        if len(self.name) != len(arcname):
+            self.flags |= _FLAG_UTF8
+        self.compress_type = compress_type
+        self.zip64 = size * 1.05 + 1024 > _ZIP64_LIMIT
+        self.date, self.time = _dos_date_time(st.st_mtime)
+        self.external_attr = (st.st_mode & 0xFFFF) << 16
+        self.offset = offset
+        self.crc = 0
+        self.size = 0
+        self.compress_size = 0
+
+
+class ZipStreamWriter(object):
+    """Writes a ZIP archive to a stream, compressing in worker threads"""
+
+    def __init__(self, target, workers=None, level=6, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :param target: Path (str, bytes or path-like) of the archive, which
+            is removed if writing it fails, or a writable binary file object
+            (which need not be seekable, and is not closed)
+        :param workers: Number of compressing threads, by default the number
+            of CPUs
+        :param level: zlib compression level of deflated members
+        :param chunk_size: Size in bytes of the pieces members are
+            compressed in
+        """
+        if isinstance(target, (str, bytes, os.PathLike)):
+            self._path = os.fspath(target)
+            self._fp = open(self._path, 'wb')
+            self._close_fp = True
+        else:
+            self._path = None
+            self._fp = target
+            self._close_fp = False
+        self.workers = workers or os.cpu_count() or 1
+        self.level = level
+        self.chunk_size = chunk_size
+        self._entries = list()
+        self._names = set()
+        self._offset = 0
+        self._closed = False
+
+    def namelist(self):
+        """List the names of the members written so far"""
+        return [entry.name.decode('utf-8') for entry in self._entries]
+
+    def _write(self, data):
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def _chunks(self, members):
+        for path, arcname, compress_type in members:
+            arcname = arcname.replace(os.sep, '/').lstrip('/')
+            if arcname in self._names:
+                log.warning("Skipping duplicate archive member %s", arcname)
+                continue
+            self._names.add(arcname)
+            st = os.stat(path)
+            offsets = list(range(0, st.st_size, self.chunk_size)) or [0]
+            for n, offset in enumerate(offsets):
+                yield (path, arcname, compress_type, st, offset,
+                       min(self.chunk_size, st.st_size - offset), n == len(offsets) - 1)
+
+    def write_files(self, members):
+        """Write files as members of the archive
+
+        :param members: Iterable of (path, arcname, compress_type) tuples of
+            the files, with compress_type zipfile.ZIP_DEFLATED or
+            zipfile.ZIP_STORED
+        """
+        if self._closed:
+            raise ValueError("Cannot write to a closed archive")
+        chunks = self._chunks(members)
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+
+            def submit_next():
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    path, _, compress_type, __, offset, length, last = chunk
+                    pending.append((chunk, executor.submit(
+                        _read_chunk, path, offset, length, compress_type, self.level, last)))
+
+            # a few chunks per worker in flight bounds the memory used
+            for _ in range(self.workers * 4):
+                submit_next()
+            entry = None
+            while len(pending) > 0:
+                chunk, future = pending.popleft()
+                submit_next()
+                path, arcname, compress_type, st, offset, length, last = chunk
+                crc, data_length, data = future.result()
+                if offset == 0:
+                    entry = _Entry(arcname, compress_type, st.st_size, st, self._offset)
+                    self._write_local_header(entry)
+                    entry.crc = crc
+                else:
+                    entry.crc = crc32_combine(entry.crc, crc, data_length)
+                entry.size += data_length
+                entry.compress_size += len(data)
+                self._write(data)
+                if last:
+                    self._write_data_descriptor(entry)
+                    self._entries.append(entry)
+
+    def _write_local_header(self, entry):
+        extra = b''
+        size = compress_size = 0
+        if entry.zip64:
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0)
+            size = compress_size = _ZIP_MAX
+        self._write(_LOCAL_HEADER.pack(
+            0x04034b50, 45 if entry.zip64 else 20, entry.flags, entry.compress_type, entry.time, entry.date,
+            0, compress_size, size, len(entry.name), len(extra)))
+        self._write(entry.name)
+        self._write(extra)
+
+    def _write_data_descriptor(self, entry):
+        if not entry.zip64 and (entry.size > _ZIP64_LIMIT or entry.compress_size > _ZIP64_LIMIT):
+            raise ValueError("{} grew past 2GB while it was archived".format(entry.name.decode('utf-8')))
+        if entry.zip64:
+            self._write(_DATA_DESCRIPTOR64.pack(0x08074b50, entry.crc, entry.compress_size, entry.size))
+        else:
+            self._write(_DATA_DESCRIPTOR.pack(0x08074b50, entry.crc, entry.compress_size, entry.size))
+
+    def close(self):
+        """Write the central directory, ending the archive"""
+        if self._closed:
+            return
+        self._closed = True
+        start = self._offset
+        for entry in self._entries:
+            extra = list()
+            size, compress_size, offset = entry.size, entry.compress_size, entry.offset
+            if size > _ZIP64_LIMIT:
+                extra.append(size)
+                size = _ZIP_MAX
+            if compress_size > _ZIP64_LIMIT:
+                extra.append(compress_size)
+                compress_size = _ZIP_MAX
+            if offset > _ZIP64_LIMIT:
+                extra.append(offset)
+                offset = _ZIP_MAX
+            extra = struct.pack('<HH' + 'Q' * len(extra), 1, 8 * len(extra), *extra) if extra else b''
+            version = 45 if entry.zip64 or extra else 20
+            self._write(_CENTRAL_HEADER.pack(
+                0x02014b50, (3 << 8) | version, version, entry.flags, entry.compress_type, entry.time,
+                entry.date, entry.crc, compress_size, size, len(entry.name), len(extra), 0, 0, 0,
+                entry.external_attr, offset))
+            self._write(entry.name)
+            self._write(extra)
+        end = self._offset
+        count = len(self._entries)
+        if count > 0xFFFF or start > _ZIP64_LIMIT or end - start > _ZIP64_LIMIT:
+            self._write(_END_RECORD64.pack(0x06064b50, 44, (3 << 8) | 45, 45, 0, 0, count, count,
+                                           end - start, start))
+            self._write(_END_LOCATOR64.pack(0x07064b50, 0, end, 1))
+        self._write(_END_RECORD.pack(0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF),
+                                     min(end - start, _ZIP_MAX), min(start, _ZIP_MAX), 0))
+        self._fp.flush()
+        if self._close_fp:
+            self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        elif self._close_fp:
+            self._fp.close()
+            os.remove(self._path)  # do not leave a truncated archive behind
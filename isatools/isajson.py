@@ -8,11 +8,14 @@ import glob
 import json
 import logging
 import os
+import pathlib
 import re
-from io import StringIO
+import threading
 from json import JSONEncoder
 from jsonschema import Draft4Validator, RefResolver, ValidationError
 
+from isatools import validation
+from isatools.validation import ValidationContext
 from isatools.model import *
 
 __author__ = 'djcomlab@gmail.com (David Johnson)'
@@ -20,10 +23,6 @@ __author__ = 'djcomlab@gmail.com (David Johnson)'
 
 log = logging.getLogger('isatools')
 
-errors = []
-warnings = []
-info = []
-
 # REGEXES
 _RX_DOI = re.compile("(10[.][0-9]{4,}(?:[.][0-9]+)*/(?:(?![%'#? ])\\S)+)")
 _RX_PMID = re.compile("[0-9]{8}")
@@ -648,13 +647,14 @@ def get_io_ids_in_process_sequence(study_json):
                                  all_process_sequences] for elem in iterabl]
 
 
-def check_material_ids_declared_used(study_json, id_collector_func):
+def check_material_ids_declared_used(study_json, id_collector_func, ctx=None):
     """Used for rules 1015-1018"""
+    ctx = ctx or ValidationContext()
     node_ids = id_collector_func(study_json)
     io_ids_in_process_sequence = get_io_ids_in_process_sequence(study_json)
     is_node_ids_used = set(node_ids).issubset(set(io_ids_in_process_sequence))
     if not is_node_ids_used:
-        warnings.append({
+        ctx.warnings.append({
             "message": "Material declared but not used",
             "supplemental": "{} not used in any inputs/outputs in {}".format(node_ids, io_ids_in_process_sequence),
             "code": 1017
@@ -663,14 +663,15 @@ def check_material_ids_declared_used(study_json, id_collector_func):
                                                                                   io_ids_in_process_sequence))
 
 
-def check_material_ids_not_declared_used(study_json):
+def check_material_ids_not_declared_used(study_json, ctx=None):
     """Used for rules 1002-1005"""
+    ctx = ctx or ValidationContext()
     node_ids = get_source_ids(study_json) + get_sample_ids(study_json) + get_material_ids(study_json) + \
                get_data_file_ids(study_json)
     io_ids_in_process_sequence = get_io_ids_in_process_sequence(study_json)
     if len(set(io_ids_in_process_sequence)) - len(set(node_ids)) > 0:
         diff = set(io_ids_in_process_sequence) - set(node_ids)
-        errors.append({
+        ctx.errors.append({
             "message": "Missing Material",
             "supplemental": "Inputs/outputs in {}  not found in sources, samples, materials or datafiles "
                             "declarations".format(list(diff)),
@@ -680,13 +681,14 @@ def check_material_ids_not_declared_used(study_json):
                      "declared".format(list(diff)))
 
 
-def check_process_sequence_links(process_sequence_json):
+def check_process_sequence_links(process_sequence_json, ctx=None):
     """Used for rule 1006"""
+    ctx = ctx or ValidationContext()
     process_ids = [process["@id"] for process in process_sequence_json]
     for process in process_sequence_json:
         try:
             if process["previousProcess"]["@id"] not in process_ids:
-                errors.append({
+                ctx.errors.append({
                     "message": "Missing Process link",
                     "supplemental": "previousProcess {} in process {} does not refer to another process in "
                                     "sequence".format(process["previousProcess"]["@id"], process["@id"]),
@@ -698,7 +700,7 @@ def check_process_sequence_links(process_sequence_json):
             pass
         try:
             if process["nextProcess"]["@id"] not in process_ids:
-                errors.append({
+                ctx.errors.append({
                     "message": "Missing Process link",
                     "supplemental": "nextProcess {} in process {} does not refer to another process in "
                                     "sequence".format(process["nextProcess"]["@id"], process["@id"]),
@@ -715,8 +717,9 @@ def get_study_protocol_ids(study_json):
     return [protocol["@id"] for protocol in study_json["protocols"]]
 
 
-def check_process_protocol_ids_usage(study_json):
+def check_process_protocol_ids_usage(study_json, ctx=None):
     """Used for rules 1007 and 1019"""
+    ctx = ctx or ValidationContext()
     protocol_ids_declared = get_study_protocol_ids(study_json)
     process_sequence = study_json["processSequence"]
     protocol_ids_used = list()
@@ -734,7 +737,7 @@ def check_process_protocol_ids_usage(study_json):
                 pass
     if len(set(protocol_ids_used) - set(protocol_ids_declared)) > 0:
         diff = set(protocol_ids_used) - set(protocol_ids_declared)
-        errors.append({
+        ctx.errors.append({
             "message": "Missing Protocol declaration",
             "supplemental": "protocol IDs {} not declared".format(list(diff)),
             "code": 1007
@@ -743,7 +746,7 @@ def check_process_protocol_ids_usage(study_json):
             list(diff)))
     elif len(set(protocol_ids_declared) - set(protocol_ids_used)) > 0:
         diff = set(protocol_ids_declared) - set(protocol_ids_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Protocol declared but not used",
             "supplemental": "protocol IDs declared {} not used".format(list(diff)),
             "code": 1019
@@ -772,13 +775,14 @@ def get_parameter_value_parameter_ids(study_json):
     return study_pv_parameter_ids
 
 
-def check_protocol_parameter_ids_usage(study_json):
+def check_protocol_parameter_ids_usage(study_json, ctx=None):
     """Used for rule 1009 and 1020"""
+    ctx = ctx or ValidationContext()
     protocols_declared = get_study_protocols_parameter_ids(study_json) + ["#parameter/Array_Design_REF"] # + special case
     protocols_used = get_parameter_value_parameter_ids(study_json)
     if len(set(protocols_used) - set(protocols_declared)) > 0:
         diff = set(protocols_used) - set(protocols_declared)
-        errors.append({
+        ctx.errors.append({
             "message": "Missing Protocol Parameter declaration",
             "supplemental": "protocol parameters {} used".format(list(diff)),
             "code": 1009
@@ -787,7 +791,7 @@ def check_protocol_parameter_ids_usage(study_json):
                      "protocol".format(list(diff)))
     elif len(set(protocols_declared) - set(protocols_used)) > 0:
         diff = set(protocols_declared) - set(protocols_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Protocol parameter declared in a protocol but never used",
             "supplemental": "protocol declared {} are not used".format(list(diff)),
             "code": 1020
@@ -815,8 +819,9 @@ def get_characteristic_category_ids_in_assay_materials(assay_json):
               assay_json["materials"]["samples"] + assay_json["materials"]["otherMaterials"]] for elem in iterabl]
 
 
-def check_characteristic_category_ids_usage(studies_json):
+def check_characteristic_category_ids_usage(studies_json, ctx=None):
     """Used for rule 1013"""
+    ctx = ctx or ValidationContext()
     characteristic_categories_declared = list()
     characteristic_categories_used = list()
     for study_json in studies_json:
@@ -830,7 +835,7 @@ def check_characteristic_category_ids_usage(studies_json):
             characteristic_categories_used += characteristic_categories_used_in_assay
     if len(set(characteristic_categories_used) - set(characteristic_categories_declared)) > 0:
         diff = set(characteristic_categories_used) - set(characteristic_categories_declared)
-        errors.append({
+        ctx.errors.append({
                 "message": "Missing Characteristic Category declaration",
                 "supplemental": "Characteristic Categories {} used not declared".format(list(diff)),
                 "code": 1013
@@ -839,7 +844,7 @@ def check_characteristic_category_ids_usage(studies_json):
                      "not been not declared".format(list(diff)))
     elif len(set(characteristic_categories_declared) - set(characteristic_categories_used)) > 0:
         diff = set(characteristic_categories_declared) - set(characteristic_categories_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Characteristic Category not used",
             "supplemental": "Characteristic Categories {} declared".format(list(diff)),
             "code": 1022
@@ -859,13 +864,14 @@ def get_study_factor_ids_in_sample_factor_values(study_json):
                                  study_json["materials"]["samples"]] for elem in iterabl]
 
 
-def check_study_factor_usage(study_json):
+def check_study_factor_usage(study_json, ctx=None):
     """Used for rules 1008 and 1021"""
+    ctx = ctx or ValidationContext()
     factors_declared = get_study_factor_ids(study_json)
     factors_used = get_study_factor_ids_in_sample_factor_values(study_json)
     if len(set(factors_used) - set(factors_declared)) > 0:
         diff = set(factors_used) - set(factors_declared)
-        errors.append({
+        ctx.errors.append({
             "message": "Missing Study Factor declaration",
             "supplemental": "Study Factors {} used".format(list(diff)),
             "code": 1008
@@ -874,7 +880,7 @@ def check_study_factor_usage(study_json):
                   .format(list(diff)))
     elif len(set(factors_declared) - set(factors_used)) > 0:
         diff = set(factors_declared) - set(factors_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Study Factor is not used",
             "supplemental": "Study Factors {} are not used".format(list(diff)),
             "code": 1021
@@ -924,8 +930,9 @@ def get_assay_unit_category_ids_in_materials_and_processes(assay_json):
     return [x for x in assay_characteristics_units_used + parameter_value_units_used if x is not None]
 
 
-def check_unit_category_ids_usage(study_json):
+def check_unit_category_ids_usage(study_json, ctx=None):
     """Used for rules 1014 and 1022"""
+    ctx = ctx or ValidationContext()
     log.info("Getting units declared...")
     units_declared = get_unit_category_ids(study_json)
     for assay in study_json["assays"]:
@@ -942,7 +949,7 @@ def check_unit_category_ids_usage(study_json):
                   .format(list(diff)))
     elif len(set(units_declared) - set(units_used)) > 0:
         diff = set(units_declared) - set(units_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Unit declared but not used",
             "supplemental": "Units declared {} not used".format(list(diff)),
             "code": 1022
@@ -951,32 +958,79 @@ def check_unit_category_ids_usage(study_json):
                     .format(list(diff)))
 
 
-def check_utf8(fp):
+def check_utf8(fp, ctx=None):
     """Used for rule 0010"""
-    import chardet
+    ctx = ctx or ValidationContext()
     with open(fp.name, "rb") as fp:
-        charset = chardet.detect(fp.read())
-        if charset["encoding"] is not "UTF-8" and charset["encoding"] is not "ascii":
-            warnings.append({
-                "message": "File should be UTF8 encoding",
-                "supplemental": "Encoding is '{0}' with confidence {1}".format(charset["encoding"], charset["confidence"]),
-                "code": 10
-            })
-            log.warning("(W) File should be UTF-8 encoding but found it is '{0}' encoding with {1} confidence"
-                        .format(charset["encoding"], charset["confidence"]))
-            raise SystemError()
-
-
-def check_isa_schemas(isa_json, investigation_schema_path):
+        check = validation.check_encoding(fp)
+    if not check.valid:
+        ctx.warnings.append({
+            "message": "File should be UTF8 encoding",
+            "supplemental": "Invalid UTF-8 byte sequence ({0}) at byte {1}, line {2}".format(
+                check.reason, check.offset, check.line),
+            "code": 10
+        })
+        log.warning("(W) File should be UTF-8 encoding but found an invalid byte sequence ({0}) at byte {1}, line {2}"
+                    .format(check.reason, check.offset, check.line))
+        raise SystemError()
+
+
+_schema_stores = dict()
+_schema_stores_lock = threading.Lock()
+_schema_validators = threading.local()
+
+
+def _load_schema_store(schema_dir):
+    """Load every JSON schema in schema_dir, keyed by file URI"""
+    store = _schema_stores.get(schema_dir)
+    if store is None:
+        with _schema_stores_lock:
+            store = _schema_stores.get(schema_dir)
+            if store is None:
+                store = dict()
+                for schema_file in glob.iglob(os.path.join(schema_dir, "*.json")):
+                    with open(schema_file) as fp:
+                        store[pathlib.Path(schema_file).as_uri()] = json.load(fp)
+                _schema_stores[schema_dir] = store
+    return store
+
+
+def get_schema_validator(schema_path):
+    """Get a Draft4Validator for the JSON schema found at schema_path
+
+    Validators are cached per process and keyed by schema path. All the
+    schemas sitting next to schema_path are preloaded into the resolver store,
+    so that resolving $refs does no file I/O once the cache is warm. As a
+    RefResolver keeps a scope stack while validating, each thread gets its own
+    validator instance built over the shared schema store.
+
+    :param schema_path: Path to the JSON schema file
+    :return: A jsonschema Draft4Validator
+    """
+    schema_path = os.path.abspath(schema_path)
+    validators = getattr(_schema_validators, "cache", None)
+    if validators is None:
+        validators = _schema_validators.cache = dict()
+    validator = validators.get(schema_path)
+    if validator is None:
+        store = _load_schema_store(os.path.dirname(schema_path))
+        schema_uri = pathlib.Path(schema_path).as_uri()
+        if schema_uri not in store:
+            raise FileNotFoundError("No such schema file: {}".format(schema_path))
+        schema = store[schema_uri]
+        resolver = RefResolver(schema_uri, schema, store=dict(store))
+        validator = validators[schema_path] = Draft4Validator(schema, resolver=resolver)
+    return validator
+
+
+def check_isa_schemas(isa_json, investigation_schema_path, ctx=None):
     """Used for rule 0003 and 4003"""
+    ctx = ctx or ValidationContext()
     try:
-        with open(investigation_schema_path) as fp:
-            investigation_schema = json.load(fp)
-            resolver = RefResolver("file://" + investigation_schema_path, investigation_schema)
-            validator = Draft4Validator(investigation_schema, resolver=resolver)
-            validator.validate(isa_json)
+        validator = get_schema_validator(investigation_schema_path)
+        validator.validate(isa_json)
     except ValidationError as ve:
-        errors.append({
+        ctx.errors.append({
             "message": "Invalid JSON against ISA-JSON schemas",
             "supplemental": str(ve),
             "code": 3
@@ -986,14 +1040,15 @@ def check_isa_schemas(isa_json, investigation_schema_path):
         raise SystemError("(F) The JSON does not validate against the provided ISA-JSON schemas!")
 
 
-def check_date_formats(isa_json):
+def check_date_formats(isa_json, ctx=None):
     """Used for rule 3001"""
+    ctx = ctx or ValidationContext()
     def check_iso8601_date(date_str):
         if date_str is not "":
             try:
                 iso8601.parse_date(date_str)
             except iso8601.ParseError:
-                warnings.append({
+                ctx.warnings.append({
                     "message": "Date is not ISO8601 formatted",
                     "supplemental": "Found {} in date field".format(date_str),
                     "code": 3001
@@ -1024,12 +1079,13 @@ def check_date_formats(isa_json):
                 pass
 
 
-def check_dois(isa_json):
+def check_dois(isa_json, ctx=None):
     """Used for rule 3002"""
+    ctx = ctx or ValidationContext()
     def check_doi(doi_str):
         if doi_str is not "":
             if not _RX_DOI.match(doi_str):
-                warnings.append({
+                ctx.warnings.append({
                     "message": "DOI is not valid format",
                     "supplemental": "Found {} in DOI field".format(doi_str),
                     "code": 3002
@@ -1048,11 +1104,12 @@ def check_dois(isa_json):
                 pass
 
 
-def check_filenames_present(isa_json):
+def check_filenames_present(isa_json, ctx=None):
     """Used for rule 3005"""
+    ctx = ctx or ValidationContext()
     for s_pos, study in enumerate(isa_json["studies"]):
         if study["filename"] is "":
-            warnings.append({
+            ctx.warnings.append({
                 "message": "Missing study file name",
                 "supplemental": "At study position {}".format(s_pos),
                 "code": 3005
@@ -1060,7 +1117,7 @@ def check_filenames_present(isa_json):
             log.warning("(W) A study filename is missing")
         for a_pos, assay in enumerate(study["assays"]):
             if assay["filename"] is "":
-                warnings.append({
+                ctx.warnings.append({
                     "message": "Missing assay file name",
                     "supplemental": "At study position {}, assay position {}".format(s_pos, a_pos),
                     "code": 3005
@@ -1068,12 +1125,13 @@ def check_filenames_present(isa_json):
                 log.warning("(W) An assay filename is missing")
 
 
-def check_pubmed_ids_format(isa_json):
+def check_pubmed_ids_format(isa_json, ctx=None):
     """Used for rule 3003"""
+    ctx = ctx or ValidationContext()
     def check_pubmed_id(pubmed_id_str):
         if pubmed_id_str is not "":
             if (_RX_PMID.match(pubmed_id_str) is None) and (_RX_PMCID.match(pubmed_id_str) is None):
-                warnings.append({
+                ctx.warnings.append({
                     "message": "PubMed ID is not valid format",
                     "supplemental": "Found PubMedID {}".format(pubmed_id_str),
                     "code": 3003
@@ -1086,12 +1144,13 @@ def check_pubmed_ids_format(isa_json):
             check_pubmed_id(spub["pubMedID"])
 
 
-def check_protocol_names(isa_json):
+def check_protocol_names(isa_json, ctx=None):
     """Used for rule 1010"""
+    ctx = ctx or ValidationContext()
     for study in isa_json["studies"]:
         for protocol in study["protocols"]:
             if protocol["name"] is "":
-                warnings.append({
+                ctx.warnings.append({
                     "message": "Protocol missing name",
                     "supplemental": "Protocol @id={}".format(protocol["@id"]),
                     "code": 1010
@@ -1100,13 +1159,14 @@ def check_protocol_names(isa_json):
                             .format(protocol["@id"]))
 
 
-def check_protocol_parameter_names(isa_json):
+def check_protocol_parameter_names(isa_json, ctx=None):
     """Used for rule 1011"""
+    ctx = ctx or ValidationContext()
     for study in isa_json["studies"]:
         for protocol in study["protocols"]:
             for parameter in protocol["parameters"]:
                 if parameter["parameterName"] is "":
-                    warnings.append({
+                    ctx.warnings.append({
                         "message": "Protocol Parameter missing name",
                         "supplemental": "Protocol Parameter @id={}".format(parameter["@id"]),
                         "code": 1011
@@ -1115,12 +1175,13 @@ def check_protocol_parameter_names(isa_json):
                                 .format(parameter["@id"]))
 
 
-def check_study_factor_names(isa_json):
+def check_study_factor_names(isa_json, ctx=None):
     """Used for rule 1012"""
+    ctx = ctx or ValidationContext()
     for study in isa_json["studies"]:
         for factor in study["factors"]:
             if factor["factorName"] is "":
-                warnings.append({
+                ctx.warnings.append({
                     "message": "Study Factor missing name",
                     "supplemental": "Study Factor @id={}".format(factor["@id"]),
                     "code": 1012
@@ -1129,11 +1190,12 @@ def check_study_factor_names(isa_json):
                             .format(factor["@id"]))
 
 
-def check_ontology_sources(isa_json):
+def check_ontology_sources(isa_json, ctx=None):
     """Used for rule 3008"""
+    ctx = ctx or ValidationContext()
     for ontology_source in isa_json["ontologySourceReferences"]:
         if ontology_source["name"] is "":
-            warnings.append({
+            ctx.warnings.append({
                 "message": "Ontology Source missing name ref",
                 "supplemental": "name={}".format(ontology_source["name"]),
                 "code": 3008
@@ -1166,15 +1228,16 @@ def walk_and_get_annotations(isa_json, collector):
             walk_and_get_annotations(j, collector)
 
 
-def check_term_source_refs(isa_json):
+def check_term_source_refs(isa_json, ctx=None):
     """Used for rules 3007 and 3009"""
+    ctx = ctx or ValidationContext()
     term_sources_declared = get_ontology_source_refs(isa_json)
     collector = list()
     walk_and_get_annotations(isa_json, collector)
     term_sources_used = [annotation["termSource"] for annotation in collector if annotation["termSource"] is not ""]
     if len(set(term_sources_used) - set(term_sources_declared)) > 0:
         diff = set(term_sources_used) - set(term_sources_declared)
-        errors.append({
+        ctx.errors.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1183,7 +1246,7 @@ def check_term_source_refs(isa_json):
                   .format(list(diff)))
     elif len(set(term_sources_declared) - set(term_sources_used)) > 0:
         diff = set(term_sources_declared) - set(term_sources_used)
-        warnings.append({
+        ctx.warnings.append({
             "message": "Ontology Source Reference is not used",
             "supplemental": "Ontology sources not used {}".format(list(diff)),
             "code": 3007
@@ -1192,14 +1255,15 @@ def check_term_source_refs(isa_json):
                     .format(list(diff)))
 
 
-def check_term_accession_used_no_source_ref(isa_json):
+def check_term_accession_used_no_source_ref(isa_json, ctx=None):
     """Used for rule 3010"""
+    ctx = ctx or ValidationContext()
     collector = list()
     walk_and_get_annotations(isa_json, collector)
     terms_using_accession_no_source_ref = [annotation for annotation in collector if annotation["termAccession"]
                                            is not "" and annotation["termSource"] is ""]
     if len(terms_using_accession_no_source_ref) > 0:
-        warnings.append({
+        ctx.warnings.append({
             "message": "Missing Term Source REF in annotation",
             "supplemental": "Terms with accession but no source reference {}".format(terms_using_accession_no_source_ref),
             "code": 3010
@@ -1208,7 +1272,8 @@ def check_term_accession_used_no_source_ref(isa_json):
                     .format(terms_using_accession_no_source_ref))
 
 
-def load_config(config_dir):
+def load_config(config_dir, ctx=None):
+    ctx = ctx or ValidationContext()
     import json
     configs = dict()
     for file in glob.iglob(os.path.join(config_dir, "*.json")):
@@ -1222,7 +1287,7 @@ def load_config(config_dir):
                 else:
                     configs[(config_dict["measurementType"], config_dict["technologyType"])] = config_dict
         except ValidationError:
-            errors.append({
+            ctx.errors.append({
                 "message": "Configurations could not be loaded",
                 "supplemental": "On loading {}".format(file),
                 "code": 4001
@@ -1231,7 +1296,8 @@ def load_config(config_dir):
     return configs
 
 
-def check_measurement_technology_types(assay_json, configs):
+def check_measurement_technology_types(assay_json, configs, ctx=None):
+    ctx = ctx or ValidationContext()
     try:
         measurement_type = assay_json["measurementType"]["annotationValue"]
         technology_type = assay_json["technologyType"]["annotationValue"]
@@ -1239,7 +1305,7 @@ def check_measurement_technology_types(assay_json, configs):
         if config is None:
             raise KeyError
     except KeyError:
-        errors.append({
+        ctx.errors.append({
             "message": "Measurement/technology type invalid",
             "supplemental": "Measurement {}/technology {}".format(measurement_type, technology_type),
             "code": 4002
@@ -1248,7 +1314,8 @@ def check_measurement_technology_types(assay_json, configs):
                   .format(measurement_type, technology_type))
 
 
-def check_study_and_assay_graphs(study_json, configs):
+def check_study_and_assay_graphs(study_json, configs, ctx=None):
+    ctx = ctx or ValidationContext()
 
     def check_assay_graph(process_sequence_json, config):
         list_of_last_processes_in_sequence = [i for i in process_sequence_json if "nextProcess" not in i.keys()]
@@ -1294,7 +1361,7 @@ def check_study_and_assay_graphs(study_json, configs):
                 prev_prot = prot
             from isatools.utils import contains
             if not contains(squished_assay_protocol_sequence_of_interest, config_protocol_sequence):
-                warnings.append({
+                ctx.warnings.append({
                     "message": "Process sequence is not valid against configuration",
                     "supplemental": "Config protocol sequence {} does not in assay protocol sequence {}".format(config_protocol_sequence,
                                                                                                                 squished_assay_protocol_sequence_of_interest),
@@ -1316,7 +1383,8 @@ def check_study_and_assay_graphs(study_json, configs):
         check_assay_graph(assay_json["processSequence"], config)
 
 
-def check_study_groups(study_or_assay):
+def check_study_groups(study_or_assay, ctx=None):
+    ctx = ctx or ValidationContext()
     samples = study_or_assay.samples
     study_groups = set()
     for sample in samples:
@@ -1326,7 +1394,7 @@ def check_study_groups(study_or_assay):
     num_study_groups = len(study_groups)
     log.info('Found {} study groups in {}'.format(num_study_groups,
                                                   study_or_assay.identifier))
-    info.append({
+    ctx.info.append({
         'message': 'Found {} study groups in {}'.format(
             num_study_groups, study_or_assay.identifier),
         'supplemental': 'Found {} study groups in {}'.format(
@@ -1337,7 +1405,7 @@ def check_study_groups(study_or_assay):
         'Number of Study Groups')
     if study_group_size_in_comment is not None:
         if study_group_size_in_comment != num_study_groups:
-            warnings.append({
+            ctx.warnings.append({
                 'message': 'Reported study group size does not match table'
                     .format(num_study_groups,
                             study_or_assay.identifier),
@@ -1354,7 +1422,21 @@ default_config_dir = os.path.join(BASE_DIR, "resources", "config", "json", "defa
 
 
 def validate(fp, config_dir=default_config_dir, log_level=None,
-             base_schemas_dir="isa_model_version_1_0_schemas"):
+             base_schemas_dir="isa_model_version_1_0_schemas", profile=False, hooks=None):
+    """Validate an ISA-JSON file
+
+    :param fp: File descriptor of the ISA-JSON file
+    :param config_dir: Path to a directory of JSON configurations
+    :param log_level: Logging level of the isatools logger for this run
+    :param base_schemas_dir: Directory of the ISA-JSON schemas to use
+    :param profile: If True, the report also holds a profile of the wall
+        time and bytes read of each rule (see
+        validation.ValidationContext.profiled)
+    :param hooks: Optional list of callables, each called with the profile
+        record of every rule once it has run
+    :return: A report dict of errors, warnings, info, log and
+        validation_finished, and profile if asked for
+    """
     if config_dir is None:
         config_dir = default_config_dir
     if log_level in (
@@ -1362,100 +1444,98 @@ def validate(fp, config_dir=default_config_dir, log_level=None,
         logging.ERROR, logging.CRITICAL):
         log.setLevel(log_level)
     log.info("ISA JSON Validator from ISA tools API v0.3")
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    log.addHandler(handler)
+    log_capture = validation.LogCapture(log).start()
+    ctx = ValidationContext(profile=profile, hooks=hooks)
     try:
-        global errors
-        errors = list()
-        global warnings
-        warnings = list()
         log.info("Checking if encoding is UTF8")
-        check_utf8(fp=fp)  # Rule 0010
+        ctx.run(check_utf8, fp=fp)  # Rule 0010
         log.info("Loading json from " + fp.name)
-        isa_json = json.load(fp=fp)  # Rule 0002
+        with ctx.profiled('load_json'):
+            isa_json = json.load(fp=fp)  # Rule 0002
+            ctx.account(os.path.basename(fp.name), bytes_read=validation.file_size(fp))
         log.info("Validating JSON against schemas using Draft4Validator")
-        check_isa_schemas(isa_json=isa_json,
-                          investigation_schema_path=os.path.join(BASE_DIR, "resources", "schemas", base_schemas_dir,
-                                                                 "core", "investigation_schema.json"))  # Rule 0003
+        ctx.run(check_isa_schemas, isa_json=isa_json,
+                investigation_schema_path=os.path.join(BASE_DIR, "resources", "schemas", base_schemas_dir,
+                                                       "core", "investigation_schema.json"))  # Rule 0003
         log.info("Checking if material IDs used are declared...")
         for study_json in isa_json["studies"]:
-            check_material_ids_not_declared_used(study_json)  # Rules 1002-1005
+            ctx.run(check_material_ids_not_declared_used, study_json)  # Rules 1002-1005
         for study_json in isa_json["studies"]:
-            check_material_ids_declared_used(study_json, get_source_ids)  # Rule 1015
-            check_material_ids_declared_used(study_json, get_sample_ids)  # Rule 1016
-            check_material_ids_declared_used(study_json, get_material_ids)  # Rule 1017
-            check_material_ids_declared_used(study_json, get_data_file_ids)  # Rule 1018
+            ctx.run(check_material_ids_declared_used, study_json, get_source_ids)  # Rule 1015
+            ctx.run(check_material_ids_declared_used, study_json, get_sample_ids)  # Rule 1016
+            ctx.run(check_material_ids_declared_used, study_json, get_material_ids)  # Rule 1017
+            ctx.run(check_material_ids_declared_used, study_json, get_data_file_ids)  # Rule 1018
         log.info("Checking characteristic categories usage...")
-        check_characteristic_category_ids_usage(isa_json["studies"])  # Rules 1013 and 1022
+        ctx.run(check_characteristic_category_ids_usage, isa_json["studies"])  # Rules 1013 and 1022
         log.info("Checking study factor usage...")
         for study_json in isa_json["studies"]:
-            check_study_factor_usage(study_json)  # Rules 1008 and 1021
+            ctx.run(check_study_factor_usage, study_json)  # Rules 1008 and 1021
         log.info("Checking protocol parameter usage...")
         for study_json in isa_json["studies"]:
-            check_protocol_parameter_ids_usage(study_json)  # Rules 1009 and 1020
+            ctx.run(check_protocol_parameter_ids_usage, study_json)  # Rules 1009 and 1020
         log.info("Checking unit category usage...")
         for study_json in isa_json["studies"]:
-            check_unit_category_ids_usage(study_json)  # Rules 1014 and 1022
+            ctx.run(check_unit_category_ids_usage, study_json)  # Rules 1014 and 1022
         log.info("Checking process sequences (study)...")
         for study_json in isa_json["studies"]:
-            check_process_sequence_links(study_json["processSequence"])  # Rule 1006
+            ctx.run(check_process_sequence_links, study_json["processSequence"])  # Rule 1006
             log.info("Checking process sequences (assay)...")
             for assay_json in study_json["assays"]:
-                check_process_sequence_links(assay_json["processSequence"])  # Rule 1006
+                ctx.run(check_process_sequence_links, assay_json["processSequence"])  # Rule 1006
         log.info("Checking process protocol usage...")
         for study_json in isa_json["studies"]:
-            check_process_protocol_ids_usage(study_json)  # Rules 1007 and 1019
+            ctx.run(check_process_protocol_ids_usage, study_json)  # Rules 1007 and 1019
         log.info("Checking date formats...")
-        check_date_formats(isa_json)  # Rule 3001
+        ctx.run(check_date_formats, isa_json)  # Rule 3001
         log.info("Checking DOI formats...")
-        check_dois(isa_json)  # Rule 3002
+        ctx.run(check_dois, isa_json)  # Rule 3002
         log.info("Checking Pubmed ID formats...")
-        check_pubmed_ids_format(isa_json)  # Rule 3003
+        ctx.run(check_pubmed_ids_format, isa_json)  # Rule 3003
         log.info("Checking filenames are present...")
-        check_filenames_present(isa_json)  # Rule 3005
+        ctx.run(check_filenames_present, isa_json)  # Rule 3005
         log.info("Checking protocol names...")
-        check_protocol_names(isa_json)  # Rule 1010
+        ctx.run(check_protocol_names, isa_json)  # Rule 1010
         log.info("Checking protocol parameter names...")
-        check_protocol_parameter_names(isa_json)  # Rule 1011
+        ctx.run(check_protocol_parameter_names, isa_json)  # Rule 1011
         log.info("Checking study factor names...")
-        check_study_factor_names(isa_json)  # Rule 1012
+        ctx.run(check_study_factor_names, isa_json)  # Rule 1012
         log.info("Checking ontology sources...")
-        check_ontology_sources(isa_json)  # Rule 3008
+        ctx.run(check_ontology_sources, isa_json)  # Rule 3008
         log.info("Checking term source REFs...")
-        check_term_source_refs(isa_json)  # Rules 3007 and 3009
+        ctx.run(check_term_source_refs, isa_json)  # Rules 3007 and 3009
         log.info("Checking missing term source REFs...")
-        check_term_accession_used_no_source_ref(isa_json)  # Rule 3010
+        ctx.run(check_term_accession_used_no_source_ref, isa_json)  # Rule 3010
         log.info("Loading configurations from " + config_dir)
-        configs = load_config(config_dir)  # Rule 4001
+        configs = ctx.call(load_config, config_dir)  # Rule 4001
         log.info("Checking measurement and technology types...")
         for study_json in isa_json["studies"]:
             for assay_json in study_json["assays"]:
-                check_measurement_technology_types(assay_json, configs)  # Rule 4002
+                ctx.run(check_measurement_technology_types, assay_json, configs)  # Rule 4002
         log.info("Checking against configuration schemas...")
-        check_isa_schemas(isa_json=isa_json,
-                          investigation_schema_path=os.path.join(config_dir, "schemas",
-                                                                 "investigation_schema.json"))  # Rule 4003
+        ctx.run(check_isa_schemas, isa_json=isa_json,
+                investigation_schema_path=os.path.join(config_dir, "schemas",
+                                                       "investigation_schema.json"))  # Rule 4003
         # if all ERRORS are resolved, then try and validate against configuration
-        handler.flush()
-        if "(E)" in stream.getvalue():
+        if "(E)" in log_capture.getvalue():
             log.fatal("(F) There are some errors that mean validation against configurations cannot proceed.")
-            return stream
+            return
         fp.seek(0)  # reset file pointer
         log.info("Checking study and assay graphs...")
         for study_json in isa_json["studies"]:
-            check_study_and_assay_graphs(study_json, configs)  # Rule 4004
+            ctx.run(check_study_and_assay_graphs, study_json, configs)  # Rule 4004
         fp.seek(0)
         # try load and do study groups check
         log.info("Checking study groups...")
-        isa = load(fp)
+        with ctx.profiled('load'):
+            isa = load(fp)
+            ctx.account(os.path.basename(fp.name), bytes_read=validation.file_size(fp))
         for study in isa.studies:
-            check_study_groups(study)
+            ctx.run(check_study_groups, study)
             for assay in study.assays:
-                check_study_groups(assay)
+                ctx.run(check_study_groups, assay)
         log.info("Finished validation...")
     except KeyError as k:
-        errors.append({
+        ctx.errors.append({
             "message": "JSON Error",
             "supplemental": "Error when reading JSON; key: {}".format(str(k)),
             "code": 2
@@ -1463,7 +1543,7 @@ def validate(fp, config_dir=default_config_dir, log_level=None,
         log.fatal("(F) There was an error when trying to read the JSON")
         log.fatal("Key: " + str(k))
     except ValueError as v:
-        errors.append({
+        ctx.errors.append({
             "message": "JSON Error",
             "supplemental": "Error when parsing JSON; key: {}".format(str(v)),
             "code": 2
@@ -1471,24 +1551,54 @@ def validate(fp, config_dir=default_config_dir, log_level=None,
         log.fatal("(F) There was an error when trying to parse the JSON")
         log.fatal("Value: " + str(v))
     except SystemError as e:
-        errors.append({
+        ctx.errors.append({
             "message": "Unknown/System Error",
             "supplemental": str(e),
             "code": 0
         })
         log.fatal("(F) Something went very very wrong! :(")
     finally:
-        handler.flush()
-        return {
-            "errors": errors,
-            "warnings": warnings,
+        log_capture.stop()
+        report = {
+            "errors": ctx.errors,
+            "warnings": ctx.warnings,
+            "info": ctx.info,
+            "log": log_capture.messages,
             "validation_finished": True
         }
+        if ctx.profile is not None:
+            report["profile"] = ctx.profile
+        return report
+
+
+def _batch_validate_json_file(json_file):
+    log.info("***Validating {}***\n".format(json_file))
+    if not os.path.isfile(json_file):
+        log.warning("Could not find ISA-JSON file, skipping {}".format(json_file))
+        return None
+    with open(json_file) as fp:
+        return {
+            "filename": fp.name,
+            "report": validate(fp)
+        }
 
 
-def batch_validate(json_file_list):
+def iter_batch_validate(json_file_list, workers=None):
+    """ Validate a batch of ISA-JSON files, yielding each file's report as soon
+        as it completes
+        :param json_file_list: List of file paths to the ISA-JSON files to validate
+        :param workers: Number of processes to validate with in parallel
+        :return: iterator of batch report entries, in order of completion
+        """
+    for _, entry in validation.iter_batch(_batch_validate_json_file, json_file_list, workers):
+        if entry is not None:
+            yield entry
+
+
+def batch_validate(json_file_list, workers=None):
     """ Validate a batch of ISA-JSON files
         :param json_file_list: List of file paths to the ISA-JSON files to validate
+        :param workers: Number of processes to validate with in parallel
         :return: Dict of reports
 
         Example:
@@ -1497,28 +1607,26 @@ def batch_validate(json_file_list):
                 "/path/to/study1.json",
                 "/path/to/study2.json"
             ]
-            my_reports = isajson.batch_validate(my_jsons)
+            my_reports = isajson.batch_validate(my_jsons, workers=4)
         """
+    entries = sorted(validation.iter_batch(_batch_validate_json_file, json_file_list, workers),
+                     key=lambda x: x[0])
     batch_report = {
-        "batch_report": []
+        "batch_report": [entry for _, entry in entries if entry is not None]
     }
-    for json_file in json_file_list:
-        log.info("***Validating {}***\n".format(json_file))
-        if not os.path.isfile(json_file):
-            log.warning("Could not find ISA-JSON file, skipping {}".format(json_file))
-        else:
-            with open(json_file) as fp:
-                batch_report["batch_report"].append(
-                    {
-                        "filename": fp.name,
-                        "report": validate(fp)
-                    }
-                )
     return batch_report
 
 
 class ISAJSONEncoder(JSONEncoder):
 
+    def object_id(self, o):
+        """Get the identifier used in the @id of an ISA object
+
+        :param o: An ISA object
+        :return: The identifier, as a string
+        """
+        return str(id(o))
+
     def default(self, o):
 
         def remove_nulls(d):
@@ -1703,7 +1811,7 @@ class ISAJSONEncoder(JSONEncoder):
 
         def id_gen(o):
             if o is not None:
-                o_id = str(id(o))
+                o_id = self.object_id(o)
                 if isinstance(o, Source):
                     return '#source/' + o_id
                 elif isinstance(o, Sample):
@@ -1834,6 +1942,8 @@ class ISAJSONEncoder(JSONEncoder):
             )
         elif isinstance(o, Study):
             return get_study(o)
+        elif isinstance(o, Assay):
+            return get_assay(o)
         elif isinstance(o, OntologySource):
             return get_ontology_source(o)
         elif isinstance(o, OntologyAnnotation):
@@ -28,6 +28,8 @@ from progressbar import Bar
 from progressbar import ETA
 
 from isatools import logging as isa_logging
+from isatools import validation
+from isatools.validation import ValidationContext
 from isatools.io import isatab_configurator
 from isatools.model import *
 
@@ -164,10 +166,6 @@ class TransposedTabParser(object):
         return self._ttable_dict
 
 
-validator_errors = []
-validator_warnings = []
-validator_info = []
-
 # REGEXES
 _RX_I_FILE_NAME = re.compile('i_(.*?)\.txt')
 _RX_DATA = re.compile('data\[(.*?)\]')
@@ -1190,24 +1188,26 @@ def read_investigation_file(fp):
     return df_dict
 
 
-def check_utf8(fp):
+@validation.rule(10)
+def check_utf8(fp, ctx=None):
     """Used for rule 0010"""
-    import chardet
+    ctx = ctx or ValidationContext()
     with open(fp.name, 'rb') as fp:
-        charset = chardet.detect(fp.read())
-        if charset['encoding'] is not 'UTF-8' and charset['encoding'] is not 'ascii':
-            validator_warnings.append({
-                "message": "File should be UTF8 encoding",
-                "supplemental": "Encoding is '{0}' with confidence {1}".format(charset['encoding'], charset['confidence']),
-                "code": 10
-            })
-            log.warning("File should be UTF-8 encoding but found it is '{0}' encoding with {1} confidence"
-                        .format(charset['encoding'], charset['confidence']))
-            raise SystemError()
+        check = validation.check_encoding(fp)
+    if not check.valid:
+        ctx.warnings.append({
+            "message": "File should be UTF8 encoding",
+            "supplemental": "Invalid UTF-8 byte sequence ({0}) at byte {1}, line {2}".format(
+                check.reason, check.offset, check.line),
+            "code": 10
+        })
+        log.warning("(W) File should be UTF-8 encoding but found an invalid byte sequence ({0}) at byte {1}, "
+                    "line {2}".format(check.reason, check.offset, check.line))
 
 
-def load_investigation(fp):
+def load_investigation(fp, ctx=None):
     """Used for rules 0005"""
+    ctx = ctx or ValidationContext()
 
     def check_labels(section, labels_expected, df):
         labels_found = set([x for x in df.columns if isinstance(x, str)])
@@ -1222,14 +1222,14 @@ def load_investigation(fp):
             for label in extra_labels:
                 if _RX_COMMENT.match(label) is None:
                     log.fatal("(F) In {} section, label {} is not allowed".format(section, label))
-                    validator_errors.append({
+                    ctx.errors.append({
                         "message": "Invalid label found in investigation file",
                         "supplemental": "In {} section, label {} is not allowed".format(section, label),
                         "code": 5
                     })
                 elif len(_RX_COMMENT.findall(label)) == 0:
                     log.warning("(W) In {} section, label {} is missing a name".format(section, label))
-                    validator_warnings.append({
+                    ctx.warnings.append({
                         "message": "Missing name in Comment[] label",
                         "supplemental": "In {} section, label {} is missing a name".format(section, label),
                         "code": 4014
@@ -1319,11 +1319,13 @@ def load_investigation(fp):
     return df_dict
 
 
-def check_filenames_present(i_df):
+@validation.rule(3005)
+def check_filenames_present(i_df, ctx=None):
     """Used for rule 3005"""
+    ctx = ctx or ValidationContext()
     for s_pos, study_df in enumerate(i_df['studies']):
         if study_df.iloc[0]['Study File Name'] is '':
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Missing study file name",
                 "supplemental": "STUDY.{}".format(s_pos),
                 "code": 3005
@@ -1331,7 +1333,7 @@ def check_filenames_present(i_df):
             log.warning("(W) A study filename is missing for STUDY.{}".format(s_pos))
         for a_pos, filename in enumerate(i_df['s_assays'][s_pos]['Study Assay File Name'].tolist()):
             if filename is '':
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Missing assay file name",
                     "supplemental": "STUDY.{}, STUDY ASSAY.{}".format(s_pos, a_pos),
                     "code": 3005
@@ -1339,14 +1341,16 @@ def check_filenames_present(i_df):
                 log.warning("(W) An assay filename is missing for STUDY ASSAY.{}".format(a_pos))
 
 
-def check_date_formats(i_df):
+@validation.rule(3001)
+def check_date_formats(i_df, ctx=None):
     """Used for rule 3001"""
+    ctx = ctx or ValidationContext()
     def check_iso8601_date(date_str):
         if date_str is not '':
             try:
                 iso8601.parse_date(date_str)
             except iso8601.ParseError:
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Date is not ISO8601 formatted",
                     "supplemental": "Found {} in date field".format(date_str),
                     "code": 3001
@@ -1370,12 +1374,14 @@ def check_date_formats(i_df):
         #     check_iso8601_date(process['date'])
 
 
-def check_dois(i_df):
+@validation.rule(3002)
+def check_dois(i_df, ctx=None):
     """Used for rule 3002"""
+    ctx = ctx or ValidationContext()
     def check_doi(doi_str):
         if doi_str is not '':
             if not _RX_DOI.match(doi_str):
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "DOI is not valid format",
                     "supplemental": "Found {} in DOI field".format(doi_str),
                     "code": 3002
@@ -1388,12 +1394,14 @@ def check_dois(i_df):
             check_doi(doi)
 
 
-def check_pubmed_ids_format(i_df):
+@validation.rule(3003)
+def check_pubmed_ids_format(i_df, ctx=None):
     """Used for rule 3003"""
+    ctx = ctx or ValidationContext()
     def check_pubmed_id(pubmed_id_str):
         if pubmed_id_str is not '':
             if (_RX_PMID.match(pubmed_id_str) is None) and (_RX_PMCID.match(pubmed_id_str) is None):
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "PubMed ID is not valid format",
                     "supplemental": "Found PubMedID {}".format(pubmed_id_str),
                     "code": 3003
@@ -1406,12 +1414,14 @@ def check_pubmed_ids_format(i_df):
             check_pubmed_id(str(doi))
 
 
-def check_protocol_names(i_df):
+@validation.rule(1010)
+def check_protocol_names(i_df, ctx=None):
     """Used for rule 1010"""
+    ctx = ctx or ValidationContext()
     for study_protocols_df in i_df['s_protocols']:
         for i, protocol_name in enumerate(study_protocols_df['Study Protocol Name'].tolist()):
             if protocol_name is '' or 'Unnamed: ' in protocol_name:  # DataFrames labels empty cells as 'Unnamed: n'
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Protocol missing name",
                     "supplemental": "pos={}".format(i),
                     "code": 1010
@@ -1420,14 +1430,16 @@ def check_protocol_names(i_df):
                                "ISA-tab".format(i))
 
 
-def check_protocol_parameter_names(i_df):
+@validation.rule(1011)
+def check_protocol_parameter_names(i_df, ctx=None):
     """Used for rule 1011"""
+    ctx = ctx or ValidationContext()
     for study_protocols_df in i_df['s_protocols']:
         for i, protocol_parameters_names in enumerate(study_protocols_df['Study Protocol Parameters Name'].tolist()):
             if len(protocol_parameters_names.split(sep=';')) > 1:  # There's an empty cell if no protocols
                 for protocol_parameter_name in protocol_parameters_names.split(sep=';'):
                     if protocol_parameter_name is '' or 'Unnamed: ' in protocol_parameter_name:
-                        validator_warnings.append({
+                        ctx.warnings.append({
                             "message": "Protocol Parameter missing name",
                             "supplemental": "Protocol Parameter at pos={}".format(i),
                             "code": 1011
@@ -1436,12 +1448,14 @@ def check_protocol_parameter_names(i_df):
                                        "can't be referenced in ISA-tab".format(i))
 
 
-def check_study_factor_names(i_df):
+@validation.rule(1012)
+def check_study_factor_names(i_df, ctx=None):
     """Used for rule 1012"""
+    ctx = ctx or ValidationContext()
     for study_protocols_df in i_df['s_factors']:
         for i, protocol_name in enumerate(study_protocols_df['Study Factor Name'].tolist()):
             if protocol_name is '' or 'Unnamed: ' in protocol_name:  # DataFrames labels empty cells as 'Unnamed: n'
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Study Factor missing name",
                     "supplemental": "Study Factor pos={}".format(i),
                     "code": 1012
@@ -1450,12 +1464,14 @@ def check_study_factor_names(i_df):
                             .format(i))
 
 
-def check_ontology_sources(i_df):
+@validation.rule(3008)
+def check_ontology_sources(i_df, ctx=None):
     """Used for rule 3008"""
+    ctx = ctx or ValidationContext()
     term_source_refs = []
     for i, ontology_source_name in enumerate(i_df['ontology_sources']['Term Source Name'].tolist()):
         if ontology_source_name is '' or 'Unnamed: ' in ontology_source_name:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Ontology Source missing name ref",
                 "supplemental": "pos={}".format(i),
                 "code": 3008
@@ -1467,16 +1483,16 @@ def check_ontology_sources(i_df):
     return term_source_refs
 
 
-def check_table_files_read(i_df, dir_context):
+@validation.rule(6, 8)
+def check_table_files_read(i_df, dir_context, ctx=None):
     """Used for rules 0006 and 0008"""
+    ctx = ctx or ValidationContext()
+    file_index = ctx.file_index(dir_context)
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
-            try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8'):
-                    pass
-            except FileNotFoundError:
-                validator_errors.append({
+            if study_filename not in file_index:
+                ctx.errors.append({
                     "message": "Missing study tab file(s)",
                     "supplemental": "Study File {} does not appear to exist".format(study_filename),
                     "code": 6
@@ -1484,11 +1500,8 @@ def check_table_files_read(i_df, dir_context):
                 log.error("(E) Study File {} does not appear to exist".format(study_filename))
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
-                try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8'):
-                        pass
-                except FileNotFoundError:
-                    validator_errors.append({
+                if assay_filename not in file_index:
+                    ctx.errors.append({
                         "message": "Missing assay tab file(s)",
                         "supplemental": "Assay File {} does not appear to exist".format(assay_filename),
                         "code": 8
@@ -1496,49 +1509,104 @@ def check_table_files_read(i_df, dir_context):
                     log.error("(E) Assay File {} does not appear to exist".format(assay_filename))
 
 
-def check_table_files_load(i_df, dir_context):
+@validation.rule(11)
+def check_data_files(i_df, dir_context, ctx=None):
+    """Used for rule 0011, that the data files referred to in the assay tables exist"""
+    ctx = ctx or ValidationContext()
+    file_index = ctx.file_index(dir_context)
+    for i, study_df in enumerate(i_df['studies']):
+        for assay_filename in i_df['s_assays'][i]['Study Assay File Name'].tolist():
+            if assay_filename != '':
+                try:
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                except FileNotFoundError:
+                    continue
+                data_filenames = list()
+                for column in assay_df.columns:
+                    label = column[:column.rfind('.')] if _RX_INDEXED_COL.match(column) else column
+                    if label in _LABELS_DATA_NODES:
+                        data_filenames.extend(f for f in assay_df[column] if isinstance(f, str) and f != '')
+                missing_files = file_index.missing(data_filenames)
+                if len(missing_files) > 0:
+                    ctx.warnings.append({
+                        "message": "Missing data file(s)",
+                        "supplemental": "Data files referred to in assay file {} do not appear to exist: {}".format(
+                            assay_filename, ', '.join(missing_files)),
+                        "code": 11
+                    })
+                    log.warning("(W) {} data files referred to in assay file {} do not appear to exist".format(
+                        len(missing_files), assay_filename))
+
+
+def check_table_files_load(i_df, dir_context, ctx=None):
     """Used for rules 0007 and 0009"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
                 with open(os.path.join(dir_context, study_filename), encoding='utf-8') as fp:
-                    load_table_checks(fp)
+                    load_table_checks(fp, ctx=ctx)
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
                     with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as fp:
-                        load_table_checks(fp)
+                        load_table_checks(fp, ctx=ctx)
                 except FileNotFoundError:
                     pass
 
 
-def check_samples_not_declared_in_study_used_in_assay(i_df, dir_context):
+@validation.rule(10)
+def check_table_files_utf8(i_df, dir_context, ctx=None):
+    """Used for rule 0010 on the study and assay tables, from the encoding
+    found when loading them"""
+    ctx = ctx or ValidationContext()
+    for filename in get_table_filenames(i_df):
+        try:
+            get_table(dir_context, filename, ctx=ctx)
+        except FileNotFoundError:
+            continue
+        check = ctx.encodings[os.path.join(dir_context, filename)]
+        if not check.valid:
+            ctx.warnings.append({
+                "message": "File should be UTF8 encoding",
+                "supplemental": "In file {0}, invalid UTF-8 byte sequence ({1}) at byte {2}, line {3}".format(
+                    filename, check.reason, check.offset, check.line),
+                "code": 10
+            })
+            log.warning("(W) File {0} should be UTF-8 encoding but found an invalid byte sequence ({1}) at byte {2}, "
+                        "line {3}".format(filename, check.reason, check.offset, check.line))
+
+
+@validation.rule(1003)
+def check_samples_not_declared_in_study_used_in_assay(i_df, dir_context, ctx=None):
+    """Used for rule 1003"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_samples = set(study_df['Sample Name'])
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                study_samples = set(study_df['Sample Name'])
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        assay_samples = set(assay_df['Sample Name'])
-                        if not assay_samples.issubset(study_samples):
-                            log.error("(E) Some samples in an assay file {} are not declared in the study file {}: {}".format(assay_filename, study_filename, list(assay_samples - study_samples)))
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    assay_samples = set(assay_df['Sample Name'])
+                    if not assay_samples.issubset(study_samples):
+                        log.error("(E) Some samples in an assay file {} are not declared in the study file {}: {}".format(assay_filename, study_filename, list(assay_samples - study_samples)))
                 except FileNotFoundError:
                     pass
 
 
-def check_protocol_usage(i_df, dir_context):
+@validation.rule(1007, 1019)
+def check_protocol_usage(i_df, dir_context, ctx=None):
     """Used for rules 1007 and 1019"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         protocols_declared = set(i_df['s_protocols'][i]['Study Protocol Name'].tolist())
         protocols_declared.add('')
@@ -1546,67 +1614,63 @@ def check_protocol_usage(i_df, dir_context):
         if study_filename is not '':
             try:
                 protocol_refs_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
-                        protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
+                    protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
+                protocol_refs_used = set([r for r in protocol_refs_used if pd.notnull(r)])
+                diff = list(protocol_refs_used - protocols_declared)
+                if len(diff) > 0:
+                    ctx.errors.append({
+                        "message": "Missing Protocol declaration",
+                        "supplemental": "protocols in study file {} are not declared in the investigation file: "
+                                        "{}".format(study_filename, diff),
+                        "code": 1007
+                    })
+                    log.error(
+                        "(E) Some protocols used in a study file {} are not declared in the investigation file: "
+                        "{}".format(study_filename, diff))
+            except FileNotFoundError:
+                pass
+        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
+            if assay_filename is not '':
+                try:
+                    protocol_refs_used = set()
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
+                        protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
                     protocol_refs_used = set([r for r in protocol_refs_used if pd.notnull(r)])
                     diff = list(protocol_refs_used - protocols_declared)
                     if len(diff) > 0:
-                        validator_errors.append({
+                        ctx.errors.append({
                             "message": "Missing Protocol declaration",
                             "supplemental": "protocols in study file {} are not declared in the investigation file: "
                                             "{}".format(study_filename, diff),
                             "code": 1007
                         })
-                        log.error(
-                            "(E) Some protocols used in a study file {} are not declared in the investigation file: "
-                            "{}".format(study_filename, diff))
-            except FileNotFoundError:
-                pass
-        for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
-            if assay_filename is not '':
-                try:
-                    protocol_refs_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
-                            protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
-                        protocol_refs_used = set([r for r in protocol_refs_used if pd.notnull(r)])
-                        diff = list(protocol_refs_used - protocols_declared)
-                        if len(diff) > 0:
-                            validator_errors.append({
-                                "message": "Missing Protocol declaration",
-                                "supplemental": "protocols in study file {} are not declared in the investigation file: "
-                                                "{}".format(study_filename, diff),
-                                "code": 1007
-                            })
-                            log.error("(E) Some protocols used in an assay file {} are not declared in the "
-                                         "investigation file: {}".format(assay_filename, diff))
+                        log.error("(E) Some protocols used in an assay file {} are not declared in the "
+                                     "investigation file: {}".format(assay_filename, diff))
                 except FileNotFoundError:
                     pass
         # now collect all protocols in all assays to compare to declared protocols
         protocol_refs_used = set()
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
-                        protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                for protocol_ref_col in [i for i in study_df.columns if i.startswith('Protocol REF')]:
+                    protocol_refs_used = protocol_refs_used.union(study_df[protocol_ref_col])
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
-                            protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    for protocol_ref_col in [i for i in assay_df.columns if i.startswith('Protocol REF')]:
+                        protocol_refs_used = protocol_refs_used.union(assay_df[protocol_ref_col])
                 except FileNotFoundError:
                     pass
         diff = protocols_declared - protocol_refs_used - {''}
         if len(diff) > 0:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Protocol declared but not used",
                 "supplemental": "protocols declared in the file {} are not used in any assay file: "
                                 "{}".format(study_filename, diff),
@@ -1617,6 +1681,43 @@ def check_protocol_usage(i_df, dir_context):
                     study_filename, list(diff)))
 
 
+def get_table(dir_context, filename, ctx=None):
+    """Get a study or assay table, parsing it only once per validation run
+
+    The table is loaded with load_table() the first time it is asked for and
+    kept in the validation context, so that every later rule of the same run
+    gets the same DataFrame back instead of reading the file again. Rules
+    should treat the returned DataFrame as read-only. The file is decoded
+    once, as UTF-8 or else ISO-8859-1, and the result of checking its
+    encoding kept in ctx.encodings.
+
+    :param dir_context: Path to the directory of the ISA-Tab
+    :param filename: Name of the table file, as given in the investigation
+    :param ctx: The ValidationContext of the run
+    :return: A DataFrame of the table
+    :raises FileNotFoundError: If the table file does not exist
+    """
+    ctx = ctx or ValidationContext()
+    path = os.path.join(dir_context, filename)
+    if path not in ctx.tables:
+        try:
+            with open(path, 'rb') as fp:
+                text_fp, ctx.encodings[path] = validation.read_text(fp)
+                if ctx.profiling:
+                    ctx.account(filename, bytes_read=validation.file_size(fp))
+            if not ctx.encodings[path].valid:
+                log.warning("Could not load file with UTF-8, trying ISO-8859-1")
+            ctx.tables[path] = load_table(text_fp)
+        except FileNotFoundError:
+            ctx.tables[path] = None
+    table = ctx.tables[path]
+    if table is None:
+        raise FileNotFoundError("No such table file: '{}'".format(path))
+    if ctx.profiling:
+        ctx.account(filename, rows=table.shape[0], cells=table.size)
+    return table
+
+
 def load_table(fp):
     try:
         fp = strip_comments(fp)
@@ -1647,7 +1748,8 @@ def load_table(fp):
     return df
 
 
-def load_table_checks(fp):
+def load_table_checks(fp, ctx=None):
+    ctx = ctx or ValidationContext()
 
     df = load_table(fp)
     columns = df.columns
@@ -1666,7 +1768,7 @@ def load_table_checks(fp):
         if _RX_COMMENT.match(column):
             if len(_RX_COMMENT.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Missing name in Comment[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1674,7 +1776,7 @@ def load_table_checks(fp):
         if _RX_CHARACTERISTICS.match(column):
             if len(_RX_CHARACTERISTICS.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Missing name in Characteristics[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1682,7 +1784,7 @@ def load_table_checks(fp):
         if _RX_PARAMETER_VALUE.match(column):
             if len(_RX_PARAMETER_VALUE.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Missing name in Parameter Value[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1690,7 +1792,7 @@ def load_table_checks(fp):
         if _RX_FACTOR_VALUE.match(column):
             if len(_RX_FACTOR_VALUE.findall(column)) == 0:
                 log.warning("(W) In file {}, label {} is missing a name".format(os.path.basename(fp.name), column))
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Missing name in Factor Value[] label",
                     "supplemental": "In file {}, label {} is missing a name".format(os.path.basename(fp.name), column),
                     "code": 4014
@@ -1760,62 +1862,60 @@ def load_table_checks(fp):
     return df
 
 
-def check_study_factor_usage(i_df, dir_context):
+@validation.rule(1008, 1021)
+def check_study_factor_usage(i_df, dir_context, ctx=None):
     """Used for rules 1008 and 1021"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         study_factors_declared = set(i_df['s_factors'][i]['Study Factor Name'].tolist())
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
                 study_factors_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
-                    for col in study_factor_ref_cols:
-                        fv = _RX_FACTOR_VALUE.findall(col)
-                        study_factors_used = study_factors_used.union(set(fv))
-                    if not study_factors_used.issubset(study_factors_declared):
-                        log.error(
-                            "(E) Some factors used in an study file {} are not declared in the investigation file: {}".format(
-                                study_filename, list(study_factors_used - study_factors_declared)))
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
+                for col in study_factor_ref_cols:
+                    fv = _RX_FACTOR_VALUE.findall(col)
+                    study_factors_used = study_factors_used.union(set(fv))
+                if not study_factors_used.issubset(study_factors_declared):
+                    log.error(
+                        "(E) Some factors used in an study file {} are not declared in the investigation file: {}".format(
+                            study_filename, list(study_factors_used - study_factors_declared)))
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
                     study_factors_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
-                        for col in study_factor_ref_cols:
-                            fv = _RX_FACTOR_VALUE.findall(col)
-                            study_factors_used = study_factors_used.union(set(fv))
-                        if not study_factors_used.issubset(study_factors_declared):
-                            log.error(
-                                "(E) Some factors used in an assay file {} are not declared in the investigation file: {}".format(
-                                    assay_filename, list(study_factors_used - study_factors_declared)))
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
+                    for col in study_factor_ref_cols:
+                        fv = _RX_FACTOR_VALUE.findall(col)
+                        study_factors_used = study_factors_used.union(set(fv))
+                    if not study_factors_used.issubset(study_factors_declared):
+                        log.error(
+                            "(E) Some factors used in an assay file {} are not declared in the investigation file: {}".format(
+                                assay_filename, list(study_factors_used - study_factors_declared)))
                 except FileNotFoundError:
                     pass
         study_factors_used = set()
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
-                    for col in study_factor_ref_cols:
-                        fv = _RX_FACTOR_VALUE.findall(col)
-                        study_factors_used = study_factors_used.union(set(fv))
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                study_factor_ref_cols = [i for i in study_df.columns if _RX_FACTOR_VALUE.match(i)]
+                for col in study_factor_ref_cols:
+                    fv = _RX_FACTOR_VALUE.findall(col)
+                    study_factors_used = study_factors_used.union(set(fv))
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
-                        for col in study_factor_ref_cols:
-                            fv = _RX_FACTOR_VALUE.findall(col)
-                            study_factors_used = study_factors_used.union(set(fv))
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    study_factor_ref_cols = set([i for i in assay_df.columns if _RX_FACTOR_VALUE.match(i)])
+                    for col in study_factor_ref_cols:
+                        fv = _RX_FACTOR_VALUE.findall(col)
+                        study_factors_used = study_factors_used.union(set(fv))
                 except FileNotFoundError:
                     pass
         if len(study_factors_declared - study_factors_used) > 0:
@@ -1824,8 +1924,10 @@ def check_study_factor_usage(i_df, dir_context):
                     list(study_factors_declared - study_factors_used)))
 
 
-def check_protocol_parameter_usage(i_df, dir_context):
+@validation.rule(1009, 1020)
+def check_protocol_parameter_usage(i_df, dir_context, ctx=None):
     """Used for rules 1009 and 1020"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         protocol_parameters_declared = set()
         protocol_parameters_per_protocol = set(i_df['s_protocols'][i]['Study Protocol Parameters Name'].tolist())
@@ -1837,55 +1939,51 @@ def check_protocol_parameter_usage(i_df, dir_context):
         if study_filename is not '':
             try:
                 protocol_parameters_used = set()
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                    for col in parameter_value_cols:
-                        pv = _RX_PARAMETER_VALUE.findall(col)
-                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
-                    if not protocol_parameters_used.issubset(protocol_parameters_declared):
-                        log.error(
-                            "(E) Some protocol parameters referenced in an study file {} are not declared in the investigation file: {}".format(
-                                study_filename, list(protocol_parameters_used - protocol_parameters_declared)))
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
+                for col in parameter_value_cols:
+                    pv = _RX_PARAMETER_VALUE.findall(col)
+                    protocol_parameters_used = protocol_parameters_used.union(set(pv))
+                if not protocol_parameters_used.issubset(protocol_parameters_declared):
+                    log.error(
+                        "(E) Some protocol parameters referenced in an study file {} are not declared in the investigation file: {}".format(
+                            study_filename, list(protocol_parameters_used - protocol_parameters_declared)))
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
                     protocol_parameters_used = set()
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                        for col in parameter_value_cols:
-                            pv = _RX_PARAMETER_VALUE.findall(col)
-                            protocol_parameters_used = protocol_parameters_used.union(set(pv))
-                        if not protocol_parameters_used.issubset(protocol_parameters_declared):
-                            log.error(
-                                "(E) Some protocol parameters referenced in an assay file {} are not declared in the investigation file: {}".format(
-                                    assay_filename, list(protocol_parameters_used - protocol_parameters_declared)))
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
+                    for col in parameter_value_cols:
+                        pv = _RX_PARAMETER_VALUE.findall(col)
+                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
+                    if not protocol_parameters_used.issubset(protocol_parameters_declared):
+                        log.error(
+                            "(E) Some protocol parameters referenced in an assay file {} are not declared in the investigation file: {}".format(
+                                assay_filename, list(protocol_parameters_used - protocol_parameters_declared)))
                 except FileNotFoundError:
                     pass
         # now collect all protocol parameters in all assays to compare to declared protocol parameters
         protocol_parameters_used = set()
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    study_df = load_table(s_fp)
-                    parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                    for col in parameter_value_cols:
-                        pv = _RX_PARAMETER_VALUE.findall(col)
-                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
+                study_df = get_table(dir_context, study_filename, ctx=ctx)
+                parameter_value_cols = [i for i in study_df.columns if _RX_PARAMETER_VALUE.match(i)]
+                for col in parameter_value_cols:
+                    pv = _RX_PARAMETER_VALUE.findall(col)
+                    protocol_parameters_used = protocol_parameters_used.union(set(pv))
             except FileNotFoundError:
                 pass
         for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        assay_df = load_table(a_fp)
-                        parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
-                        for col in parameter_value_cols:
-                            pv = _RX_PARAMETER_VALUE.findall(col)
-                            protocol_parameters_used = protocol_parameters_used.union(set(pv))
+                    assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+                    parameter_value_cols = [i for i in assay_df.columns if _RX_PARAMETER_VALUE.match(i)]
+                    for col in parameter_value_cols:
+                        pv = _RX_PARAMETER_VALUE.findall(col)
+                        protocol_parameters_used = protocol_parameters_used.union(set(pv))
                 except FileNotFoundError:
                     pass
         if len(protocol_parameters_declared - protocol_parameters_used) > 0:
@@ -1898,8 +1996,9 @@ def get_ontology_source_refs(i_df):
     return i_df['ontology_sources']['Term Source Name'].tolist()
 
 
-def check_term_source_refs_in_investigation(i_df):
+def check_term_source_refs_in_investigation(i_df, ctx=None):
     """Used for rules 3007 and 3009"""
+    ctx = ctx or ValidationContext()
     ontology_sources_list = get_ontology_source_refs(i_df)
 
     def check_study_term_sources_in_secton_field(section_label, pos, column_label):
@@ -1915,7 +2014,7 @@ def check_term_source_refs_in_investigation(i_df):
             section_term_source_refs.remove(section_term_source_ref_to_remove)
         diff = set(section_term_source_refs) - set(ontology_sources_list)
         if len(diff) > 0:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Missing Term Source",
                 "supplemental": "Ontology sources missing {}".format(list(diff)),
                 "code": 3009
@@ -1926,7 +2025,7 @@ def check_term_source_refs_in_investigation(i_df):
     i_publication_status_term_source_ref = [i for i in i_df['i_publications']['Investigation Publication Status Term Source REF'].tolist() if i != '']
     diff = set(i_publication_status_term_source_ref) - set(ontology_sources_list)
     if len(diff) > 0:
-        validator_warnings.append({
+        ctx.warnings.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1936,7 +2035,7 @@ def check_term_source_refs_in_investigation(i_df):
     i_person_roles_term_source_ref = [i for i in i_df['i_contacts']['Investigation Person Roles Term Source REF'].tolist() if i != '']
     diff = set(i_person_roles_term_source_ref) - set(ontology_sources_list)
     if len(diff) > 0:
-        validator_warnings.append({
+        ctx.warnings.append({
             "message": "Missing Term Source",
             "supplemental": "Ontology sources missing {}".format(list(diff)),
             "code": 3009
@@ -1955,126 +2054,127 @@ def check_term_source_refs_in_investigation(i_df):
         check_study_term_sources_in_secton_field('s_contacts', i, 'Study Person Roles Term Source REF')
 
 
-def check_term_source_refs_in_assay_tables(i_df, dir_context):
+def check_term_source_refs_in_assay_tables(i_df, dir_context, ctx=None):
     """Used for rules 3007 and 3009"""
+    ctx = ctx or ValidationContext()
     import math
     ontology_sources_list = set(get_ontology_source_refs(i_df))
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    df = load_table(s_fp)
-                    columns = df.columns
-                    object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
-                    prev_i = object_index[0]
-                    object_columns_list = [columns[prev_i]]
-                    for curr_i in object_index:  # collect each object's columns
-                        if prev_i == curr_i:
-                            pass  # skip if there's no diff, i.e. first one
-                        else:
-                            object_columns_list.append(columns[curr_i])
-                        prev_i = curr_i
-                    for x, col in enumerate(object_columns_list):
-                        for y, row in enumerate(df[col]):
-                            if row not in ontology_sources_list:
-                                if isinstance(row, float):
-                                    if not math.isnan(row):
-                                        validator_warnings.append({
-                                            "message": "Missing Term Source",
-                                            "supplemental": "Ontology sources missing {} at column position {} and row {} "
-                                                            "in {} not declared in ontology "
-                                                            "sources {}".format(row+1, object_index[x], y+1, study_filename,
-                                                                                list(ontology_sources_list)),
-                                            "code": 3009
-                                        })
-                                        log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
-                                                    "declared in ontology sources {}".format(row+1, object_index[x], y+1,
-                                                                                             study_filename,
-                                                                                             list(ontology_sources_list)))
-                                else:
-                                    validator_warnings.append({
+                df = get_table(dir_context, study_filename, ctx=ctx)
+                columns = df.columns
+                object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
+                prev_i = object_index[0]
+                object_columns_list = [columns[prev_i]]
+                for curr_i in object_index:  # collect each object's columns
+                    if prev_i == curr_i:
+                        pass  # skip if there's no diff, i.e. first one
+                    else:
+                        object_columns_list.append(columns[curr_i])
+                    prev_i = curr_i
+                for x, col in enumerate(object_columns_list):
+                    for y, row in enumerate(df[col]):
+                        if row not in ontology_sources_list:
+                            if isinstance(row, float):
+                                if not math.isnan(row):
+                                    ctx.warnings.append({
                                         "message": "Missing Term Source",
                                         "supplemental": "Ontology sources missing {} at column position {} and row {} "
                                                         "in {} not declared in ontology "
-                                                        "sources {}".format(row + 1, object_index[x], y + 1, study_filename,
+                                                        "sources {}".format(row+1, object_index[x], y+1, study_filename,
                                                                             list(ontology_sources_list)),
                                         "code": 3009
                                     })
-                                    log.warning("(W) Term Source REF {} at column position {} and row {} in {} not in "
-                                                "declared ontology sources {}"
-                                                .format(row+1, object_index[x], y+1, study_filename,
-                                                        list(ontology_sources_list)))
+                                    log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
+                                                "declared in ontology sources {}".format(row+1, object_index[x], y+1,
+                                                                                         study_filename,
+                                                                                         list(ontology_sources_list)))
+                            else:
+                                ctx.warnings.append({
+                                    "message": "Missing Term Source",
+                                    "supplemental": "Ontology sources missing {} at column position {} and row {} "
+                                                    "in {} not declared in ontology "
+                                                    "sources {}".format(row + 1, object_index[x], y + 1, study_filename,
+                                                                        list(ontology_sources_list)),
+                                    "code": 3009
+                                })
+                                log.warning("(W) Term Source REF {} at column position {} and row {} in {} not in "
+                                            "declared ontology sources {}"
+                                            .format(row+1, object_index[x], y+1, study_filename,
+                                                    list(ontology_sources_list)))
             except FileNotFoundError:
                 pass
             for j, assay_filename in enumerate(i_df['s_assays'][i]['Study Assay File Name'].tolist()):
                 if assay_filename is not '':
                     try:
-                        with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                            df = load_table(a_fp)
-                            columns = df.columns
-                            object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
-                            prev_i = object_index[0]
-                            object_columns_list = [columns[prev_i]]
-                            for curr_i in object_index:  # collect each object's columns
-                                if prev_i == curr_i:
-                                    pass  # skip if there's no diff, i.e. first one
-                                else:
-                                    object_columns_list.append(columns[curr_i])
-                                prev_i = curr_i
-                            for x, col in enumerate(object_columns_list):
-                                for y, row in enumerate(df[col]):
-                                    if row not in ontology_sources_list:
-                                        if isinstance(row, float):
-                                            if not math.isnan(row):
-                                                validator_warnings.append({
-                                                    "message": "Missing Term Source",
-                                                    "supplemental": "Ontology sources missing {} at column position {} and "
-                                                                    "row {} in {} not declared in ontology sources {}"
-                                                        .format(row + 1, object_index[x], y + 1, study_filename,
-                                                                list(ontology_sources_list)),
-                                                    "code": 3009
-                                                })
-                                                log.warning("(W) Term Source REF {} at column position {} and row {} in {} "
-                                                            "not declared in ontology sources {}"
-                                                            .format(row+1, object_index[x], y+1, study_filename,
-                                                                    list(ontology_sources_list)))
-                                        else:
-                                            validator_warnings.append({
+                        df = get_table(dir_context, assay_filename, ctx=ctx)
+                        columns = df.columns
+                        object_index = [i for i, x in enumerate(columns) if x.startswith('Term Source REF')]
+                        prev_i = object_index[0]
+                        object_columns_list = [columns[prev_i]]
+                        for curr_i in object_index:  # collect each object's columns
+                            if prev_i == curr_i:
+                                pass  # skip if there's no diff, i.e. first one
+                            else:
+                                object_columns_list.append(columns[curr_i])
+                            prev_i = curr_i
+                        for x, col in enumerate(object_columns_list):
+                            for y, row in enumerate(df[col]):
+                                if row not in ontology_sources_list:
+                                    if isinstance(row, float):
+                                        if not math.isnan(row):
+                                            ctx.warnings.append({
                                                 "message": "Missing Term Source",
-                                                "supplemental": "Ontology sources missing {} at column position {} and row "
-                                                                "{} in {} not declared in ontology sources {}"
+                                                "supplemental": "Ontology sources missing {} at column position {} and "
+                                                                "row {} in {} not declared in ontology sources {}"
                                                     .format(row + 1, object_index[x], y + 1, study_filename,
                                                             list(ontology_sources_list)),
                                                 "code": 3009
                                             })
-                                            log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
-                                                        "in declared ontology sources {}"
+                                            log.warning("(W) Term Source REF {} at column position {} and row {} in {} "
+                                                        "not declared in ontology sources {}"
                                                         .format(row+1, object_index[x], y+1, study_filename,
                                                                 list(ontology_sources_list)))
+                                    else:
+                                        ctx.warnings.append({
+                                            "message": "Missing Term Source",
+                                            "supplemental": "Ontology sources missing {} at column position {} and row "
+                                                            "{} in {} not declared in ontology sources {}"
+                                                .format(row + 1, object_index[x], y + 1, study_filename,
+                                                        list(ontology_sources_list)),
+                                            "code": 3009
+                                        })
+                                        log.warning("(W) Term Source REF {} at column position {} and row {} in {} not "
+                                                    "in declared ontology sources {}"
+                                                    .format(row+1, object_index[x], y+1, study_filename,
+                                                            list(ontology_sources_list)))
                     except FileNotFoundError:
                         pass
 
 
-def check_term_source_refs_usage(i_df, dir_context):
-    check_term_source_refs_in_investigation(i_df)
-    check_term_source_refs_in_assay_tables(i_df, dir_context)
+def check_term_source_refs_usage(i_df, dir_context, ctx=None):
+    ctx = ctx or ValidationContext()
+    check_term_source_refs_in_investigation(i_df, ctx=ctx)
+    check_term_source_refs_in_assay_tables(i_df, dir_context, ctx=ctx)
 
 
-def load_config(config_dir):
+def load_config(config_dir, ctx=None):
     """Rule 4001"""
+    ctx = ctx or ValidationContext()
     configs = None
     try:
-        configs = isatab_configurator.load(config_dir)
+        configs = isatab_configurator.load_compiled(config_dir)
     except FileNotFoundError:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Configurations could not be loaded",
             "supplemental": "On loading {}".format(config_dir),
             "code": 4001
         })
         log.error("(E) FileNotFoundError on trying to load from {}".format(config_dir))
     if configs is None:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Configurations could not be loaded",
             "supplemental": "On loading {}".format(config_dir),
             "code": 4001
@@ -2087,8 +2187,10 @@ def load_config(config_dir):
     return configs
 
 
-def check_measurement_technology_types(i_df, configs):
+@validation.rule(4002)
+def check_measurement_technology_types(i_df, configs, ctx=None):
     """Rule 4002"""
+    ctx = ctx or ValidationContext()
     for i, assay_df in enumerate(i_df['s_assays']):
         measurement_types = assay_df['Study Assay Measurement Type'].tolist()
         technology_types = assay_df['Study Assay Technology Type'].tolist()
@@ -2097,7 +2199,7 @@ def check_measurement_technology_types(i_df, configs):
                 lowered_mt = measurement_types[x].lower()
                 lowered_tt = technology_types[x].lower()
                 if (lowered_mt, lowered_tt) not in configs.keys():
-                    validator_errors.append({
+                    ctx.errors.append({
                         "message": "Measurement/technology type invalid",
                         "supplemental": "Measurement {}/technology {}, STUDY ASSAY.{}"
                             .format(measurement_types[x], technology_types[x], i),
@@ -2107,7 +2209,9 @@ def check_measurement_technology_types(i_df, configs):
                                  "for STUDY ASSAY.{}'".format(measurement_types[x], technology_types[x], i))
 
 
-def check_investigation_against_config(i_df, configs):
+@validation.rule(4003)
+def check_investigation_against_config(i_df, configs, ctx=None):
+    ctx = ctx or ValidationContext()
 
     def check_section_against_required_fields_one_value(section, required, i=0):
         fields_required = [i for i in section.columns if i in required]
@@ -2119,7 +2223,7 @@ def check_investigation_against_config(i_df, configs):
                     if isinstance(required_value, float):
                         if math.isnan(required_value):
                             if i > 0:
-                                validator_warnings.append({
+                                ctx.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {}.{} of investigation file at column {} is "
                                                     "required".format(col, i + 1, x + 1),
@@ -2129,7 +2233,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {}.{} of investigation file at column {} is required".format(
                                         col, i+1, x + 1))
                             else:
-                                validator_warnings.append({
+                                ctx.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {} of investigation file at column {} is "
                                                     "required".format(col, x + 1),
@@ -2141,7 +2245,7 @@ def check_investigation_against_config(i_df, configs):
                     else:
                         if required_value == '' or 'Unnamed: ' in required_value:
                             if i > 0:
-                                validator_warnings.append({
+                                ctx.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {}.{} of investigation file at column {} is "
                                                     "required".format(col, i+1, x + 1),
@@ -2151,7 +2255,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {}.{} of investigation file at column {} is required".format(
                                         col, i+1, x + 1))
                             else:
-                                validator_warnings.append({
+                                ctx.warnings.append({
                                     "message": "A required property is missing",
                                     "supplemental": "A property value in {} of investigation file at column {} is "
                                                     "required".format(col, x + 1),
@@ -2161,7 +2265,7 @@ def check_investigation_against_config(i_df, configs):
                                     "(W) A property value in {} of investigation file at column {} is required".format(
                                         col, x + 1))
 
-    required_fields = [i.header for i in configs[('[investigation]', '')].get_isatab_configuration()[0].get_field() if i.is_required]
+    required_fields = isatab_configurator.compiled(configs[('[investigation]', '')]).required_headers
     check_section_against_required_fields_one_value(i_df['investigation'], required_fields)
     check_section_against_required_fields_one_value(i_df['i_publications'], required_fields)
     check_section_against_required_fields_one_value(i_df['i_contacts'], required_fields)
@@ -2176,7 +2280,8 @@ def check_investigation_against_config(i_df, configs):
         check_section_against_required_fields_one_value(i_df['s_contacts'][x], required_fields, x)
 
 
-def check_study_table_against_config(s_df, protocols_declared, config):
+def check_study_table_against_config(s_df, protocols_declared, config, ctx=None):
+    ctx = ctx or ValidationContext()
     # We are assuming the table load validation earlier passed
 
     # First check column order is correct against the configuration
@@ -2189,15 +2294,16 @@ def check_study_table_against_config(s_df, protocols_declared, config):
                                                               'Derived Spectral Data File',
                                                               'Derived Array Data File'] or 'Protocol REF' in i or
                     'Characteristics[' in i or 'Factor Value[' in i or 'Parameter Value[ in i']
-    fields = [i.header for i in config.get_isatab_configuration()[0].get_field()]
-    protocols = [(i.pos, i.protocol_type) for i in config.get_isatab_configuration()[0].get_protocol_field()]
+    config = isatab_configurator.compiled(config)
+    fields = list(config.headers)
+    protocols = config.protocol_types
     for protocol in protocols:
         fields.insert(protocol[0], 'Protocol REF')
     # strip out non-config columns
     object_index = [i for i in object_index if i[1] in fields]
     for x, object in enumerate(object_index):
         if fields[x] != object[1]:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "The column order in assay table is not valid",
                 "supplemental": "Unexpected heading found. Expected {} but found {} at column number {}"
                     .format(fields[x], object[1], object[0]),
@@ -2212,7 +2318,8 @@ def check_study_table_against_config(s_df, protocols_declared, config):
     # Third, check if required values are present
 
 
-def check_assay_table_against_config(s_df, config):
+def check_assay_table_against_config(s_df, config, ctx=None):
+    ctx = ctx or ValidationContext()
     import itertools
     # We are assuming the table load validation earlier passed
     # First check column order is correct against the configuration
@@ -2232,15 +2339,16 @@ def check_assay_table_against_config(s_df, config):
                                                               'Derived Spectral Data File',
                                                               'Derived Array Data File', 'Assay Name'] or 'Protocol REF' in i or
                     'Characteristics[' in i or 'Factor Value[' in i or 'Parameter Value[ in i' or 'Comment[' in i]
-    fields = [i.header for i in config.get_isatab_configuration()[0].get_field()]
-    protocols = [(i.pos, i.protocol_type) for i in config.get_isatab_configuration()[0].get_protocol_field()]
+    config = isatab_configurator.compiled(config)
+    fields = list(config.headers)
+    protocols = config.protocol_types
     for protocol in protocols:
         fields.insert(protocol[0], 'Protocol REF')
     # strip out non-config columns
     object_index = [i for i in object_index if i[1] in fields]
     for x, object in enumerate(object_index):
         if fields[x] != object[1]:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "The column order in assay table is not valid",
                 "supplemental": "Unexpected heading found. Expected {} but found {} at column number {}"
                     .format(fields[x], object[1], object[0]),
@@ -2264,13 +2372,55 @@ def cell_has_value(cell):
             return True
 
 
-def check_assay_table_with_config(df, config, filename, protocol_names_and_types):
+def column_has_value(column):
+    """Vectorized cell_has_value() over a whole table column
+
+    :param column: A column of a table, as a Series of strings
+    :return: A boolean numpy array, True for the cells that have a value
+    """
+    is_null = column.isnull().values
+    text = column.where(~is_null, '').astype(str)
+    return is_null | ((text.str.strip() != '') & ~text.str.contains('Unnamed: ', regex=False)).values
+
+
+def _is_date(value):
+    try:
+        iso8601.parse_date(value)
+    except iso8601.ParseError:
+        return False
+    return True
+
+
+def _is_integer(value):
+    try:
+        int(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_double(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _map_distinct(column, predicate):
+    """Apply a per value predicate once for each distinct value of a column"""
+    results = dict((value, predicate(value)) for value in pd.unique(column))
+    return column.map(results).values.astype(bool)
+
+
+def check_assay_table_with_config(df, config, filename, protocol_names_and_types, ctx=None):
+    ctx = ctx or ValidationContext()
     columns = list(df.columns)
     # Get required headers from config and check if they are present in the table; Rule 4010
-    required_fields = [i.header for i in config.get_isatab_configuration()[0].get_field() if i.is_required]
+    required_fields = isatab_configurator.compiled(config).required_headers
     for required_field in required_fields:
         if required_field not in columns:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "A required column in assay table is not present",
                 "supplemental": "In {} the required column {} missing from column headings"
                     .format(filename, required_field),
@@ -2281,7 +2431,7 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
             # Now check that the required column cells all have values, Rules 4003-4008
             for y, cell in enumerate(df[required_field]):
                 if not cell_has_value(cell):
-                    validator_warnings.append({
+                    ctx.warnings.append({
                         "message": "A required cell value is missing",
                         "supplemental": "Cell at row {} in column '{}' has no value".format(y, required_field),
                         "code": 4012
@@ -2297,7 +2447,7 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
         for cell in df[each]:
             prots_found.add(cell)
         if len(prots_found) > 1:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Multiple protocol references in Protocol REF column",
                 "supplemental": "Multiple protocol references {} are found in {}".format(prots_found, each),
                 "code": 4999
@@ -2307,8 +2457,9 @@ def check_assay_table_with_config(df, config, filename, protocol_names_and_types
             prots_ok = False
 
 
-def check_study_assay_tables_against_config(i_df, dir_context, configs):
+def check_study_assay_tables_against_config(i_df, dir_context, configs, ctx=None):
     """Used for rules 4003-4008"""
+    ctx = ctx or ValidationContext()
     for i, study_df in enumerate(i_df['studies']):
         study_filename = study_df.iloc[0]['Study File Name']
         protocol_names = i_df['s_protocols'][i]['Study Protocol Name'].tolist()
@@ -2316,11 +2467,10 @@ def check_study_assay_tables_against_config(i_df, dir_context, configs):
         protocol_names_and_types = dict(zip(protocol_names, protocol_types))
         if study_filename is not '':
             try:
-                with open(os.path.join(dir_context, study_filename), encoding='utf-8') as s_fp:
-                    df = load_table(s_fp)
-                    config = configs[('[sample]', '')]
-                    log.info("Checking study file {} against default study table configuration...".format(study_filename))
-                    check_assay_table_with_config(df, config, study_filename, protocol_names_and_types)
+                df = get_table(dir_context, study_filename, ctx=ctx)
+                config = configs[('[sample]', '')]
+                log.info("Checking study file {} against default study table configuration...".format(study_filename))
+                check_assay_table_with_config(df, config, study_filename, protocol_names_and_types, ctx=ctx)
             except FileNotFoundError:
                 pass
         for j, assay_df in enumerate(i_df['s_assays']):
@@ -2329,26 +2479,27 @@ def check_study_assay_tables_against_config(i_df, dir_context, configs):
             technology_type = assay_df['Study Assay Technology Type'].tolist()[0]
             if assay_filename is not '':
                 try:
-                    with open(os.path.join(dir_context, assay_filename), encoding='utf-8') as a_fp:
-                        df = load_table(a_fp)
-                        lowered_mt = measurement_type.lower()
-                        lowered_tt = technology_type.lower()
-                        config = configs[(lowered_mt, lowered_tt)]
-                        log.info(
-                            "Checking assay file {} against default table configuration ({}, {})...".format(assay_filename, measurement_type, technology_type))
-                        check_assay_table_with_config(df, config, assay_filename, protocol_names_and_types)
-                        # check_assay_table_with_config(df, protocols, config, assay_filename)
+                    df = get_table(dir_context, assay_filename, ctx=ctx)
+                    lowered_mt = measurement_type.lower()
+                    lowered_tt = technology_type.lower()
+                    config = configs[(lowered_mt, lowered_tt)]
+                    log.info(
+                        "Checking assay file {} against default table configuration ({}, {})...".format(assay_filename, measurement_type, technology_type))
+                    check_assay_table_with_config(df, config, assay_filename, protocol_names_and_types, ctx=ctx)
+                    # check_assay_table_with_config(df, protocols, config, assay_filename)
                 except FileNotFoundError:
                     pass
         # TODO: Check protocol usage - Rule 4009
 
 
-def check_factor_value_presence(table):
+@validation.rule(4007)
+def check_factor_value_presence(table, ctx=None):
+    ctx = ctx or ValidationContext()
     factor_fields = [i for i in table.columns if i.lower().startswith('factor value')]
     for factor_field in factor_fields:
         for x, cell_value in enumerate(table.fillna('')[factor_field]):
             if cell_value == '':
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "A required node factor value is missing value",
                     "supplemental": "(W) Missing value for '" + factor_field + "' at row " + str(x) + " in " +
                                     table.filename,
@@ -2357,18 +2508,20 @@ def check_factor_value_presence(table):
                 log.warning("(W) Missing value for '" + factor_field + "' at row " + str(x) + " in " + table.filename)
 
 
-def check_required_fields(table, cfg):
-    for fheader in [i.header for i in cfg.get_isatab_configuration()[0].get_field() if i.is_required]:
+@validation.rule(4003, 4004, 4005, 4006, 4007, 4008, 4010, 4013)
+def check_required_fields(table, cfg, ctx=None):
+    ctx = ctx or ValidationContext()
+    for fheader in isatab_configurator.compiled(cfg).required_headers:
         found_field = [i for i in table.columns if i.lower() == fheader.lower()]
         if len(found_field) == 0:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "A required column in assay table is not present",
                 "supplemental": "Required field '" + fheader + "' not found in the file '" + table.filename + "'",
                 "code": 4010
             })
             log.warning("(W) Required field '" + fheader + "' not found in the file '" + table.filename + "'")
         elif len(found_field) > 1:
-            validator_warnings.append({
+            ctx.warnings.append({
                 "message": "Multiple columns found",
                 "supplemental": "Field '" + fheader + "' cannot have multiple values in the file '" + table.filename,
                 "code": 4013
@@ -2376,14 +2529,16 @@ def check_required_fields(table, cfg):
             log.warning("(W) Field '" + fheader + "' cannot have multiple values in the file '" + table.filename)
 
 
-def check_sample_names(study_sample_table, assay_tables=[]):
+@validation.rule(1003)
+def check_sample_names(study_sample_table, assay_tables=[], ctx=None):
+    ctx = ctx or ValidationContext()
     if len(assay_tables) > 0:
         study_samples = set(study_sample_table['Sample Name'])
         for assay_table in assay_tables:
             assay_samples = set(assay_table['Sample Name'])
             for assay_sample in assay_samples:
                 if assay_sample not in study_samples:
-                    validator_warnings.append({
+                    ctx.warnings.append({
                         "message": "Missing Sample",
                         "supplemental": "{} is a Sample Name in {}, but it is not defined in the Study Sample File {}."
                                 .format(assay_sample, assay_table.filename, study_sample_table.filename),
@@ -2393,63 +2548,32 @@ def check_sample_names(study_sample_table, assay_tables=[]):
                                 .format(assay_sample, assay_table.filename, study_sample_table.filename))
 
 
-def check_field_values(table, cfg):
-    def check_single_field(cell_value, cfg_field):
-        # First check if the value is required by config
-        if isinstance(cell_value, float):
-            if math.isnan(cell_value):
-                if cfg_field.is_required:
-                    validator_warnings.append({
-                        "message": "A required column in assay table is not present",
-                        "supplemental": "Missing value for the required field '" + cfg_field.header
-                                        + "' in the file '" + table.filename + "'",
-                        "code": 4010
-                    })
-                    log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'")
-                return True
-        elif isinstance(cell_value, str):
-            value = cell_value.strip()
-            if value == '':
-                if cfg_field.is_required:
-                    validator_warnings.append({
-                        "message": "A required cell value is missing",
-                        "supplemental": "Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'",
-                        "code": 4012
-                    })
-                    log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
-                                table.filename + "'")
-                return True
-        is_valid_value = True
-        data_type = cfg_field.data_type.lower().strip()
-        if data_type in ['', 'string']:
-            return True
-        if 'boolean' == data_type:
-            is_valid_value = 'true' == cell_value.strip() or 'false' == cell_value.strip()
-        elif 'date' == data_type:
-            try:
-                iso8601.parse_date(cell_value)
-            except iso8601.ParseError:
-                is_valid_value = False
-        elif 'integer' == data_type:
-            try:
-                int(cell_value)
-            except ValueError:
-                is_valid_value = False
-        elif 'double' == data_type:
-            try:
-                float(cell_value)
-            except ValueError:
-                is_valid_value = False
-        elif data_type == 'list':
-            list_values = [i.lower() for i in cfg_field.list_values.split(',')]
-            if cell_value.lower() not in list_values:
-                is_valid_value = False
-        elif data_type in ['ontology-term', 'ontology term']:
-            return True  # Structure and values checked in check_ontology_fields()
+@validation.rule(4010, 4011, 4012)
+def check_field_values(table, cfg, ctx=None):
+    ctx = ctx or ValidationContext()
+
+    def warn_missing_value(cfg_field, is_nan):
+        if is_nan:
+            ctx.warnings.append({
+                "message": "A required column in assay table is not present",
+                "supplemental": "Missing value for the required field '" + cfg_field.header
+                                + "' in the file '" + table.filename + "'",
+                "code": 4010
+            })
         else:
-            validator_warnings.append({
+            ctx.warnings.append({
+                "message": "A required cell value is missing",
+                "supplemental": "Missing value for the required field '" + cfg_field.header + "' in the file '" +
+                        table.filename + "'",
+                "code": 4012
+            })
+        log.warning("(W) Missing value for the required field '" + cfg_field.header + "' in the file '" +
+                    table.filename + "'")
+
+    def warn_invalid_value(cell_value, cfg_field, data_type):
+        if data_type is None:
+            data_type = cfg_field.data_type.lower().strip()
+            ctx.warnings.append({
                 "message": "Unknown data type found",
                 "supplemental": "Unknown data type '" + data_type + "' for field '" + cfg_field.header +
                                 "' in the file '" + table.filename + "'",
@@ -2457,35 +2581,96 @@ def check_field_values(table, cfg):
             })
             log.warning("(W) Unknown data type '" + data_type + "' for field '" + cfg_field.header +
                         "' in the file '" + table.filename + "'")
-            return False
-        if not is_valid_value:
-            validator_warnings.append({
-                "message": "A value does not correspond to the correct data type",
-                "supplemental": "Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '"
-                                + cfg_field.header + "'",
-                "code": 4011
-            })
-            log.warning("(W) Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '" +
-                        cfg_field.header + "'")
-            if data_type == 'list':
-                log.warning("(W) Value must be one of: " + cfg_field.list_values)
-        return is_valid_value
-
-    result = True
-    for irow in range(len(table.index)):
-        ncols = len(table.columns)
-        for icol in range(0, ncols):
-            cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == table.columns[icol]]
-            if len(cfields) == 1:
-                cfield = cfields[0]
-                result = result and check_single_field(table.iloc[irow][cfield.header], cfield)
-    return result
+            return
+        ctx.warnings.append({
+            "message": "A value does not correspond to the correct data type",
+            "supplemental": "Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '"
+                            + cfg_field.header + "'",
+            "code": 4011
+        })
+        log.warning("(W) Invalid value '" + cell_value + "' for type '" + data_type + "' of the field '" +
+                    cfg_field.header + "'")
+        if data_type == 'list':
+            log.warning("(W) Value must be one of: " + cfg_field.list_values)
+
+    def check_column(column, cfg_field):
+        """Returns (rows missing a required value, of which NaN; rows failing; known data type or None)"""
+        column = column.astype(object)
+        is_nan = column.isnull().values
+        is_empty = (column.str.strip() == '').values
+        has_value = ~is_nan & ~is_empty
+        if cfg_field.is_required:
+            missing = is_nan | is_empty
+        else:
+            missing = np.zeros(len(column), dtype=bool)
+        invalid = np.zeros(len(column), dtype=bool)
+        data_type = None
+        if has_value.any():
+            data_type = cfg_field.data_type.lower().strip()
+            values = column[has_value]
+            if data_type in ['', 'string', 'ontology-term', 'ontology term']:
+                pass  # Structure and values of ontology terms checked in check_ontology_fields()
+            elif 'boolean' == data_type:
+                invalid[has_value] = ~values.str.strip().isin(['true', 'false']).values
+            elif 'date' == data_type:
+                invalid[has_value] = ~_map_distinct(values, _is_date)
+            elif 'integer' == data_type:
+                invalid[has_value] = ~_map_distinct(values, _is_integer)
+            elif 'double' == data_type:
+                invalid[has_value] = ~_map_distinct(values, _is_double)
+            elif data_type == 'list':
+                list_values = cfg.list_values[cfg_field.header]
+                invalid[has_value] = ~values.str.lower().isin(list_values).values
+            else:
+                invalid = has_value
+                data_type = None
+        return missing, is_nan, invalid, data_type
+
+    # Resolve the configuration of each column once and check whole columns,
+    # then report in the row by row order the rules were first written in:
+    # every cell is checked up to and including the first invalid one.
+    cfg = isatab_configurator.compiled(cfg)
+    cfields = cfg.fields_by_header
+    checked_columns = list()
+    for icol, header in enumerate(table.columns):
+        if header in cfields:
+            cfield = cfields[header]
+            checked_columns.append((icol, cfield) + check_column(table.iloc[:, icol], cfield))
+    first_invalid = None  # (row, position in checked_columns) of the first invalid cell
+    for x, (icol, cfield, missing, is_nan, invalid, data_type) in enumerate(checked_columns):
+        if invalid.any():
+            cell = (int(np.argmax(invalid)), x)
+            if first_invalid is None or cell < first_invalid:
+                first_invalid = cell
+    missing_rows = list()
+    missing_cols = list()
+    for x, (icol, cfield, missing, is_nan, invalid, data_type) in enumerate(checked_columns):
+        rows = np.flatnonzero(missing)
+        if first_invalid is not None:
+            last_row = first_invalid[0] if x < first_invalid[1] else first_invalid[0] - 1
+            rows = rows[rows <= last_row]
+        missing_rows.append(rows)
+        missing_cols.append(np.full(len(rows), x, dtype=int))
+    if len(checked_columns) > 0:
+        missing_rows = np.concatenate(missing_rows)
+        missing_cols = np.concatenate(missing_cols)
+        for i in np.lexsort((missing_cols, missing_rows)):
+            icol, cfield, missing, is_nan, invalid, data_type = checked_columns[missing_cols[i]]
+            warn_missing_value(cfield, is_nan[missing_rows[i]])
+    if first_invalid is not None:
+        irow, x = first_invalid
+        icol, cfield, missing, is_nan, invalid, data_type = checked_columns[x]
+        warn_invalid_value(table.iloc[irow, icol], cfield, data_type)
+        return False
+    return True
 
 
-def check_unit_field(table, cfg):
-    def check_unit_value(cell_value, unit_value, cfield, filename):
-        if cell_has_value(cell_value) or cell_has_value(unit_value):
-            validator_warnings.append({
+@validation.rule(4999)
+def check_unit_field(table, cfg, ctx=None):
+    ctx = ctx or ValidationContext()
+    def check_unit_value(cell_values, unit_values, cfield, filename):
+        if (column_has_value(cell_values) | column_has_value(unit_values)).any():
+            ctx.warnings.append({
                 "message": "Cell found has unit but no value",
                 "supplemental": "Field '" + cfield.header + "' has a unit but not a value in the file '" + filename
                                 + "'",
@@ -2496,22 +2681,23 @@ def check_unit_field(table, cfg):
         return True
 
     result = True
+    cfg = isatab_configurator.compiled(cfg)
+    cfields = cfg.fields_by_header
+    ucfields = cfg.unit_fields_by_pos
     for icol, header in enumerate(table.columns):
-        cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == header]
-        if len(cfields) != 1:
+        if header not in cfields:
             continue
-        cfield = cfields[0]
-        ucfields = [i for i in cfg.get_isatab_configuration()[0].get_unit_field() if i.pos == cfield.pos + 1]
-        if len(ucfields) != 1:
+        cfield = cfields[header]
+        if cfield.pos + 1 not in ucfields:
             continue
-        ucfield = ucfields[0]
+        ucfield = ucfields[cfield.pos + 1]
         if ucfield.is_required:
             rheader = None
             rindx = icol + 1
             if rindx < len(table.columns):
                 rheader = table.columns[rindx]
             if rheader is None or rheader.lower() != 'unit':
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Cell requires a Unit",
                     "supplemental": "The field '" + header + "' in the file '" + table.filename + "' misses a required "
                                                                                                   "'Unit' column",
@@ -2521,13 +2707,14 @@ def check_unit_field(table, cfg):
                             "' misses a required 'Unit' column")
                 result = False
             else:
-                for irow in range(len(table.index)):
-                    result = result and check_unit_value(table.iloc[irow][icol], table.iloc[irow][rindx],
-                                                         cfield, table.filename)
+                result = result and check_unit_value(table.iloc[:, icol], table.iloc[:, rindx],
+                                                     cfield, table.filename)
     return result
 
 
-def check_protocol_fields(table, cfg, proto_map):
+@validation.rule(1007, 4009)
+def check_protocol_fields(table, cfg, proto_map, ctx=None):
+    ctx = ctx or ValidationContext()
     from itertools import tee
 
     def pairwise(iterable):  # A lovely pairwise iterator
@@ -2535,6 +2722,7 @@ def check_protocol_fields(table, cfg, proto_map):
         next(b, None)
         return zip(a, b)
 
+    cfg = isatab_configurator.compiled(cfg)
     proto_ref_index = [i for i in table.columns if 'protocol ref' in i.lower()]
     result = True
     for each in proto_ref_index:
@@ -2558,18 +2746,10 @@ def check_protocol_fields(table, cfg, proto_map):
         if last_proto_indx > last_mat_or_dat_indx:
             log.warning("(W) Protocol REF column without output in file '" + table.filename + "'")
         for left, right in pairwise(field_headers):
-            cleft = None
-            cright = None
-            clefts = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header.lower() == left.lower()]
-            if len(clefts) == 1:
-                cleft = clefts[0]
-            crights = [i for i in cfg.get_isatab_configuration()[0].get_field() if
-                       i.header.lower() == right.lower()]
-            if len(crights) == 1:
-                cright = crights[0]
+            cleft = cfg.fields_by_lower_header.get(left.lower())
+            cright = cfg.fields_by_lower_header.get(right.lower())
             if cleft is not None and cright is not None:
-                cprotos = [i.protocol_type for i in cfg.get_isatab_configuration()[0].get_protocol_field() if
-                           cleft.pos < i.pos and cright.pos > i.pos]
+                cprotos = cfg.protocol_types_between(cleft.pos, cright.pos)
                 fprotos_headers = [i for i in table.columns[
                                               table.columns.get_loc(cleft.header):table.columns.get_loc(
                                                   cright.header)] if
@@ -2581,7 +2761,7 @@ def check_protocol_fields(table, cfg, proto_map):
                         proto_type = proto_map[proto_name]
                         fprotos.append(proto_type)
                     except KeyError:
-                        validator_warnings.append({
+                        ctx.warnings.append({
                             "message": "Missing Protocol declaration",
                             "supplemental": " Could not find protocol type for protocol name '{}', trying to validate "
                                             "against name only".format(proto_name),
@@ -2592,7 +2772,7 @@ def check_protocol_fields(table, cfg, proto_map):
                         fprotos.append(proto_name)
                 invalid_protos = set(cprotos) - set(fprotos)
                 if len(invalid_protos) > 0:
-                    validator_warnings.append({
+                    ctx.warnings.append({
                         "message": "Missing Protocol declaration",
                         "supplemental": "Protocol(s) of type " + str(list(invalid_protos))
                                         + " defined in the ISA-configuration expected as a between '"
@@ -2607,12 +2787,15 @@ def check_protocol_fields(table, cfg, proto_map):
     return result
 
 
-def check_ontology_fields(table, cfg, tsrs):
-    def check_single_field(cell_value, source, acc, cfield, filename):
-        if (cell_has_value(cell_value) and not cell_has_value(
-                source) and cell_has_value(acc)) or not cell_has_value(
-                cell_value):
-            validator_warnings.append({
+@validation.rule(3008, 3010, 3011)
+def check_ontology_fields(table, cfg, tsrs, ctx=None):
+    ctx = ctx or ValidationContext()
+    def check_single_field(cell_values, sources, accs, cfield, filename):
+        has_value = column_has_value(cell_values)
+        incomplete = (has_value & ~column_has_value(sources) & column_has_value(accs)) | ~has_value
+        if incomplete.any():
+            source = sources.iloc[int(np.argmax(incomplete))]
+            ctx.warnings.append({
                 "message": "Missing Term Source REF in annotation or missing Term Source Name",
                 "supplemental": "Incomplete values for ontology headers, for the field '"
                                 + cfield.header + "' in the file '"
@@ -2623,7 +2806,7 @@ def check_ontology_fields(table, cfg, tsrs):
                 "(W) Incomplete values for ontology headers, for the field '" + cfield.header + "' in the file '" +
                 filename + "'. Check that all the label/accession/source are provided.")
             if source not in tsrs:
-                validator_warnings.append({
+                ctx.warnings.append({
                     "message": "Term Source REF reference broken",
                     "supplemental": "Term Source REF, for the field '"
                                     + cfield.header + "' in the file '"
@@ -2639,11 +2822,11 @@ def check_ontology_fields(table, cfg, tsrs):
 
     result = True
     nfields = len(table.columns)
+    cfields = isatab_configurator.compiled(cfg).fields_by_header
     for icol, header in enumerate(table.columns):
-        cfields = [i for i in cfg.get_isatab_configuration()[0].get_field() if i.header == header]
-        if len(cfields) != 1:
+        if header not in cfields:
             continue
-        cfield = cfields[0]
+        cfield = cfields[header]
         if cfield.get_recommended_ontologies() is None:
             continue
         rindx = icol + 1
@@ -2660,9 +2843,8 @@ def check_ontology_fields(table, cfg, tsrs):
             result = False
             continue
 
-        for irow in range(len(table.index)):
-            result = result and check_single_field(table.iloc[irow][icol], table.iloc[irow][rindx],
-                                                   table.iloc[irow][rrindx], cfield, table.filename)
+        result = result and check_single_field(table.iloc[:, icol], table.iloc[:, rindx],
+                                               table.iloc[:, rrindx], cfield, table.filename)
 
     return result
 
@@ -2680,11 +2862,13 @@ def get_num_study_groups(study_sample_table, study_filename):
     return num_study_groups
 
 
-def check_study_groups(table, filename, study_group_size_in_comment):
+@validation.rule(5001, 5002)
+def check_study_groups(table, filename, study_group_size_in_comment, ctx=None):
+    ctx = ctx or ValidationContext()
     num_study_groups = get_num_study_groups(table, filename)
     log.info('Found {} study groups in {}'.format(
             num_study_groups, filename))
-    validator_info.append({
+    ctx.info.append({
             'message': 'Found {} study groups in {}'.format(
                 num_study_groups, filename),
             'supplemental': 'Found {} study groups in {}'.format(
@@ -2695,7 +2879,7 @@ def check_study_groups(table, filename, study_group_size_in_comment):
                         study_group_size_in_comment != num_study_groups:
             log.warning('Study group size reported as {} but found {} in {}'
                         .format(study_group_size_in_comment, num_study_groups, filename))
-            validator_warnings.append({
+            ctx.warnings.append({
                 'message': 'Reported study group size does not match table'
                     .format(num_study_groups, filename),
                 'supplemental': 'Study group size reported as {} but found {} '
@@ -2707,50 +2891,265 @@ def check_study_groups(table, filename, study_group_size_in_comment):
     return True
 
 
-def validate(fp, config_dir=default_config_dir, log_level=None):
-    global validator_errors
-    global validator_warnings
-    global validator_info
-    validator_errors = []
-    validator_warnings = []
-    validator_info = []
+def get_table_filenames(i_df):
+    """Get the file names of the study and assay tables of an investigation
+
+    :param i_df: An investigation as loaded by load_investigation()
+    :return: List of the non-empty study and assay file names, in order
+    """
+    filenames = list()
+    for i, study_df in enumerate(i_df['studies']):
+        study_filename = study_df.iloc[0]['Study File Name']
+        if study_filename != '':
+            filenames.append(study_filename)
+        for assay_filename in i_df['s_assays'][i]['Study Assay File Name'].tolist():
+            if assay_filename != '':
+                filenames.append(assay_filename)
+    return filenames
+
+
+@validation.rule(1007, 3008, 3010, 3011, 4003, 4004, 4005, 4006, 4007, 4008, 4009, 4010, 4011, 4012, 4013, 4999,
+                  5001, 5002)
+def check_study_table(dir_context, study_filename, configs, protocol_names_and_types, term_source_refs,
+                      study_group_size_in_comment, ctx=None):
+    """Used for rules 1007, 3008, 3010, 3011, 4003-4013, 4999 and 5001-5002 on a
+    study sample table; returns False if the table file does not exist"""
+    ctx = ctx or ValidationContext()
+    try:
+        log.info("Loading... {}".format(study_filename))
+        study_sample_table = get_table(dir_context, study_filename, ctx=ctx)
+        study_sample_table.filename = study_filename
+        config = configs[('[sample]', '')]
+        log.info(
+            "Validating {} against default study table configuration".format(study_filename))
+        if ctx.selects(check_factor_value_presence):
+            log.info("Checking Factor Value presence...")
+            ctx.call(check_factor_value_presence, study_sample_table)  # Rule 4007
+        if ctx.selects(check_required_fields):
+            log.info("Checking required fields...")
+            ctx.call(check_required_fields, study_sample_table, config)  # Rule 4003-8, 4010, 4013
+        if ctx.selects(check_field_values):
+            log.info("Checking generic fields...")
+            if not ctx.call(check_field_values, study_sample_table, config):  # Rules 4010-4012
+                log.warning("(W) There are some field value inconsistencies in {} against {} "
+                            "configuration".format(study_sample_table.filename, 'Study Sample'))
+        if ctx.selects(check_unit_field):
+            log.info("Checking unit fields...")
+            if not ctx.call(check_unit_field, study_sample_table, config):
+                log.warning("(W) There are some unit value inconsistencies in {} against {} "
+                            "configuration".format(study_sample_table.filename, 'Study Sample'))
+        if ctx.selects(check_protocol_fields):
+            log.info("Checking protocol fields...")
+            if not ctx.call(check_protocol_fields, study_sample_table, config, protocol_names_and_types):  # Rules 1007 and 4009
+                log.warning("(W) There are some protocol inconsistencies in {} against {} "
+                            "configuration".format(study_sample_table.filename, 'Study Sample'))
+        if ctx.selects(check_ontology_fields):
+            log.info("Checking ontology fields...")
+            if not ctx.call(check_ontology_fields, study_sample_table, config, term_source_refs):  # Rules 3008, 3010 and 3011
+                log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
+                            "configuration".format(study_sample_table.filename, 'Study Sample'))
+        if ctx.selects(check_study_groups):
+            log.info("Checking study group size...")
+            ctx.call(check_study_groups, study_sample_table, study_filename, study_group_size_in_comment)
+        log.info("Finished validation on {}".format(study_filename))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+@validation.rule(1007, 3008, 3010, 3011, 4003, 4004, 4005, 4006, 4007, 4008, 4009, 4010, 4011, 4012, 4013, 4999,
+                  5001, 5002)
+def check_assay_table(dir_context, assay_filename, config, measurement_type, technology_type,
+                      protocol_names_and_types, term_source_refs, study_group_size_in_comment, ctx=None):
+    """Used for rules 1007, 3008, 3010, 3011, 4003-4013, 4999 and 5001-5002 on an
+    assay table; returns False if the table file does not exist"""
+    ctx = ctx or ValidationContext()
+    try:
+        log.info("Loading... {}".format(assay_filename))
+        assay_table = get_table(dir_context, assay_filename, ctx=ctx)
+        assay_table.filename = assay_filename
+        log.info(
+            "Validating {} against assay table configuration ({}, {})...".format(
+                assay_filename, measurement_type, technology_type))
+        if ctx.selects(check_factor_value_presence):
+            log.info("Checking Factor Value presence...")
+            ctx.call(check_factor_value_presence, assay_table)  # Rule 4007
+        if ctx.selects(check_required_fields):
+            log.info("Checking required fields...")
+            ctx.call(check_required_fields, assay_table, config)  # Rule 4003-8, 4010, 4013
+        if ctx.selects(check_field_values):
+            log.info("Checking generic fields...")
+            if not ctx.call(check_field_values, assay_table, config):  # Rules 4010-4012
+                log.warning(
+                    "(W) There are some field value inconsistencies in {} against {} configuration".format(
+                        assay_table.filename, (measurement_type, technology_type)))
+        if ctx.selects(check_unit_field):
+            log.info("Checking unit fields...")
+            if not ctx.call(check_unit_field, assay_table, config):
+                log.warning(
+                    "(W) There are some unit value inconsistencies in {} against {} configuration".format(
+                        assay_table.filename, (measurement_type, technology_type)))
+        if ctx.selects(check_protocol_fields):
+            log.info("Checking protocol fields...")
+            if not ctx.call(check_protocol_fields, assay_table, config, protocol_names_and_types):  # Rules 1007 and 4009
+                log.warning("(W) There are some protocol inconsistencies in {} against {} "
+                            "configuration".format(assay_table.filename, (measurement_type, technology_type)))
+        if ctx.selects(check_ontology_fields):
+            log.info("Checking ontology fields...")
+            if not ctx.call(check_ontology_fields, assay_table, config, term_source_refs):  # Rules 3008, 3010 and 3011
+                log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
+                            "configuration".format(assay_table.filename, (measurement_type, technology_type)))
+        if ctx.selects(check_study_groups):
+            log.info("Checking study group size...")
+            ctx.call(check_study_groups, assay_table, assay_filename, study_group_size_in_comment)
+        log.info("Finished validation on {}".format(assay_filename))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+@validation.rule(1003)
+def check_sample_names_in_files(dir_context, study_filename, assay_filenames, ctx=None):
+    """Used for rule 1003, on the study sample table and assay tables of a
+    study; table files that do not exist are skipped"""
+    ctx = ctx or ValidationContext()
+    try:
+        study_sample_table = get_table(dir_context, study_filename, ctx=ctx)
+    except FileNotFoundError:
+        return
+    study_sample_table.filename = study_filename
+    log.info("Checking consistencies between study sample table and assay tables...")
+    assay_tables = list()
+    for assay_filename in assay_filenames:
+        try:
+            assay_table = get_table(dir_context, assay_filename, ctx=ctx)
+        except FileNotFoundError:
+            continue
+        assay_table.filename = assay_filename
+        assay_tables.append(assay_table)
+    ctx.call(check_sample_names, study_sample_table, assay_tables)
+    log.info("Finished checking study sample table against assay tables...")
+
+
+@validation.rule(categories=('pooling',))
+def check_process_pooling(dir_context, study_filename, assay_filenames, protocol_names, ctx=None):
+    """Reports on processes pooling their inputs in a study and its assays,
+    from the study and assay tables
+
+    :return: A list of {filename: [process ids]} of the tables with pooling,
+        as returned by utils.detect_isatab_process_pooling()
+    """
+    from isatools import utils
+    ctx = ctx or ValidationContext()
+    report = []
+    try:
+        study_df = get_table(dir_context, study_filename, ctx=ctx)
+    except FileNotFoundError:
+        return report
+    log.info('Checking {}'.format(study_filename))
+    pooling_list = utils.detect_table_process_pooling(study_df, protocol_names=protocol_names)
+    if len(pooling_list) > 0:
+        report.append({study_filename: pooling_list})
+    for assay_filename in assay_filenames:
+        try:
+            assay_df = get_table(dir_context, assay_filename, ctx=ctx)
+        except FileNotFoundError:
+            continue
+        log.info('Checking {}'.format(assay_filename))
+        pooling_list = utils.detect_table_process_pooling(assay_df, study_DF=study_df,
+                                                          protocol_names=protocol_names)
+        if len(pooling_list) > 0:
+            report.append({assay_filename: pooling_list})
+    return report
+
+
+def validate(fp, config_dir=default_config_dir, log_level=None, cache=None, rules=None, max_errors=None,
+             detect_pooling=True, check_data_files_exist=False, profile=False, hooks=None):
+    """Validate an ISA-Tab archive
+
+    :param fp: File descriptor of the investigation file of the ISA-Tab
+    :param config_dir: Path to a directory of XML table configurations
+    :param log_level: Logging level of the isatools logger for this run
+    :param cache: Optional validation.ValidationCache; rules whose files have
+        not changed since an earlier validation with the same cache replay
+        their findings instead of running again
+    :param rules: Optional iterable of rule codes (e.g. 1003) and categories
+        (e.g. 'configuration', see validation.RULE_CATEGORIES) to restrict
+        the validation to; the investigation file and configurations are
+        always loaded
+    :param max_errors: Stop validating once this many errors have been
+        found, e.g. 1 to fail fast; validation_finished is then False
+    :param detect_pooling: Whether to run the process pooling detection on
+        the study and assay tables
+    :param check_data_files_exist: Whether to check that the data files
+        referred to in the assay tables exist next to the investigation file
+        (rule 0011); this rule is never replayed from the cache
+    :param profile: If True, the report also holds a profile of the wall
+        time, rows, cells and bytes read of each rule (see
+        validation.ValidationContext.profiled)
+    :param hooks: Optional list of callables, each called with the profile
+        record of every rule once it has run
+    :return: A report dict of errors, warnings, info, log and
+        validation_finished, and profile if asked for
+    """
+    selection = None
+    if rules is not None:
+        selection = validation.RuleSelection(rules)
+    ctx = ValidationContext(cache=cache, selection=selection, max_errors=max_errors, profile=profile, hooks=hooks)
     if log_level in (
         logging.NOTSET, logging.DEBUG, logging.INFO, logging.WARNING,
         logging.ERROR, logging.CRITICAL):
         log.setLevel(log_level)
     log.info("ISA tab Validator from ISA tools API v0.6")
-    stream = StringIO()
-    handler = logging.StreamHandler(stream)
-    log.addHandler(handler)
+    log_capture = validation.LogCapture(log).start()
     validation_finished = False
     try:
-        # check_utf8(fp)  # skip as does not correctly report right now
+        log.info("Checking if encoding is UTF8")
+        ctx.run(check_utf8, fp, files=[fp.name])  # Rule 0010
         log.info("Loading... {}".format(fp.name))
-        i_df = load_investigation(fp=fp)
+        with ctx.profiled('load_investigation'):
+            try:
+                i_df = load_investigation(fp=fp, ctx=ctx)
+            except UnicodeDecodeError:
+                # not in the encoding fp was opened with, reported by rule 0010
+                with open(fp.name, 'rb') as b_fp:
+                    text_fp, _ = validation.read_text(b_fp)
+                i_df = load_investigation(fp=text_fp, ctx=ctx)
+            ctx.account(os.path.basename(fp.name), bytes_read=validation.file_size(fp))
+        dir_context = os.path.dirname(fp.name)
+        i_files = [fp.name]
+        table_files = [os.path.join(dir_context, filename) for filename in get_table_filenames(i_df)]
+        if cache is not None:
+            ctx.cache_key = (os.path.abspath(config_dir), isatab_configurator.config_dir_signature(config_dir),
+                             log.getEffectiveLevel(), repr(selection))
         log.info("Running prechecks...")
-        check_filenames_present(i_df)  # Rule 3005
-        check_table_files_read(i_df, os.path.dirname(fp.name))  # Rules 0006 and 0008
-        # check_table_files_load(i_df, os.path.dirname(fp.name))  # Rules 0007 and 0009, covered by later validation?
-        check_samples_not_declared_in_study_used_in_assay(i_df, os.path.dirname(fp.name))  # Rule 1003
-        check_study_factor_usage(i_df, os.path.dirname(fp.name))  # Rules 1008 and 1021
-        check_protocol_usage(i_df, os.path.dirname(fp.name))  # Rules 1007 and 1019
-        check_protocol_parameter_usage(i_df, os.path.dirname(fp.name))  # Rules 1009 and 1020
-        check_date_formats(i_df)  # Rule 3001
-        check_dois(i_df)  # Rule 3002
-        check_pubmed_ids_format(i_df)  # Rule 3003
-        check_protocol_names(i_df)  # Rule 1010
-        check_protocol_parameter_names(i_df)  # Rule 1011
-        check_study_factor_names(i_df)  # Rule 1012
-        term_source_refs = check_ontology_sources(i_df)  # Rule 3008
+        ctx.run(check_filenames_present, i_df, files=i_files)  # Rule 3005
+        ctx.run(check_table_files_read, i_df, dir_context, files=i_files + table_files)  # Rules 0006 and 0008
+        ctx.run(check_table_files_utf8, i_df, dir_context, files=i_files + table_files)  # Rule 0010
+        if check_data_files_exist:
+            ctx.run(check_data_files, i_df, dir_context, cacheable=False)  # Rule 0011
+        # check_table_files_load(i_df, dir_context)  # Rules 0007 and 0009, covered by later validation?
+        ctx.run(check_samples_not_declared_in_study_used_in_assay, i_df, dir_context,
+                files=i_files + table_files)  # Rule 1003
+        ctx.run(check_study_factor_usage, i_df, dir_context, files=i_files + table_files)  # Rules 1008 and 1021
+        ctx.run(check_protocol_usage, i_df, dir_context, files=i_files + table_files)  # Rules 1007 and 1019
+        ctx.run(check_protocol_parameter_usage, i_df, dir_context, files=i_files + table_files)  # Rules 1009 and 1020
+        ctx.run(check_date_formats, i_df, files=i_files)  # Rule 3001
+        ctx.run(check_dois, i_df, files=i_files)  # Rule 3002
+        ctx.run(check_pubmed_ids_format, i_df, files=i_files)  # Rule 3003
+        ctx.run(check_protocol_names, i_df, files=i_files)  # Rule 1010
+        ctx.run(check_protocol_parameter_names, i_df, files=i_files)  # Rule 1011
+        ctx.run(check_study_factor_names, i_df, files=i_files)  # Rule 1012
+        term_source_refs = ctx.run(check_ontology_sources, i_df, files=i_files)  # Rule 3008
         log.info("Finished prechecks...")
         log.info("Loading configurations found in {}".format(config_dir))
-        configs = load_config(config_dir)  # Rule 4001
+        configs = ctx.call(load_config, config_dir)  # Rule 4001
         if configs is None:
             raise SystemError("No configuration to load so cannot proceed with validation!")
         log.info("Using configurations found in {}".format(config_dir))
-        check_measurement_technology_types(i_df, configs)  # Rule 4002
+        ctx.run(check_measurement_technology_types, i_df, configs, files=i_files)  # Rule 4002
         log.info("Checking investigation file against configuration...")
-        check_investigation_against_config(i_df, configs)  # Rule 4003 for investigation file only
+        ctx.run(check_investigation_against_config, i_df, configs, files=i_files)  # Rule 4003 for investigation file only
         log.info("Finished checking investigation file")
         for i, study_df in enumerate(i_df['studies']):
             study_group_size_in_comment = None
@@ -2758,45 +3157,17 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
                 study_group_sizes = study_df[NUMBER_OF_STUDY_GROUPS]
                 study_group_size_in_comment = next(iter(study_group_sizes))
             study_filename = study_df.iloc[0]['Study File Name']
-            study_sample_table = None
-            assay_tables = list()
+            assay_filenames = list()
             if study_filename is not '':
                 protocol_names = i_df['s_protocols'][i]['Study Protocol Name'].tolist()
                 protocol_types = i_df['s_protocols'][i]['Study Protocol Type'].tolist()
                 protocol_names_and_types = dict(zip(protocol_names, protocol_types))
-                try:
-                    log.info("Loading... {}".format(study_filename))
-                    with open(os.path.join(os.path.dirname(fp.name), study_filename), encoding='utf-8') as s_fp:
-                        study_sample_table = load_table(s_fp)
-                        study_sample_table.filename = study_filename
-                        config = configs[('[sample]', '')]
-                        log.info(
-                            "Validating {} against default study table configuration".format(study_filename))
-                        log.info("Checking Factor Value presence...")
-                        check_factor_value_presence(study_sample_table)  # Rule 4007
-                        log.info("Checking required fields...")
-                        check_required_fields(study_sample_table, config)  # Rule 4003-8, 4010
-                        log.info("Checking generic fields...")
-                        if not check_field_values(study_sample_table, config):  # Rule 4011
-                            log.warning("(W) There are some field value inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking unit fields...")
-                        if not check_unit_field(study_sample_table, config):
-                            log.warning("(W) There are some unit value inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking protocol fields...")
-                        if not check_protocol_fields(study_sample_table, config, protocol_names_and_types):  # Rule 4009
-                            log.warning("(W) There are some protocol inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking ontology fields...")
-                        if not check_ontology_fields(study_sample_table, config, term_source_refs):  # Rule 3010
-                            log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
-                                        "configuration".format(study_sample_table.filename, 'Study Sample'))
-                        log.info("Checking study group size...")
-                        check_study_groups(study_sample_table, study_filename, study_group_size_in_comment)
-                        log.info("Finished validation on {}".format(study_filename))
-                except FileNotFoundError:
-                    pass
+                ctx.run(
+                    check_study_table, dir_context, study_filename, configs, protocol_names_and_types,
+                    term_source_refs, study_group_size_in_comment,
+                    files=[os.path.join(dir_context, study_filename)],
+                    params=(study_filename, sorted(protocol_names_and_types.items()), term_source_refs,
+                            study_group_size_in_comment))
                 assay_df = i_df['s_assays'][i]
                 study_group_size_in_comment = None
                 if NUMBER_OF_STUDY_GROUPS in assay_df.columns:
@@ -2820,59 +3191,31 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
                         if config is None:
                             log.warning("Skipping configuration validation as could not load config...")
                         else:
-                            try:
-                                log.info("Loading... {}".format(assay_filename))
-                                with open(os.path.join(os.path.dirname(fp.name), assay_filename), encoding='utf-8') as a_fp:
-                                    assay_table = load_table(a_fp)
-                                    assay_table.filename = assay_filename
-                                    assay_tables.append(assay_table)
-                                    log.info(
-                                        "Validating {} against assay table configuration ({}, {})...".format(
-                                            assay_filename, measurement_type, technology_type))
-                                    log.info("Checking Factor Value presence...")
-                                    check_factor_value_presence(assay_table)  # Rule 4007
-                                    log.info("Checking required fields...")
-                                    check_required_fields(assay_table, config)  # Rule 4003-8, 4010
-                                    log.info("Checking generic fields...")
-                                    if not check_field_values(assay_table, config):  # Rule 4011
-                                        log.warning(
-                                            "(W) There are some field value inconsistencies in {} against {} configuration".format(
-                                                assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking unit fields...")
-                                    if not check_unit_field(assay_table, config):
-                                        log.warning(
-                                            "(W) There are some unit value inconsistencies in {} against {} configuration".format(
-                                                assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking protocol fields...")
-                                    if not check_protocol_fields(assay_table, config, protocol_names_and_types):  # Rule 4009
-                                        log.warning("(W) There are some protocol inconsistencies in {} against {} "
-                                                    "configuration".format(assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking ontology fields...")
-                                    if not check_ontology_fields(assay_table, config, term_source_refs):  # Rule 3010
-                                        log.warning("(W) There are some ontology annotation inconsistencies in {} against {} "
-                                                    "configuration".format(assay_table.filename, (measurement_type, technology_type)))
-                                    log.info("Checking study group size...")
-                                    check_study_groups(assay_table, assay_filename, study_group_size_in_comment)
-                                    log.info("Finished validation on {}".format(assay_filename))
-                            except FileNotFoundError:
-                                pass
-                        if study_sample_table is not None:
-                            log.info("Checking consistencies between study sample table and assay tables...")
-                            check_sample_names(study_sample_table, assay_tables)
-                            log.info("Finished checking study sample table against assay tables...")
-            if len(validator_errors) != 0:
+                            ctx.run(check_assay_table, dir_context, assay_filename, config, measurement_type,
+                                    technology_type, protocol_names_and_types, term_source_refs,
+                                    study_group_size_in_comment,
+                                    files=[os.path.join(dir_context, assay_filename)],
+                                    params=(assay_filename, measurement_type, technology_type,
+                                            sorted(protocol_names_and_types.items()), term_source_refs,
+                                            study_group_size_in_comment))
+                            assay_filenames.append(assay_filename)
+                        ctx.run(check_sample_names_in_files, dir_context, study_filename, list(assay_filenames),
+                                files=[os.path.join(dir_context, f) for f in [study_filename] + assay_filenames],
+                                params=(study_filename, tuple(assay_filenames)))
+            if len(ctx.errors) != 0:
                 log.info("Skipping pooling test as there are outstanding errors")
-            else:
-                from isatools import utils
-                try:
-                    fp.seek(0)
-                    utils.detect_isatab_process_pooling(fp)
-                except:
-                    pass
+            elif detect_pooling and study_filename != '':
+                study_assay_filenames = [x for x in i_df['s_assays'][i]['Study Assay File Name'].tolist() if x != '']
+                protocol_names = i_df['s_protocols'][i]['Study Protocol Name'].tolist()
+                ctx.run(check_process_pooling, dir_context, study_filename, study_assay_filenames, protocol_names,
+                        files=[os.path.join(dir_context, f) for f in [study_filename] + study_assay_filenames],
+                        params=(study_filename, tuple(study_assay_filenames), tuple(protocol_names)))
         log.info("Finished validation...")
         validation_finished = True
+    except validation.StopValidation as sv:
+        log.info("{}, skipping the rest of the validation".format(sv))
     except ParserError as cpe:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(cpe)),
             "code": 0
@@ -2880,7 +3223,7 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
         log.fatal("(F) There was an error when trying to parse the ISA tab")
         log.fatal(cpe)
     except ValueError as ve:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(ve)),
             "code": 0
@@ -2888,7 +3231,7 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
         log.fatal("(F) There was an error when trying to parse the ISA tab")
         log.fatal(ve)
     except SystemError as se:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(se)),
             "code": 0
@@ -2896,7 +3239,7 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
         log.fatal("(F) Something went very very wrong! :(")
         log.fatal(se)
     except Exception as e:
-        validator_errors.append({
+        ctx.errors.append({
             "message": "Unknown/System Error",
             "supplemental": "The validator could not identify what the error is: {}".format(str(e)),
             "code": 0
@@ -2904,18 +3247,48 @@ def validate(fp, config_dir=default_config_dir, log_level=None):
         log.fatal("(F) Something went very very wrong! :(")
         log.fatal(e)
     finally:
-        handler.flush()
-        return {
-            "errors": validator_errors,
-            "warnings": validator_warnings,
-            "info": validator_info,
+        log_capture.stop()
+        report = {
+            "errors": ctx.errors,
+            "warnings": ctx.warnings,
+            "info": ctx.info,
+            "log": log_capture.messages,
             "validation_finished": validation_finished
         }
+        if ctx.profile is not None:
+            report["profile"] = ctx.profile
+        return report
+
+
+def _batch_validate_tab_dir(tab_dir):
+    log.info("***Validating {}***\n".format(tab_dir))
+    i_files = glob.glob(os.path.join(tab_dir, 'i_*.txt'))
+    if len(i_files) != 1:
+        log.warning("Could not find an investigation file, skipping {}".format(tab_dir))
+        return None
+    with open(i_files[0], encoding='utf-8') as fp:
+        return {
+            "filename": fp.name,
+            "report": validate(fp)
+        }
 
 
-def batch_validate(tab_dir_list):
+def iter_batch_validate(tab_dir_list, workers=None):
+    """ Validate a batch of ISA-Tab archives, yielding each file's report as
+    soon as it completes
+    :param tab_dir_list: List of file paths to the ISA-Tab archives to validate
+    :param workers: Number of processes to validate with in parallel
+    :return: iterator of batch report entries, in order of completion
+    """
+    for _, entry in validation.iter_batch(_batch_validate_tab_dir, tab_dir_list, workers):
+        if entry is not None:
+            yield entry
+
+
+def batch_validate(tab_dir_list, workers=None):
     """ Validate a batch of ISA-Tab archives
     :param tab_dir_list: List of file paths to the ISA-Tab archives to validate
+    :param workers: Number of processes to validate with in parallel
     :return: batch report as JSON
 
     Example:
@@ -2924,24 +3297,13 @@ def batch_validate(tab_dir_list):
             '/path/to/study1/',
             '/path/to/study2/'
         ]
-        batch_report = isatab.batch_validate(my_tabs, '/path/to/report.txt')
+        batch_report = isatab.batch_validate(my_tabs, workers=4)
     """
+    entries = sorted(validation.iter_batch(_batch_validate_tab_dir, tab_dir_list, workers),
+                     key=lambda x: x[0])
     batch_report = {
-        "batch_report": []
+        "batch_report": [entry for _, entry in entries if entry is not None]
     }
-    for tab_dir in tab_dir_list:
-        log.info("***Validating {}***\n".format(tab_dir))
-        i_files = glob.glob(os.path.join(tab_dir, 'i_*.txt'))
-        if len(i_files) != 1:
-            log.warning("Could not find an investigation file, skipping {}".format(tab_dir))
-        else:
-            with open(i_files[0], encoding='utf-8') as fp:
-                batch_report['batch_report'].append(
-                    {
-                        "filename": fp.name,
-                        "report": validate(fp)
-                    }
-                )
     return batch_report
 
 
@@ -2989,6 +3351,70 @@ def dump_tables_to_dataframes(isa_obj):
     return output
 
 
+def _link_protocols(processes, study, protocol_map):
+    # replace the Protocol REF names of processes by the study protocols,
+    # adding an unknown protocol to the study for names it does not declare
+    for process in processes:
+        try:
+            process.executes_protocol = protocol_map[process.executes_protocol]
+        except KeyError:
+            try:
+                unknown_protocol = protocol_map['unknown']
+            except KeyError:
+                protocol_map['unknown'] = Protocol(
+                    name="unknown protocol",
+                    description="This protocol was auto-generated where a protocol could not be determined.")
+                unknown_protocol = protocol_map['unknown']
+                study.protocols.append(unknown_protocol)
+            process.executes_protocol = unknown_protocol
+
+
+def load_study_table(study, path, ontology_sources, protocol_map):
+    """Load the sources, samples and processes of a study from its table
+
+    :param study: Study, with its protocols and factors loaded
+    :param path: Path of the study table file
+    :param ontology_sources: Ontology source references of the investigation
+    :param protocol_map: Dict of protocol names to the study protocols; an
+        unknown protocol is added to it and to the study if needed
+    """
+    study_tfile_df = read_tfile(path)
+    sources, samples, _, __, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
+        ontology_sources=ontology_sources, study_protocols=study.protocols,
+        study_factors=study.factors).create_from_df(study_tfile_df)
+    study.sources = sorted(list(sources.values()), key=lambda x: x.name, reverse=False)
+    study.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
+    study.process_sequence = list(processes.values())
+    study.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
+    study.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
+    _link_protocols(study.process_sequence, study, protocol_map)
+
+
+def load_assay_table(assay, study, path, ontology_sources, protocol_map):
+    """Load the samples, materials, data files and processes of an assay
+
+    :param assay: Assay to load the table of
+    :param study: Study of the assay, with its study table loaded
+    :param path: Path of the assay table file
+    :param ontology_sources: Ontology source references of the investigation
+    :param protocol_map: Dict of protocol names to the study protocols; an
+        unknown protocol is added to it and to the study if needed
+    """
+    assay_tfile_df = read_tfile(path)
+    _, samples, other, data, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
+        ontology_sources=ontology_sources,
+        study_samples=study.samples,
+        study_protocols=study.protocols,
+        study_factors=study.factors).create_from_df(assay_tfile_df)
+    assay.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
+    assay.other_material = sorted(list(other.values()), key=lambda x:x.name, reverse=False)
+    assay.data_files = sorted(list(data.values()), key=lambda x:x.filename, reverse=False)
+    assay.process_sequence = list(processes.values())
+    assay.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
+    assay.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
+    _link_protocols(assay.process_sequence, study, protocol_map)
+
+
 def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigation file
 
     def get_ontology_source(term_source_ref):
@@ -3183,29 +3609,8 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
             if skip_load_tables:
                 pass
             else:
-                study_tfile_df = read_tfile(os.path.join(os.path.dirname(FP.name), study.filename))
-                sources, samples, _, __, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
-                    ontology_sources=investigation.ontology_source_references, study_protocols=study.protocols,
-                    study_factors=study.factors).create_from_df(study_tfile_df)
-                study.sources = sorted(list(sources.values()), key=lambda x: x.name, reverse=False)
-                study.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
-                study.process_sequence = list(processes.values())
-                study.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
-                study.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
-
-                for process in study.process_sequence:
-                    try:
-                        process.executes_protocol = protocol_map[process.executes_protocol]
-                    except KeyError:
-                        try:
-                            unknown_protocol = protocol_map['unknown']
-                        except KeyError:
-                            protocol_map['unknown'] = Protocol(
-                                name="unknown protocol",
-                                description="This protocol was auto-generated where a protocol could not be determined.")
-                            unknown_protocol = protocol_map['unknown']
-                            study.protocols.append(unknown_protocol)
-                        process.executes_protocol = unknown_protocol
+                load_study_table(study, os.path.join(os.path.dirname(FP.name), study.filename),
+                                 investigation.ontology_source_references, protocol_map)
 
             for _, row in df_dict['s_assays'][i].iterrows():
                 assay = Assay()
@@ -3224,32 +3629,8 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
                 if skip_load_tables:
                     pass
                 else:
-                    assay_tfile_df = read_tfile(os.path.join(os.path.dirname(FP.name), assay.filename))
-                    _, samples, other, data, processes, characteristic_categories, unit_categories = ProcessSequenceFactory(
-                        ontology_sources=investigation.ontology_source_references,
-                        study_samples=study.samples,
-                        study_protocols=study.protocols,
-                        study_factors=study.factors).create_from_df(assay_tfile_df)
-                    assay.samples = sorted(list(samples.values()), key=lambda x: x.name, reverse=False)
-                    assay.other_material = sorted(list(other.values()), key=lambda x:x.name, reverse=False)
-                    assay.data_files = sorted(list(data.values()), key=lambda x:x.filename, reverse=False)
-                    assay.process_sequence = list(processes.values())
-                    assay.characteristic_categories = sorted(list(characteristic_categories.values()), key=lambda x: x.term, reverse=False)
-                    assay.units = sorted(list(unit_categories.values()), key=lambda x: x.term, reverse=False)
-
-                    for process in assay.process_sequence:
-                        try:
-                            process.executes_protocol = protocol_map[process.executes_protocol]
-                        except KeyError:
-                            try:
-                                unknown_protocol = protocol_map['unknown']
-                            except KeyError:
-                                protocol_map['unknown'] = Protocol(
-                                    name="unknown protocol",
-                                    description="This protocol was auto-generated where a protocol could not be determined.")
-                                unknown_protocol = protocol_map['unknown']
-                                study.protocols.append(unknown_protocol)
-                            process.executes_protocol = unknown_protocol
+                    load_assay_table(assay, study, os.path.join(os.path.dirname(FP.name), assay.filename),
+                                     investigation.ontology_source_references, protocol_map)
 
                 study.assays.append(assay)
             investigation.studies.append(study)
@@ -3258,7 +3639,8 @@ def load(isatab_path_or_ifile, skip_load_tables=False):  # from DF of investigat
     return investigation
 
 
-def process_keygen(protocol_ref, column_group, object_label_index, all_columns, series, series_index, DF):
+def process_keygen(protocol_ref, column_group, object_label_index, all_columns, series, series_index, DF,
+                   key_cache=None):
     name_column_hits = [n for n in column_group if n in _LABELS_ASSAY_NODES]
     if len(name_column_hits) == 1:
         return series[name_column_hits[0]]
@@ -3277,10 +3659,19 @@ def process_keygen(protocol_ref, column_group, object_label_index, all_columns,
         input_node_label = all_columns[input_node_index]
         input_node_value = str(series[input_node_label])
 
-    input_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[input_node_index]]].drop_duplicates()
-    output_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[output_node_index]]].drop_duplicates()
+    # which side keys the process only depends on the columns, so when given
+    # a key_cache dict it is worked out once per Protocol REF of the table
+    cache_key = (object_label_index, input_node_index, output_node_index)
+    if key_cache is not None and cache_key in key_cache:
+        key_on_output = key_cache[cache_key]
+    else:
+        input_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[input_node_index]]].drop_duplicates()
+        output_nodes_with_prot_keys = DF[[all_columns[object_label_index], all_columns[output_node_index]]].drop_duplicates()
+        key_on_output = len(input_nodes_with_prot_keys) > len(output_nodes_with_prot_keys)
+        if key_cache is not None:
+            key_cache[cache_key] = key_on_output
 
-    if len(input_nodes_with_prot_keys) > len(output_nodes_with_prot_keys):
+    if key_on_output:
         node_key = output_node_value
     else:
         node_key = input_node_value
@@ -3611,6 +4002,7 @@ class ProcessSequenceFactory:
     def create_from_df(self, DF):  # from DF of a table file
 
         DF = preprocess(DF=DF)
+        key_cache = dict()
 
         if self.ontology_sources is not None:
             ontology_source_map = dict(
@@ -3900,7 +4292,7 @@ class ProcessSequenceFactory:
                     protocol_ref = str(object_series[object_label])
                     process_key = process_keygen(
                         protocol_ref, column_group, _cg, DF.columns, 
-                        object_series, _, DF)
+                        object_series, _, DF, key_cache=key_cache)
 
                     # TODO: Keep process key sequence here to reduce number of passes on Protocol REF columns?
 
@@ -4053,7 +4445,7 @@ class ProcessSequenceFactory:
                     protocol_ref = str(object_series[object_label])
                     process_key = process_keygen(
                         protocol_ref, column_group, _cg, DF.columns,
-                        object_series, _, DF)
+                        object_series, _, DF, key_cache=key_cache)
                     process_key_sequence.append(process_key)
 
                 if object_label.endswith(' File'):
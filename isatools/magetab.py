@@ -8,6 +8,8 @@ import numpy as np
 import os
 import pandas as pd
 import re
+import shutil
+from collections import OrderedDict
 from io import StringIO
 from itertools import zip_longest
 
@@ -318,30 +320,55 @@ def write_idf_file(inv_obj, output_path):
         idf_df.to_csv(path_or_buf=idf_fp, index=True, sep='\t', encoding='utf-8', index_label="MAGE-TAB Version")
 
 
-def write_sdrf_table_files(i, output_path):
-    tmp = tempfile.mkdtemp()
-    isatab.write_study_table_files(inv_obj=i, output_dir=tmp)
-    isatab.write_assay_table_files(inv_obj=i, output_dir=tmp)
-    for study in i.studies:
-        for assay in [x for x in study.assays if x.technology_type.term.lower() == "dna microarray"]:
-            sdrf_filename = study.filename[2:-3] + assay.filename[2:-3] + "sdrf.txt"
-            log.debug("Writing {}".format(sdrf_filename))
-            try:
-                isatab.merge_study_with_assay_tables(os.path.join(tmp, study.filename),
-                                                     os.path.join(tmp, assay.filename),
-                                                     os.path.join(output_path, sdrf_filename))
-            except FileNotFoundError:
-                raise IOError("There was a problem merging intermediate ISA-Tab files into SDRF")
-
-
-def dump(inv_obj, output_path):
+def write_sdrf_table_files(i, output_path, isatab_dir=None):
+    """Writes an SDRF file for each DNA microarray assay, joining the study and
+    assay tables on Sample Name
+
+    :param i: Investigation object
+    :param output_path: Path to directory to write the SDRF files to
+    :param isatab_dir: Path to a directory holding the investigation's ISA-Tab
+        table files to translate column-wise. If None, the tables are written
+        out from the study and assay objects first
+    """
+    tmp = None
+    if isatab_dir is None:
+        tmp = tempfile.mkdtemp()
+        isatab.write_study_table_files(inv_obj=i, output_dir=tmp)
+        isatab.write_assay_table_files(inv_obj=i, output_dir=tmp)
+        isatab_dir = tmp
+    try:
+        for study in i.studies:
+            for assay in [x for x in study.assays if x.technology_type.term.lower() == "dna microarray"]:
+                sdrf_filename = study.filename[2:-3] + assay.filename[2:-3] + "sdrf.txt"
+                log.debug("Writing {}".format(sdrf_filename))
+                try:
+                    isatab.merge_study_with_assay_tables(os.path.join(isatab_dir, study.filename),
+                                                         os.path.join(isatab_dir, assay.filename),
+                                                         os.path.join(output_path, sdrf_filename))
+                except FileNotFoundError:
+                    raise IOError("There was a problem merging intermediate ISA-Tab files into SDRF")
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp)
+
+
+def dump(inv_obj, output_path, isatab_dir=None):
+    """Writes an investigation out as MAGE-TAB IDF and SDRF files
+
+    :param inv_obj: Investigation object
+    :param output_path: Path to directory to write the MAGE-TAB files to
+    :param isatab_dir: Path to a directory holding the investigation's ISA-Tab
+        table files, so the SDRFs are translated from them rather than from the
+        investigation's process sequences; see write_sdrf_table_files
+    :return: The Investigation object
+    """
     num_microarray_assays = 0
     for study in inv_obj.studies:
         num_microarray_assays += len([x for x in study.assays if x.technology_type.term.lower() == "dna microarray"])
 
     if num_microarray_assays > 0:
         write_idf_file(inv_obj, output_path=output_path)
-        write_sdrf_table_files(i=inv_obj, output_path=output_path)
+        write_sdrf_table_files(i=inv_obj, output_path=output_path, isatab_dir=isatab_dir)
     else:
         raise IOError("Input must contain at least one assay of type DNA microarray, halt writing MAGE-TAB")
     return inv_obj
@@ -761,16 +788,16 @@ class MageTabParser(object):
     def split_assay(self, fp):
         assay_files = []
         header = fp.readline()
-        chip_seq_records = [header]
-        rna_seq_records = [header]
-        me_seq_records = [header]
-        tf_seq_records = [header]
-        genechip_records = [header]
-        chipchip_records = [header]
+        lines = fp.readlines()
+        sqlines = _get_squashed_lines(lines)
+        no_lines = np.zeros(len(lines), dtype=bool)
+        all_lines = np.ones(len(lines), dtype=bool)
 
-        default_records = [header]
-
-        assay_types = set()
+        def contains(*words):
+            mask = no_lines
+            for word in words:
+                mask = mask | np.fromiter((word in sqline for sqline in sqlines), dtype=bool, count=len(sqlines))
+            return mask
 
         is_hybridization_assay = 'hybridization' in get_squashed(header)
         contains_antibody_in_header = 'antibody' in get_squashed(header)
@@ -778,53 +805,76 @@ class MageTabParser(object):
         A = self.ISA.studies[-1].assays[-1]
 
         log.info("Reading assay memory file; mt=%s, tt=%s", A.measurement_type.term, A.technology_type.term)
-        for line in fp.readlines():
-            sqline = get_squashed(line)
-            if A.measurement_type and A.technology_type:
-                if 'sequencing' in get_squashed(A.technology_type.term) \
-                        and 'protein-dnabindingsiteidentification' == get_squashed(A.measurement_type.term):
-                    if not is_hybridization_assay and 'chip-seq' in sqline or 'chipseq' in sqline:
-                        assay_types.add('ChIP-Seq')
-                        chip_seq_records.append(line)
-                    if 'bisulfite-seq' in sqline or 'mre-seq' in sqline or 'mbd-seq' in sqline or 'medip-seq' in sqline:
-                        assay_types.add('ME-Seq')
-                        me_seq_records.append(line)
-                    if 'dnase-hypersensitivity' in sqline or 'mnase-seq' in sqline:
-                        assay_types.add('Chromatin-Seq')
-                        tf_seq_records.append(line)
-
-            if is_hybridization_assay and ('genomicdna' in sqline or 'genomic_dna' in sqline) and 'mnase-seq' not in sqline:
-                assay_types.add('ChIP-Seq')
-                chip_seq_records.append(line)
-
-            if hasattr(A, '_design_type'):
-                if 'dye_swap_design' == get_squashed(A._design_type):
-                    assay_types.add('Hybridization')
-                    genechip_records.append(line)
-
-                if 'chip-chipbytilingarray' in get_squashed(A._design_type):
-                    assay_types.add('ChIP-chip by tiling array')
-                    chipchip_records.append(line)
-
-            if (is_hybridization_assay and not contains_antibody_in_header) and 'rna' in sqline \
-                    or 'genomicdna' in sqline:
-                assay_types.add('transcription profiling by array')
-                genechip_records.append(line)
-
-            if (not is_hybridization_assay and ('genomicdna' in sqline or 'genomic_dna' in sqline)) \
-                    and 'mnase-seq' in sqline:
-                assay_types.add('ChIP-Seq')
-                chip_seq_records.append(line)
-
-            if not is_hybridization_assay and ('rna-seq' in sqline or 'totalrna' in sqline):
-                assay_types.add('RNA-Seq')
-                rna_seq_records.append(line)
-
-            if is_hybridization_assay and contains_antibody_in_header and ('genomicdna' in sqline or 'chip' in sqline):
-                assay_types.add('ChIP-chip')
-                chipchip_records.append(line)
-            else:
-                default_records.append(line)
+        # classify all the rows at once, keeping how many times each row goes to each set of records
+        chip_seq_hits = [no_lines]
+        me_seq_hits = [no_lines]
+        tf_seq_hits = [no_lines]
+        genechip_hits = [no_lines]
+        chipchip_hits = [no_lines]
+        type_hits = OrderedDict()
+
+        if A.measurement_type and A.technology_type:
+            if 'sequencing' in get_squashed(A.technology_type.term) \
+                    and 'protein-dnabindingsiteidentification' == get_squashed(A.measurement_type.term):
+                if is_hybridization_assay:
+                    chip_seq_hits.append(contains('chipseq'))
+                else:
+                    chip_seq_hits.append(contains('chip-seq', 'chipseq'))
+                me_seq_hits.append(contains('bisulfite-seq', 'mre-seq', 'mbd-seq', 'medip-seq'))
+                tf_seq_hits.append(contains('dnase-hypersensitivity', 'mnase-seq'))
+
+        if is_hybridization_assay:
+            chip_seq_hits.append(contains('genomicdna', 'genomic_dna') & ~contains('mnase-seq'))
+
+        if hasattr(A, '_design_type'):
+            if 'dye_swap_design' == get_squashed(A._design_type):
+                type_hits['Hybridization'] = all_lines
+                genechip_hits.append(all_lines)
+
+            if 'chip-chipbytilingarray' in get_squashed(A._design_type):
+                type_hits['ChIP-chip by tiling array'] = all_lines
+                chipchip_hits.append(all_lines)
+
+        if is_hybridization_assay and not contains_antibody_in_header:
+            transcription_hits = contains('rna', 'genomicdna')
+        else:
+            transcription_hits = contains('genomicdna')
+        type_hits['transcription profiling by array'] = transcription_hits
+        genechip_hits.append(transcription_hits)
+
+        if not is_hybridization_assay:
+            chip_seq_hits.append(contains('genomicdna', 'genomic_dna') & contains('mnase-seq'))
+            rna_seq_hits = contains('rna-seq', 'totalrna')
+        else:
+            rna_seq_hits = no_lines
+
+        if is_hybridization_assay and contains_antibody_in_header:
+            chipchip_hit = contains('genomicdna', 'chip')
+        else:
+            chipchip_hit = no_lines
+        chipchip_hits.append(chipchip_hit)
+
+        type_hits['ChIP-Seq'] = np.logical_or.reduce(chip_seq_hits)
+        type_hits['ME-Seq'] = me_seq_hits[-1]
+        type_hits['Chromatin-Seq'] = tf_seq_hits[-1]
+        type_hits['RNA-Seq'] = rna_seq_hits
+        type_hits['ChIP-chip'] = chipchip_hit
+
+        def records(hits):
+            return [header] + np.repeat(np.array(lines, dtype=object), sum(hit.astype(int) for hit in hits)).tolist()
+
+        chip_seq_records = records(chip_seq_hits)
+        rna_seq_records = records([rna_seq_hits])
+        me_seq_records = records(me_seq_hits)
+        tf_seq_records = records(tf_seq_hits)
+        genechip_records = records(genechip_hits)
+        chipchip_records = records(chipchip_hits)
+
+        default_records = records([~chipchip_hit])
+
+        # assay types in the order their first row appears
+        assay_types = [assay_type for _, assay_type in sorted(
+            (hits.argmax(), assay_type) for assay_type, hits in type_hits.items() if hits.any())]
 
         log.info("assay_types found: %s", assay_types)
 
@@ -895,6 +945,20 @@ class MageTabParser(object):
         return assay_files
 
 
+# deletes the characters str.split() splits on, but for new lines
+_SQUASH_TABLE = str.maketrans('', '', '\t\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004'
+                                      '\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000')
+
+
+def _get_squashed_lines(lines):
+    # get_squashed() of each line, squashing all the lines in one pass
+    squashed = ''.join(line.rstrip('\n') + '\n' for line in lines).translate(_SQUASH_TABLE).lower().split('\n')[:-1]
+    for i, sqline in enumerate(squashed):
+        if sqline.startswith('comment['):
+            squashed[i] = get_squashed(lines[i])
+    return squashed
+
+
 def strip_comments(in_fp):
     out_fp = StringIO()
     if not isinstance(in_fp, StringIO):
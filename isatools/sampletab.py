@@ -1,6 +1,7 @@
 """Functions for reading and writing SampleTab."""
 import io
 import logging
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from io import StringIO
@@ -33,6 +34,11 @@ def _read_tab_section(f, sec_key, next_sec_key=None):
     if not normed_line == sec_key:
         raise IOError("Expected: " + sec_key + " section, but got: " + normed_line)
     memf = io.StringIO()
+    if next_sec_key is None:  # the last section runs to the end of the file
+        for line in f:
+            memf.write(line.rstrip() + '\n')
+        memf.seek(0)
+        return memf
     while not _peek(f=f).rstrip() == next_sec_key:
         line = f.readline()
         if not line:
@@ -64,72 +70,81 @@ def read_sampletab_msi(fp):
     return msi_df
 
 
-def get_value(object_column, column_group, object_series, ontology_source_map, unit_categories):
-
-    cell_value = object_series[object_column]
-
-    column_index = list(column_group).index(object_column)
+def _value_reader(object_column, column_group, ontology_source_map, unit_categories):
+    # works out once how get_value reads a column, from the columns next to it
+    column_group = list(column_group)
+    column_index = column_group.index(object_column)
 
     try:
         offset_1r_col = column_group[column_index + 1]
         offset_2r_col = column_group[column_index + 2]
     except IndexError:
-        return cell_value, None
+        return lambda object_series: (object_series[object_column], None)
 
     if offset_1r_col.startswith('Term Source REF') and offset_2r_col.startswith('Term Source ID'):
 
-        value = OntologyAnnotation(term=str(cell_value))
+        def read_annotation(object_series):
+            value = OntologyAnnotation(term=str(object_series[object_column]))
 
-        term_source_value = object_series[offset_1r_col]
+            term_source_value = object_series[offset_1r_col]
 
-        if term_source_value is not '':
+            if term_source_value != '':
 
-            try:
-                value.term_source = ontology_source_map[term_source_value]
-            except KeyError:
-                print('term source: ', term_source_value, ' not found')
+                try:
+                    value.term_source = ontology_source_map[term_source_value]
+                except KeyError:
+                    print('term source: ', term_source_value, ' not found')
+
+            term_accession_value = str(object_series[offset_2r_col])
 
-        term_accession_value = str(object_series[offset_2r_col])
+            if term_accession_value != '':
+                value.term_accession = term_accession_value
 
-        if term_accession_value is not '':
-            value.term_accession = term_accession_value
+            return value, None
 
-        return value, None
+        return read_annotation
 
     try:
         offset_3r_col = column_group[column_index + 3]
     except IndexError:
-        return cell_value, None
+        return lambda object_series: (object_series[object_column], None)
 
     if offset_1r_col.startswith('Unit') and offset_2r_col.startswith('Term Source REF') \
             and offset_3r_col.startswith('Term Source ID'):
 
-        category_key = object_series[offset_1r_col]
+        def read_unit(object_series):
+            category_key = object_series[offset_1r_col]
 
-        try:
-            unit_term_value = unit_categories[category_key]
-        except KeyError:
-            unit_term_value = OntologyAnnotation(term=category_key)
-            unit_categories[category_key] = unit_term_value
+            try:
+                unit_term_value = unit_categories[category_key]
+            except KeyError:
+                unit_term_value = OntologyAnnotation(term=category_key)
+                unit_categories[category_key] = unit_term_value
 
-            unit_term_source_value = object_series[offset_2r_col]
+                unit_term_source_value = object_series[offset_2r_col]
 
-            if unit_term_source_value is not '':
+                if unit_term_source_value != '':
 
-                try:
-                    unit_term_value.term_source = ontology_source_map[unit_term_source_value]
-                except KeyError:
-                    print('term source: ', unit_term_source_value, ' not found')
+                    try:
+                        unit_term_value.term_source = ontology_source_map[unit_term_source_value]
+                    except KeyError:
+                        print('term source: ', unit_term_source_value, ' not found')
+
+                term_accession_value = object_series[offset_3r_col]
 
-            term_accession_value = object_series[offset_3r_col]
+                if term_accession_value != '':
+                    unit_term_value.term_accession = term_accession_value
 
-            if term_accession_value is not '':
-                unit_term_value.term_accession = term_accession_value
+            return object_series[object_column], unit_term_value
 
-        return cell_value, unit_term_value
+        return read_unit
 
     else:
-        return cell_value, None
+        return lambda object_series: (object_series[object_column], None)
+
+
+def get_value(object_column, column_group, object_series, ontology_source_map, unit_categories):
+    return _value_reader(object_column, column_group, ontology_source_map, unit_categories)(object_series)
 
 
 def load(FP):
@@ -256,136 +271,96 @@ class GenericSampleTabProcessSequenceFactory:
         except KeyError:
             pass
 
-        for sample_key in samples.keys():
-            sample = samples[sample_key]
-
-            row = DF[DF["Sample Accession"] == sample_key].iloc[0] # there should only be one row with accession
-            sample.name = row["Sample Name"]
-
-            if row["Sample Accession"] != "":
-
-                try:
-                    category = characteristic_categories["Sample Accession"]
-                except KeyError:
-                    category = OntologyAnnotation(term="Sample Accession")
-                    characteristic_categories["Sample Accession"] = category
-                sample.characteristics.append(Characteristic(category=category, value=row["Sample Accession"]))
-
-            if row["Sample Description"] != "":
-                try:
-                    category = characteristic_categories["Sample Description"]
-                except KeyError:
-                    category = OntologyAnnotation(term="Sample Description")
-                    characteristic_categories["Sample Description"] = category
-                sample.characteristics.append(Characteristic(category=category, value=row["Sample Description"]))
+        def get_category(category_key):
+            try:
+                return characteristic_categories[category_key]
+            except KeyError:
+                category = OntologyAnnotation(term=category_key)
+                characteristic_categories[category_key] = category
+                return category
 
-            if row["Derived From"] != "":
-                try:
-                    category = characteristic_categories["Derived From"]
-                except KeyError:
-                    category = OntologyAnnotation(term="Derived From")
-                    characteristic_categories["Derived From"] = category
-                sample.characteristics.append(Characteristic(category=category, value=row["Derived From"]))
+        factors = dict()
 
+        def get_factor(factor_name):
             try:
-                if row["Child Of"] != "":
-                    try:
-                        category = characteristic_categories["Child Of"]
-                    except KeyError:
-                        category = OntologyAnnotation(term="Child Of")
-                        characteristic_categories["Child Of"] = category
-                    sample.characteristics.append(Characteristic(category=category, value=row["Child Of"]))
+                return factors[factor_name]
             except KeyError:
-                pass  # skip if Child Of is not present in sample table
+                factor_hits = [f for f in self.factors if f.name == factor_name]
+                if len(factor_hits) != 1:
+                    raise ValueError("Could not resolve Study Factor from {}".format(factor_name))
+                factors[factor_name] = factor_hits[0]
+                return factor_hits[0]
+
+        # the first row of each accession, as there should only be one row with accession
+        first_rows = DF.drop_duplicates(subset="Sample Accession")
+        columns = list(first_rows.columns)
+        rows = dict((row["Sample Accession"], row) for row in (
+            dict(zip(columns, values)) for values in zip(*[first_rows[col].tolist() for col in columns])))
+        characteristic_readers = [
+            (col, col[15:col.rfind("]")], _value_reader(col, DF.columns, ontology_source_map, unit_categories))
+            for col in DF.columns if col.startswith("Characteristic[")]
+        has_child_of = "Child Of" in DF.columns
+
+        for sample_key, sample in samples.items():
+
+            row = rows[sample_key]
+            sample.name = row["Sample Name"]
 
-            if row["Group Name"] != "":
-                if isinstance(sample, Sample):
-                    factor_hits = [f for f in self.factors if f.name == "Group Name"]
-                    if len(factor_hits) == 1:
-                        factor = factor_hits[0]
-                    else:
-                        raise ValueError("Could not resolve Study Factor from Group Name")
-                    fv = FactorValue(factor_name=factor)
-                    v = row["Group Name"]
-                    fv.value = v
-                    sample.factor_values.append(fv)
-                else:
-                    category_key = "Group Name"
-                    try:
-                        category = characteristic_categories[category_key]
-                    except KeyError:
-                        category = OntologyAnnotation(term=category_key)
-                        characteristic_categories[category_key] = category
-                    characteristic = Characteristic(category=category)
-                    v = row["Group Name"]
-                    characteristic.value = v
-
-            if row["Group Accession"] != "":
-                if isinstance(sample, Sample):
-                    factor_hits = [f for f in self.factors if f.name == "Group Accession"]
-                    if len(factor_hits) == 1:
-                        factor = factor_hits[0]
+            for column in ("Sample Accession", "Sample Description", "Derived From"):
+                if row[column] != "":
+                    sample.characteristics.append(Characteristic(category=get_category(column), value=row[column]))
+
+            if has_child_of and row["Child Of"] != "":
+                sample.characteristics.append(Characteristic(category=get_category("Child Of"), value=row["Child Of"]))
+
+            for column in ("Group Name", "Group Accession"):
+                if row[column] != "":
+                    if isinstance(sample, Sample):
+                        fv = FactorValue(factor_name=get_factor(column))
+                        fv.value = row[column]
+                        sample.factor_values.append(fv)
                     else:
-                        raise ValueError("Could not resolve Study Factor from Group Accession")
-                    fv = FactorValue(factor_name=factor)
-                    v = row["Group Accession"]
-                    fv.value = v
-                    sample.factor_values.append(fv)
-                else:
-                    category_key = "Group Accession"
-                    try:
-                        category = characteristic_categories[category_key]
-                    except KeyError:
-                        category = OntologyAnnotation(term=category_key)
-                        characteristic_categories[category_key] = category
-                    characteristic = Characteristic(category=category)
-                    v = row["Group Accession"]
-                    characteristic.value = v
-
-            for col in [x for x in DF.columns if x.startswith("Characteristic[")]:  # build object map
-                category_key = col[15:col.rfind("]")]
-                try:
-                    category = characteristic_categories[category_key]
-                except KeyError:
-                    category = OntologyAnnotation(term=category_key)
-                    characteristic_categories[category_key] = category
+                        characteristic = Characteristic(category=get_category(column))
+                        characteristic.value = row[column]
 
-                characteristic = Characteristic(category=category)
+            for _, category_key, read_value in characteristic_readers:  # build object map
+                characteristic = Characteristic(category=get_category(category_key))
 
-                v, u = get_value(col, DF.columns, row, ontology_source_map, unit_categories)
+                v, u = read_value(row)
 
                 characteristic.value = v
                 characteristic.unit = u
 
                 sample.characteristics.append(characteristic)
 
-            sample_accession = row["Derived From"]
-
             try:
-                source = samples[sample_accession]
+                source = samples[row["Derived From"]]
                 sample.derives_from.append(source)
             except KeyError:
                 pass
 
         sample_collection_protocol = "sample collection"
+        process_members = dict()
 
-        for _, row in DF[["Sample Accession", "Derived From"]].iterrows():
-            sample_accession = row["Sample Accession"]
-            sample = samples[sample_accession]
-            derived_from_accession = row["Derived From"]
+        for sample_accession, derived_from_accession in zip(DF["Sample Accession"], DF["Derived From"]):
             if derived_from_accession == "":
                 continue
+            sample = samples[sample_accession]
             derived_from_sample = samples[derived_from_accession]
             sample.derived_from = derived_from_sample
             process_key = ":".join([derived_from_accession, sample_collection_protocol])
             try:
                 process = processes[process_key]
+                input_ids, output_ids = process_members[process_key]
             except KeyError:
                 process = Process(executes_protocol=sample_collection_protocol)
                 processes[process_key] = process
-            if derived_from_sample not in process.inputs:
+                input_ids, output_ids = process_members[process_key] = (set(), set())
+            if id(derived_from_sample) not in input_ids:
+                input_ids.add(id(derived_from_sample))
                 process.inputs.append(derived_from_sample)
-            if sample not in process.outputs:
+            if id(sample) not in output_ids:
+                output_ids.add(id(sample))
                 process.outputs.append(sample)
 
         sources = dict([x for x in samples.items() if isinstance(x[1], Source)])
@@ -397,92 +372,51 @@ def dumps(investigation):
 
     # build MSI section
 
-    metadata_DF = pd.DataFrame(columns=("Submission Title", "Submission Identifier", "Submission Description",
-                               "Submission Version", "Submission Reference Layer", "Submission Release Date",
-                                        "Submission Update Date"))
-    iversion_hits = [x for x in investigation.comments if x.name == "Submission Version"]
-    if len(iversion_hits) == 1:
-        investigation_version = iversion_hits[0].value
-    else:
-        investigation_version = ""
-    ireference_layer_hits = [x for x in investigation.comments if x.name == "Submission Reference Layer"]
-    if len(ireference_layer_hits) == 1:
-        investigation_reference_layer = ireference_layer_hits[0].value
-    else:
-        investigation_reference_layer = ""
-    iversion_update_date = [x for x in investigation.comments if x.name == "Submission Update Date"]
-    if len(iversion_update_date) == 1:
-        investigation_update_date = iversion_update_date[0].value
-    else:
-        investigation_update_date = ""
-    metadata_DF.loc[0] = [
+    comments = dict()
+    for comment in investigation.comments:
+        comments.setdefault(comment.name, []).append(comment)
+
+    def get_comment_value(name):
+        hits = comments.get(name, [])
+        return hits[0].value if len(hits) == 1 else ""
+
+    metadata_DF = pd.DataFrame([[
         investigation.title,
         investigation.identifier,
         investigation.description,
-        investigation_version,
-        investigation_reference_layer,
+        get_comment_value("Submission Version"),
+        get_comment_value("Submission Reference Layer"),
         investigation.submission_date,
-        investigation_update_date
-    ]
-
-    org_DF = pd.DataFrame(columns=("Organization Name", "Organization Address", "Organization URI",
-                                   "Organization Email", "Organization Role"))
-    org_name_hits = [x for x in investigation.comments if x.name.startswith("Organization Name")]
-    org_address_hits = [x for x in investigation.comments if x.name.startswith("Organization Address")]
-    org_uri_hits = [x for x in investigation.comments if x.name.startswith("Organization URI")]
-    org_email_hits = [x for x in investigation.comments if x.name.startswith("Organization Email")]
-    org_role_hits = [x for x in investigation.comments if x.name.startswith("Organization Role")]
-    for i, org_name in enumerate(org_name_hits):
-        try:
-            org_name = org_name_hits[i].value
-        except IndexError:
-            org_name = ""
-        try:
-            org_address = org_address_hits[i].value
-        except IndexError:
-            org_address = ""
-        try:
-            org_uri = org_uri_hits[i].value
-        except IndexError:
-            org_uri = ""
-        try:
-            org_email = org_email_hits[i].value
-        except IndexError:
-            org_email = ""
-        try:
-            org_role = org_role_hits[i].value
-        except IndexError:
-            org_role = ""
-        org_DF.loc[i] = [
-            org_name,
-            org_address,
-            org_uri,
-            org_email,
-            org_role
-        ]
-
-    people_DF = pd.DataFrame(columns=("Person Last Name", "Person Initials", "Person First Name", "Person Email",
-                                      "Person Role"))
-    for i, contact in enumerate(investigation.contacts):
-        if len(contact.roles) == 1:
-            role = contact.roles[0].term
-        else:
-            role = ""
-        people_DF.loc[i] = [
-            contact.last_name,
-            contact.mid_initials,
-            contact.first_name,
-            contact.email,
-            role
-        ]
-
-    term_sources_DF = pd.DataFrame(columns=("Term Source Name", "Term Source URI", "Term Source Version"))
-    for i, term_source in enumerate(investigation.ontology_source_references):
-        term_sources_DF.loc[i] = [
-            term_source.name,
-            term_source.file,
-            term_source.version
-        ]
+        get_comment_value("Submission Update Date")
+    ]], columns=("Submission Title", "Submission Identifier", "Submission Description", "Submission Version",
+                 "Submission Reference Layer", "Submission Release Date", "Submission Update Date"), dtype=object)
+
+    org_fields = ("Organization Name", "Organization Address", "Organization URI", "Organization Email",
+                  "Organization Role")
+    org_hits = dict((field, []) for field in org_fields)
+    for comment in investigation.comments:
+        for field in org_fields:
+            if comment.name.startswith(field):
+                org_hits[field].append(comment.value)
+    org_DF = pd.DataFrame([[values[i] if i < len(values) else "" for values in (org_hits[f] for f in org_fields)]
+                           for i in range(len(org_hits["Organization Name"]))],
+                          columns=org_fields, dtype=object)
+
+    people_DF = pd.DataFrame([[
+        contact.last_name,
+        contact.mid_initials,
+        contact.first_name,
+        contact.email,
+        contact.roles[0].term if len(contact.roles) == 1 else ""
+    ] for contact in investigation.contacts], columns=("Person Last Name", "Person Initials", "Person First Name",
+                                                       "Person Email", "Person Role"), dtype=object)
+
+    term_sources_DF = pd.DataFrame([[
+        term_source.name,
+        term_source.file,
+        term_source.version
+    ] for term_source in investigation.ontology_source_references],
+        columns=("Term Source Name", "Term Source URI", "Term Source Version"), dtype=object)
     msi_DF = pd.concat([metadata_DF, org_DF, people_DF, term_sources_DF], axis=1)
     msi_DF = msi_DF.set_index("Submission Title").T
     msi_DF = msi_DF.replace('', np.nan)
@@ -490,18 +424,40 @@ def dumps(investigation):
     msi_DF.to_csv(path_or_buf=msi_memf, index=True, sep='\t', encoding='utf-8', index_label="Submission Title")
     msi_memf.seek(0)
 
-    scd_DF = pd.DataFrame(columns=("Sample Name", "Sample Accession", "Sample Description", "Derived From",
-                                   "Group Name", "Group Accession"))
+    # build SCD section column by column, one array of values per column
+    # each object once, in study order (hashing a sample hashes its whole repr)
+    all_samples = list(OrderedDict((id(s), s) for study in investigation.studies
+                                   for s in study.sources + study.samples).values())
+    n_samples = len(all_samples)
+    scd_columns = OrderedDict((column, [""] * n_samples) for column in (
+        "Sample Name", "Sample Accession", "Sample Description", "Derived From", "Group Name", "Group Accession"))
+
+    # the value columns of each characteristic, kept next to it whichever sample first needs them
+    value_columns = OrderedDict()
 
-    all_samples = []
-    for study in investigation.studies:
-        all_samples += study.sources
-        all_samples += study.samples
+    def set_cell(label, suffix, i, value):
+        column = label + suffix
+        try:
+            scd_columns[column][i] = value
+        except KeyError:
+            scd_columns[column] = [np.nan] * n_samples
+            scd_columns[column][i] = value
+            value_columns[label].append(column)
+
+    def get_accession(characteristics_by_term):
+        hits = characteristics_by_term.get("Sample Accession", [])
+        return hits[0].value if len(hits) == 1 else None
 
-    all_samples = list(set(all_samples))
+    def group_characteristics(s):
+        characteristics_by_term = dict()
+        for characteristic in s.characteristics:
+            characteristics_by_term.setdefault(characteristic.category.term, []).append(characteristic)
+        return characteristics_by_term
+
+    derived_from_accessions = dict()
     if isa_logging.show_pbars:
-        pbar = ProgressBar(min_value=0, max_value=len(all_samples),
-                           widgets=['Writing {} samples: '.format(len(all_samples)), SimpleProgress(),
+        pbar = ProgressBar(min_value=0, max_value=n_samples,
+                           widgets=['Writing {} samples: '.format(n_samples), SimpleProgress(),
                                     Bar(left=" |", right="| "), ETA()]).start()
     else:
         pbar = lambda x: x
@@ -510,84 +466,79 @@ def dumps(investigation):
         if isinstance(s, Sample) and s.derives_from is not None:
             if len(s.derives_from) == 1:
                 derived_from_obj = s.derives_from[0]
-                derives_from_accession_hits = [x for x in derived_from_obj.characteristics
-                                               if x.category.term == "Sample Accession"]
-                if len(derives_from_accession_hits) == 1:
-                    derived_from = derives_from_accession_hits[0].value
-                else:
-                    log.warning("WARNING! No Sample Accession available so referencing Derived From relation using "
-                             "Sample Name \"{}\" instead".format(derived_from_obj.name))
-                    derived_from = derived_from_obj.name
-        sample_accession_hits = [x for x in s.characteristics if x.category.term == "Sample Accession"]
-        if len(sample_accession_hits) == 1:
-            sample_accession = sample_accession_hits[0].value
-        else:
+                try:
+                    derived_from = derived_from_accessions[id(derived_from_obj)]
+                except KeyError:
+                    derived_from = get_accession(group_characteristics(derived_from_obj))
+                    if derived_from is None:
+                        log.warning("WARNING! No Sample Accession available so referencing Derived From relation "
+                                    "using Sample Name \"{}\" instead".format(derived_from_obj.name))
+                        derived_from = derived_from_obj.name
+                    else:
+                        derived_from_accessions[id(derived_from_obj)] = derived_from
+        characteristics_by_term = group_characteristics(s)
+        sample_accession = get_accession(characteristics_by_term)
+        if sample_accession is None:
             sample_accession = ""
-        sample_description_hits = [x for x in s.characteristics if x.category.term == "Sample Description"]
+        sample_description_hits = characteristics_by_term.get("Sample Description", [])
         if len(sample_description_hits) == 1:
             sample_description = sample_description_hits[0].value
         else:
             sample_description = ""
 
         if isinstance(s, Sample):
-            group_name_hits = [x for x in s.factor_values if x.factor_name.name == "Group Name"]
-            if len(group_name_hits) == 1:
-                group_name = group_name_hits[0].value
-            else:
-                group_name = ""
-            group_accession_hits = [x for x in s.factor_values if x.factor_name.name == "Group Accession"]
-            if len(group_accession_hits) == 1:
-                group_accession = group_accession_hits[0].value
-            else:
-                group_accession = ""
+            factor_values_by_name = dict()
+            for factor_value in s.factor_values:
+                factor_values_by_name.setdefault(factor_value.factor_name.name, []).append(factor_value)
+            group_name_hits = factor_values_by_name.get("Group Name", [])
+            group_accession_hits = factor_values_by_name.get("Group Accession", [])
         else:
-            group_name_hits = [x for x in s.characteristics if x.category.term == "Group Name"]
-            if len(group_name_hits) == 1:
-                group_name = group_name_hits[0].value
-            else:
-                group_name = ""
-            group_accession_hits = [x for x in s.characteristics if x.category.term == "Group Accession"]
-            if len(group_accession_hits) == 1:
-                group_accession = group_accession_hits[0].value
-            else:
-                group_accession = ""
-
-        scd_DF.loc[i, "Sample Name"] = s.name
-        scd_DF.loc[i, "Sample Accession"] = sample_accession
-        scd_DF.loc[i, "Sample Description"] = sample_description
-        scd_DF.loc[i, "Derived From"] = derived_from
-        scd_DF.loc[i, "Group Name"] = group_name
-        scd_DF.loc[i, "Group Accession"] = group_accession
+            group_name_hits = characteristics_by_term.get("Group Name", [])
+            group_accession_hits = characteristics_by_term.get("Group Accession", [])
+        group_name = group_name_hits[0].value if len(group_name_hits) == 1 else ""
+        group_accession = group_accession_hits[0].value if len(group_accession_hits) == 1 else ""
+
+        scd_columns["Sample Name"][i] = s.name
+        scd_columns["Sample Accession"][i] = sample_accession
+        scd_columns["Sample Description"][i] = sample_description
+        scd_columns["Derived From"][i] = derived_from
+        scd_columns["Group Name"][i] = group_name
+        scd_columns["Group Accession"][i] = group_accession
 
         characteristics = [x for x in s.characteristics if x.category.term not in ["Sample Description",
                                                                                    "Derived From",
                                                                                    "Sample Accession"]]
         for characteristic in characteristics:
             characteristic_label = "Characteristic[{}]".format(characteristic.category.term)
-            if characteristic_label not in scd_DF.columns:
-                scd_DF[characteristic_label] = ""
-                for val_col in get_value_columns(characteristic_label, characteristic):
-                    scd_DF[val_col] = ""
+            if characteristic_label not in value_columns:
+                scd_columns[characteristic_label] = [""] * n_samples
+                value_columns[characteristic_label] = list(get_value_columns(characteristic_label, characteristic))
+                for val_col in value_columns[characteristic_label]:
+                    scd_columns[val_col] = [""] * n_samples
             if isinstance(characteristic.value, (int, float)) and characteristic.unit:
                 if isinstance(characteristic.unit, OntologyAnnotation):
-                    scd_DF.loc[i, characteristic_label] = characteristic.value
-                    scd_DF.loc[i, characteristic_label + ".Unit"] = characteristic.unit.term
-                    scd_DF.loc[i, characteristic_label + ".Unit.Term Source REF"]\
-                        = characteristic.unit.term_source.name if characteristic.unit.term_source else ""
-                    scd_DF.loc[i, characteristic_label + ".Unit.Term Accession Number"] = \
-                        characteristic.unit.term_accession
+                    set_cell(characteristic_label, "", i, characteristic.value)
+                    set_cell(characteristic_label, ".Unit", i, characteristic.unit.term)
+                    set_cell(characteristic_label, ".Unit.Term Source REF", i,
+                             characteristic.unit.term_source.name if characteristic.unit.term_source else "")
+                    set_cell(characteristic_label, ".Unit.Term Accession Number", i,
+                             characteristic.unit.term_accession)
                 else:
-                    scd_DF.loc[i, characteristic_label] = characteristic.value
-                    scd_DF.loc[i, characteristic_label + ".Unit"] = characteristic.unit
+                    set_cell(characteristic_label, "", i, characteristic.value)
+                    set_cell(characteristic_label, ".Unit", i, characteristic.unit)
             elif isinstance(characteristic.value, OntologyAnnotation):
-                scd_DF.loc[i, characteristic_label] = characteristic.value.term
-                scd_DF.loc[i, characteristic_label + ".Term Source REF"] = \
-                    characteristic.value.term_source.name if characteristic.value.term_source else ""
-                scd_DF.loc[i, characteristic_label + ".Term Accession Number"] = \
-                    characteristic.value.term_accession
+                set_cell(characteristic_label, "", i, characteristic.value.term)
+                set_cell(characteristic_label, ".Term Source REF", i,
+                         characteristic.value.term_source.name if characteristic.value.term_source else "")
+                set_cell(characteristic_label, ".Term Accession Number", i, characteristic.value.term_accession)
             else:
-                scd_DF.loc[i, characteristic_label] = characteristic.value
+                set_cell(characteristic_label, "", i, characteristic.value)
 
+    columns = list(scd_columns.keys())[:6]
+    for label, label_value_columns in value_columns.items():
+        columns.append(label)
+        columns.extend(label_value_columns)
+    scd_DF = pd.DataFrame(scd_columns, columns=columns, dtype=object)
     scd_DF = scd_DF.replace('', np.nan)
     columns = list(scd_DF.columns)
     for i, col in enumerate(columns):
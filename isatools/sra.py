@@ -4,9 +4,16 @@ import hashlib
 import html
 import iso8601
 import jinja2
+import json
 import logging
 import os
+import stat
+import threading
+import time
 import xml.dom.minidom
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from functools import partial
 from lxml import etree
 
@@ -32,7 +39,36 @@ sra_submission_action = 'ADD'
 sra_center_prj_name = None
 
 
-def export(investigation, export_path, sra_settings=None, datafilehashes=None):
+def _sequencing_datafile_names(investigation):
+    """Names of the data files of the sequencing processes to export"""
+    filenames = list()
+    for istudy in investigation.studies:
+        for iassay in istudy.assays:
+            if (iassay.measurement_type.term, iassay.technology_type.term) not in supported_sra_assays:
+                continue
+            for process in iassay.process_sequence:
+                if process.executes_protocol.protocol_type.term != 'nucleic acid sequencing':
+                    continue
+                if any(c.name.lower() == 'export' and c.value.lower() == 'no' for c in process.comments):
+                    continue
+                filenames.extend(o.filename for o in process.outputs if isinstance(o, DataFile))
+    return filenames
+
+
+def export(investigation, export_path, sra_settings=None, datafilehashes=None, datafile_root=None,
+           hash_workers=None, hash_cache=None):
+    """Export the sequencing assays of an investigation to SRA-XML
+
+    :param investigation: The Investigation to export
+    :param export_path: Directory to write the SRA-XML files to
+    :param sra_settings: SRA settings dict
+    :param datafilehashes: Dict of the md5s of the data files, by filename
+    :param datafile_root: If no datafilehashes are given, directory of the
+        data files to compute the md5s of; otherwise checksums are left as
+        zeros
+    :param hash_workers: Number of data files hashed at the same time
+    :param hash_cache: Checksum cache, as taken by hash_datafiles()
+    """
 
     def get_comment(assay, name):
         hits = [c for c in assay.comments if c.name.lower() == name.lower()]
@@ -53,6 +89,43 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                 break
         return sample
 
+    # memos of the lineage of each process, keyed by id() as the model
+    # objects hash and compare by value, which is slow
+    samples_by_process = dict()
+    ancestry_by_process = dict()
+
+    def get_upstream_sample(process):
+        chain = list()
+        sample = None
+        while sample is None:
+            if id(process) in samples_by_process:
+                sample = samples_by_process[id(process)]
+                break
+            chain.append(process)
+            sample = get_sample(process)
+            process = process.prev_process
+        for p in chain:
+            samples_by_process[id(p)] = sample
+        return sample
+
+    def get_ancestry(process):
+        """Processes upstream of a process, by protocol type; the furthest
+        upstream wins, and the first process of the chain is left out"""
+        chain = list()
+        ancestry = None
+        while process.prev_process is not None:
+            if id(process) in ancestry_by_process:
+                ancestry = ancestry_by_process[id(process)]
+                break
+            chain.append(process)
+            process = process.prev_process
+        ancestry = ancestry if ancestry is not None else dict()
+        for p in reversed(chain):
+            ancestry = dict(ancestry)
+            ancestry.setdefault(p.executes_protocol.protocol_type.term, p)
+            ancestry_by_process[id(p)] = ancestry
+        return ancestry
+
     def get_pv(process, name):
         hits = [pv for pv in process.parameter_values if
                 pv.category.parameter_name.term.lower().replace('_', ' ')
@@ -79,6 +152,9 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
         # sra_center_prj_name = sra_settings['sra_center_prj_name']
 
     log.info('isatools.sra.export()')
+    if datafilehashes is None and datafile_root is not None:
+        datafilehashes = create_datafile_hashes(
+            datafile_root, _sequencing_datafile_names(investigation), workers=hash_workers, cache=hash_cache)
     for istudy in investigation.studies:
         is_sra = False
         for iassay in istudy.assays:
@@ -121,11 +197,6 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
         # ideally make it a requirement in the model or JSON to have html
         # escaped content
 
-        env = jinja2.Environment()
-        env.loader = jinja2.FileSystemLoader(
-            os.path.join(
-                os.path.dirname(__file__), 'resources', 'sra_templates'))
-        xsub_template = env.get_template('submission_add.xml')
         sra_contact = None
         if sra_settings is not None:
             inform_on_status = sra_settings['sra_broker_inform_on_status']
@@ -136,15 +207,12 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                 'inform_on_error': inform_on_error,
                 'contact_name': contact_name
             }
-        xsub = xsub_template.render(accession=study_acc,
-                                    contacts=istudy.contacts,
-                                    submission_date=istudy.submission_date,
-                                    sra_center_name=sra_center_name,
-                                    sra_broker_name=sra_broker_name,
-                                    sra_contact=sra_contact)
-        xproj_template = env.get_template('project_set.xml')
-        xproj = xproj_template.render(
-            study=istudy, sra_center_name=sra_center_name)
+
+        # inputs of the first process of the study producing each material
+        inputs_by_output = dict()
+        for p in istudy.process_sequence:
+            for output in p.outputs:
+                inputs_by_output.setdefault(id(output), p.inputs)
 
         assays_to_export = list()
         for iassay in istudy.assays:
@@ -165,11 +233,7 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                         log.debug('NO EXPORT COMMENT FOUND')
                     log.debug('Perform export? '.format(str(do_export)))
                     if do_export:
-                        sample = None
-                        curr_process = assay_seq_process
-                        while sample is None:
-                            sample = get_sample(curr_process)
-                            curr_process = curr_process.prev_process
+                        sample = get_upstream_sample(assay_seq_process)
                         assay_to_export = \
                             {
                                 'sample': sample,
@@ -204,11 +268,14 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                                 }
                             )
                         source = None
-                        matching_sources = [
-                            p.inputs for p in istudy.process_sequence
-                            if sample in p.outputs]
-                        if len(matching_sources[0]) == 1:
-                            source = matching_sources[0][0]
+                        sample_inputs = inputs_by_output.get(id(sample))
+                        if sample_inputs is None:
+                            # an equal sample that is not the same object
+                            sample_inputs = [
+                                p.inputs for p in istudy.process_sequence
+                                if sample in p.outputs][0]
+                        if len(sample_inputs) == 1:
+                            source = sample_inputs[0]
                         assay_to_export['source'] = {
                             'name': source.name,
                             'characteristics': source.characteristics,
@@ -220,15 +287,8 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                             organism_charac.value.term_accession.index('_')+1:]
                         assay_to_export['source']['scientific_name'] = \
                             organism_charac.value.term
-                        curr_process = assay_seq_process
-                        while curr_process.prev_process is not None:
-                            assay_to_export[
-                                curr_process.executes_protocol.protocol_type
-                                    .term] = curr_process
-                            try:
-                                curr_process = curr_process.prev_process
-                            except AttributeError:
-                                pass
+                        assay_to_export.update(
+                            get_ancestry(assay_seq_process))
                         target_taxon = get_pv(
                             assay_to_export['library construction'],
                             'target_taxon')
@@ -494,91 +554,332 @@ def export(investigation, export_path, sra_settings=None, datafilehashes=None):
                         iassay.measurement_type.term,
                         iassay.technology_type.term))
 
-        xexp_set_template = env.get_template('experiment_set.xml')
-        xexp_set = xexp_set_template.render(assays_to_export=assays_to_export,
-                                            study=istudy,
-                                            sra_center_name=sra_center_name,
-                                            sra_broker_name=sra_broker_name)
-        xrun_set_template = env.get_template('run_set.xml')
-        xrun_set = xrun_set_template.render(assays_to_export=assays_to_export,
-                                            study=istudy,
-                                            sra_center_name=sra_center_name,
-                                            sra_broker_name=sra_broker_name)
         samples_to_export = list()
+        sample_aliases = set()
         for assay_to_export in assays_to_export:
-            if len([s for s in samples_to_export if
-                    s['sample_alias'] == assay_to_export['sample_alias']]) > 0:
-                pass
-            else:
+            if assay_to_export['sample_alias'] not in sample_aliases:
+                sample_aliases.add(assay_to_export['sample_alias'])
                 samples_to_export.append(assay_to_export)
-        xsample_set_template = env.get_template('sample_set.xml')
-        xsample_set = xsample_set_template.render(
-            assays_to_export=samples_to_export, study=istudy,
-            sra_center_name=sra_center_name, sra_broker_name=sra_broker_name)
-        log.debug("SRA exporter: writing SRA XML files for study " + study_acc)
 
-        # blitz out whitespaces with etree and format nicely with minidom
-        def prettify(xmlstr):
-            p = etree.XMLParser(remove_blank_text=True)
-            exsub = etree.XML(xmlstr, parser=p)
-            x = xml.dom.minidom.parseString(etree.tostring(exsub))
-            return x.toprettyxml()
-
-        # validate a doc against one of our SRA schemas
-        def validate(docpath, schemaname):
-            with open(os.path.join(os.path.dirname(__file__), 'resources',
-                                   'sra_schemas', schemaname)) as xsd:
-                doc = etree.parse(xsd)
-                try:
-                    schema = etree.XMLSchema(doc)
-                    with open(docpath, 'r') as xsub_file:
-                        doc = etree.parse(xsub_file)
-                        try:
-                            schema.assertValid(doc)
-                        except etree.DocumentInvalid as e:
-                            log.error(
-                                'Schema validation failed on {}'
-                                    .format('{0}:\n{1}'.format(
-                                    docpath, str(e))))
-                except etree.XMLSchemaParseError as e:
-                    log.error(e)
-
-        if os.path.exists(export_path):
-            with open(os.path.join(
-                    export_path, 'submission.xml'), 'w') as xsub_file:
-                print(prettify(xsub), file=xsub_file)
-            validate(os.path.join(
-                export_path, 'submission.xml'), 'SRA.submission.xsd')
-            with open(os.path.join(
-                    export_path, 'project_set.xml'), 'w') as xproj_set_file:
-                print(prettify(xproj), file=xproj_set_file)
-            validate(os.path.join(
-                export_path, 'project_set.xml'), 'ENA.project.xsd')
-            with open(os.path.join(
-                    export_path, 'experiment_set.xml'), 'w') as xexp_set_file:
-                print(prettify(xexp_set), file=xexp_set_file)
-            validate(os.path.join(
-                export_path, 'experiment_set.xml'), 'SRA.experiment.xsd')
-            with open(os.path.join(
-                    export_path, 'run_set.xml'), 'w') as xrun_set_file:
-                print(prettify(xrun_set), file=xrun_set_file)
-            validate(os.path.join(export_path, 'run_set.xml'), 'SRA.run.xsd')
-            with open(os.path.join(
-                    export_path, 'sample_set.xml'), 'w') as xsample_set_file:
-                print(prettify(xsample_set), file=xsample_set_file)
-            validate(os.path.join(
-                export_path, 'sample_set.xml'), 'SRA.sample.xsd')
-        else:
+        if not os.path.exists(export_path):
             raise NotADirectoryError(
                 "export path '{}' is not a directory".format(export_path))
+        log.debug("SRA exporter: writing SRA XML files for study " + study_acc)
+        write_sra_xml(
+            os.path.join(export_path, 'submission.xml'), 'submission_add.xml',
+            'SRA.submission.xsd', accession=study_acc,
+            contacts=istudy.contacts, submission_date=istudy.submission_date,
+            sra_center_name=sra_center_name, sra_broker_name=sra_broker_name,
+            sra_contact=sra_contact)
+        write_sra_xml(
+            os.path.join(export_path, 'project_set.xml'), 'project_set.xml',
+            'ENA.project.xsd', study=istudy, sra_center_name=sra_center_name)
+        write_sra_xml(
+            os.path.join(export_path, 'experiment_set.xml'),
+            'experiment_set.xml', 'SRA.experiment.xsd',
+            assays_to_export=assays_to_export, study=istudy,
+            sra_center_name=sra_center_name, sra_broker_name=sra_broker_name)
+        write_sra_xml(
+            os.path.join(export_path, 'run_set.xml'), 'run_set.xml',
+            'SRA.run.xsd', assays_to_export=assays_to_export, study=istudy,
+            sra_center_name=sra_center_name, sra_broker_name=sra_broker_name)
+        write_sra_xml(
+            os.path.join(export_path, 'sample_set.xml'), 'sample_set.xml',
+            'SRA.sample.xsd', assays_to_export=samples_to_export,
+            study=istudy, sra_center_name=sra_center_name,
+            sra_broker_name=sra_broker_name)
+
 
+_template_env = None
+_schemas = dict()
 
-def create_datafile_hashes(fileroot, filenames):
+
+def get_sra_template(name):
+    """Get one of the SRA-XML templates, compiled once per process"""
+    global _template_env
+    if _template_env is None:
+        _template_env = jinja2.Environment(loader=jinja2.FileSystemLoader(
+            os.path.join(os.path.dirname(__file__), 'resources',
+                         'sra_templates')))
+    return _template_env.get_template(name)
+
+
+def get_sra_schema(schemaname):
+    """Get one of the SRA XML schemas, compiled once per process
+
+    :param schemaname: File name of the schema, e.g. 'SRA.run.xsd'
+    :return: An lxml.etree.XMLSchema
+    :raises lxml.etree.XMLSchemaParseError: If the schema does not compile
+    """
+    if schemaname not in _schemas:
+        try:
+            _schemas[schemaname] = etree.XMLSchema(etree.parse(os.path.join(
+                os.path.dirname(__file__), 'resources', 'sra_schemas',
+                schemaname)))
+        except etree.XMLSchemaParseError as e:
+            _schemas[schemaname] = e
+    if isinstance(_schemas[schemaname], Exception):
+        raise _schemas[schemaname]
+    return _schemas[schemaname]
+
+
+def _write_pretty_node(node, out_fp):
+    """Write a child of the root element as xml.dom.minidom's toprettyxml()
+    would within the document"""
+    if node.tag is etree.Comment:
+        out_fp.write('\t<!--{}-->\n'.format(node.text))
+    elif isinstance(node.tag, str):
+        dom = xml.dom.minidom.parseString(etree.tostring(node, with_tail=False))
+        dom.documentElement.writexml(out_fp, '\t', '\t', '\n')
+
+
+def write_sra_xml(path, template_name, schemaname, **context):
+    """Render an SRA-XML template to a file, and validate it as it is written
+
+    The template is rendered incrementally and each top level element (e.g.
+    a RUN of a RUN_SET) is pretty printed and validated against the schema
+    as soon as it is complete, so that neither the rendered document nor its
+    tree are ever held in memory as a whole. Schema validation failures are
+    logged as errors.
+
+    :param path: Path of the file to write
+    :param template_name: Name of the template in resources/sra_templates
+    :param schemaname: Name of the schema in resources/sra_schemas
+    :param context: Variables of the template
+    """
+    parser = etree.XMLPullParser(events=('start', 'end'),
+                                 remove_blank_text=True)
+    try:
+        validator = etree.XMLPullParser(events=('end',),
+                                        schema=get_sra_schema(schemaname))
+    except etree.XMLSchemaParseError as e:
+        log.error(e)
+        validator = None
+    depth = 0
+    root = None
+    root_tag = None
+    with open(path, 'w') as out_fp:
+        out_fp.write('<?xml version="1.0" ?>\n')
+        for chunk in get_sra_template(template_name).generate(**context):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    if root is None:
+                        root = element
+                        dom = xml.dom.minidom.parseString(etree.tostring(
+                            etree.Element(element.tag, attrib=element.attrib,
+                                          nsmap=element.nsmap)))
+                        root_tag = dom.documentElement.toprettyxml('\t')
+                    continue
+                depth -= 1
+                if depth == 1:
+                    if root_tag is not None:
+                        out_fp.write(root_tag[:-len('/>\n')] + '>\n')
+                        root_tag = None
+                    while True:
+                        node = root[0]
+                        root.remove(node)
+                        _write_pretty_node(node, out_fp)
+                        if node is element:
+                            break
+            if validator is not None:
+                validator = _feed_validator(validator, chunk, path)
+        parser.close()
+        if root_tag is not None and len(root) == 0:
+            out_fp.write(root_tag)
+        else:
+            if root_tag is not None:
+                out_fp.write(root_tag[:-len('/>\n')] + '>\n')
+            for node in list(root):
+                _write_pretty_node(node, out_fp)
+            out_fp.write('</{}>\n'.format(root.tag))
+        out_fp.write('\n')
+    if validator is not None:
+        try:
+            validator.close()
+        except etree.XMLSyntaxError as e:
+            log.error('Schema validation failed on {}'.format(
+                '{0}:\n{1}'.format(path, str(e))))
+
+
+def _feed_validator(validator, chunk, path):
+    """Feed a chunk to a validating parser, logging and dropping the parser
+    if the document is invalid"""
+    try:
+        validator.feed(chunk)
+    except etree.XMLSyntaxError as e:
+        log.error('Schema validation failed on {}'.format(
+            '{0}:\n{1}'.format(path, str(e))))
+        return None
+    for _, element in validator.read_events():
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    return validator
+
+
+#: File name of the checksum cache kept next to the data files by default
+DEFAULT_HASH_CACHE_FILENAME = '.isatools-checksums.json'
+
+
+class DatafileHashCache(object):
+    """Persistent cache of the digests of data files
+
+    Entries are keyed by the absolute path of a file and are only used while
+    the size and modification time of the file are unchanged, so that files
+    are never hashed again unless they change. The cache is kept in a JSON
+    sidecar file, written by save().
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Path of the JSON file the cache is loaded from, if it
+            exists, and saved to
+        """
+        self.path = path
+        self._entries = dict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        if os.path.isfile(path):
+            try:
+                with open(path) as fp:
+                    self._entries = json.load(fp)
+            except ValueError:
+                log.warning('Ignoring unreadable checksum cache {}'.format(path))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, filepath, st, algorithms):
+        """Get the cached digests of a file
+
+        :param filepath: Path of the file
+        :param st: os.stat_result of the file
+        :param algorithms: Names of the hashlib algorithms wanted
+        :return: Dict of the digests, or None if any is not cached for the
+            current size and mtime of the file
+        """
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(filepath))
+        if entry is None or entry['size'] != st.st_size or entry['mtime'] != st.st_mtime_ns:
+            return None
+        if not all(a in entry['digests'] for a in algorithms):
+            return None
+        return dict((a, entry['digests'][a]) for a in algorithms)
+
+    def put(self, filepath, st, digests):
+        """Cache the digests of a file, for its current size and mtime"""
+        key = os.path.abspath(filepath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['size'] != st.st_size or entry['mtime'] != st.st_mtime_ns:
+                entry = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'digests': dict()}
+                self._entries[key] = entry
+            entry['digests'].update(digests)
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to its file, if it changed since it was loaded"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'w') as fp:
+            fp.write(data)
+        os.replace(tmp_path, self.path)
+
+
+def hash_file(filepath, algorithms=('md5',), block_size=1 << 20):
+    """Compute one or more digests of a file in a single pass
+
+    :param filepath: Path of the file
+    :param algorithms: Names of hashlib algorithms, e.g. ('md5', 'sha256')
+    :param block_size: Size in bytes of the reads
+    :return: Dict of the hex digests, by algorithm
+    """
+    digests = [(a, hashlib.new(a)) for a in algorithms]
+    buf = bytearray(block_size)
+    view = memoryview(buf)
+    with open(filepath, mode='rb', buffering=0) as f:
+        for n in iter(partial(f.readinto, buf), 0):
+            for _, d in digests:
+                d.update(view[:n])
+    return dict((a, d.hexdigest()) for a, d in digests)
+
+
+def hash_datafiles(fileroot, filenames, algorithms=('md5',), workers=None, cache=None, block_size=1 << 20,
+                   save_interval=30):
+    """Compute digests of data files, in parallel and resumably
+
+    Files are hashed on a pool of threads (hashlib releases the GIL while
+    hashing large buffers). With a cache, files unchanged since they were
+    last hashed are not read at all, and the cache is saved as files
+    complete, so an interrupted run picks up where it stopped.
+
+    :param fileroot: Root to directory containing files
+    :param filenames: List of filenames of files to hash, relative to fileroot
+    :param algorithms: Names of hashlib algorithms, e.g. ('md5', 'sha256')
+    :param workers: Number of files hashed at the same time, by default the
+        number of CPUs
+    :param cache: A DatafileHashCache, the path of its file, True for one
+        named DEFAULT_HASH_CACHE_FILENAME in fileroot, or None for no cache
+    :param block_size: Size in bytes of the reads
+    :param save_interval: Seconds between saves of the cache while hashing
+    :return: dict of filenames to dicts of hex digests, by algorithm
+    :raises FileNotFoundError: If any of the files does not exist
+    """
+    if cache is True:
+        cache = DatafileHashCache(os.path.join(fileroot, DEFAULT_HASH_CACHE_FILENAME))
+    elif isinstance(cache, str):
+        cache = DatafileHashCache(cache)
+    algorithms = tuple(algorithms)
+    datafilehashes = dict()
+    to_hash = list()
+    for file in OrderedDict.fromkeys(filenames):
+        filepath = os.path.join(fileroot, file)
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            raise FileNotFoundError('{} is not a file'.format(filepath))
+        digests = cache.get(filepath, st, algorithms) if cache is not None else None
+        if digests is not None:
+            datafilehashes[file] = digests
+        else:
+            to_hash.append((file, filepath, st))
+    log.debug('Hashing {} data files, {} found in cache'.format(len(to_hash), len(datafilehashes)))
+    workers = workers or os.cpu_count() or 1
+    last_save = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = dict((executor.submit(hash_file, filepath, algorithms, block_size), (file, filepath, st))
+                           for file, filepath, st in to_hash)
+            for future in as_completed(futures):
+                file, filepath, st = futures[future]
+                datafilehashes[file] = future.result()
+                if cache is not None:
+                    cache.put(filepath, st, datafilehashes[file])
+                    if time.time() - last_save > save_interval:
+                        cache.save()
+                        last_save = time.time()
+    finally:
+        if cache is not None:
+            cache.save()
+    return datafilehashes
+
+
+def create_datafile_hashes(fileroot, filenames, workers=None, cache=None):
     """
     Create md5 file dict for files in a directory with a particular extension
 
     :param fileroot: Root to directory containing files (assumes all in same dir)
     :param filenames: List of filenames of files to md5, assumed in fileroot
+    :param workers: Number of files hashed at the same time
+    :param cache: Checksum cache, as taken by hash_datafiles()
     :return: dict containing filenames and md5s
 
     Usage:
@@ -586,19 +887,5 @@ def create_datafile_hashes(fileroot, filenames):
     >>> create_datafile_hashes(fileroot='/path/to/my/files', filenames=filesnames)
     { 'myfile1.gz': 'd41d8cd98f00b204e9800998ecf8427e', 'myfile2.gz': 'd41d8cd98f00b204e9800998ecf8427e' }
     """
-    def md5sum(filename):
-        with open(filename, mode='rb') as f:
-            d = hashlib.md5()
-            for buf in iter(partial(f.read, 128), b''):
-                d.update(buf)
-        return d.hexdigest()
-
-    from os.path import isfile, join
-    datafilehashes = dict()
-    for file in filenames:
-        if isfile(join(fileroot, file)):
-            datafilehashes[file] = md5sum(filename=join(fileroot, file))
-        else:
-            raise FileNotFoundError(
-                '{} is not a file'.format(join(fileroot, file)))
-    return datafilehashes
+    datafilehashes = hash_datafiles(fileroot, filenames, algorithms=('md5',), workers=workers, cache=cache)
+    return dict((file, digests['md5']) for file, digests in datafilehashes.items())
@@ -5,12 +5,16 @@ import csv
 import json
 import os
 import pandas as pd
+import re
 import uuid
+from collections import OrderedDict
 from functools import reduce
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED
 
 
 from isatools import isatab
+from isatools.io.file_index import FileIndex
+from isatools.io.zipstream import ZipStreamWriter
 from isatools.model import *
 
 
@@ -76,6 +80,163 @@ def detect_isatab_process_pooling(fp):
     return report
 
 
+def _table_process_keys(DF, group, group_index, node_cols):
+    """Process keys of each row of a Protocol REF column group, as computed
+    by isatab.process_keygen() but a column at a time"""
+    columns = DF.columns
+    values = DF.values
+    name_column_hits = [i for i in group if columns[i] in isatab._LABELS_ASSAY_NODES]
+    if len(name_column_hits) == 1:
+        return list(values[:, name_column_hits[0]])
+    # process_keygen() looks up the nodes around the index of the column
+    # group rather than of the Protocol REF column; keep that for the keys to
+    # match those of the loader
+    output_node_index = isatab.find_gt(node_cols, group_index)
+    input_node_index = isatab.find_lt(node_cols, group_index)
+    num_inputs = len(DF.iloc[:, [group_index, input_node_index]].drop_duplicates())
+    num_outputs = len(DF.iloc[:, [group_index, output_node_index]].drop_duplicates())
+    if num_inputs > num_outputs:
+        node_index = output_node_index
+    else:
+        node_index = input_node_index
+    if node_index > -1:
+        node_keys = values[:, node_index]
+    else:
+        node_keys = [''] * len(values)
+    protocol_refs = values[:, group[0]]
+    pv_cols = [i for i in group if columns[i].startswith('Parameter Value[')]
+    if len(pv_cols) > 0:
+        keys = [node_key + ':' + protocol_ref + ':' + '/'.join(pvs) for node_key, protocol_ref, pvs in
+                zip(node_keys, protocol_refs, values[:, pv_cols])]
+    else:
+        keys = [node_key + '/' + protocol_ref for node_key, protocol_ref in zip(node_keys, protocol_refs)]
+    for prefix in ('Date', 'Performer'):
+        hits = [i for i in group if columns[i].startswith(prefix)]
+        if len(hits) == 1:
+            keys = [':'.join([key, value]) for key, value in zip(keys, values[:, hits[0]])]
+    return keys
+
+
+def _table_nodes(DF, study_DF=None):
+    """The (label, name) of each material and data node the loader would
+    create from a study or assay table"""
+    columns = list(DF.columns)
+
+    def names(label):
+        if label in columns:
+            return {str(x) for x in DF.iloc[:, columns.index(label)] if x != ''}
+        return set()
+
+    nodes = set()
+    for label in ('Source Name', 'Extract Name'):
+        nodes.update((label, x) for x in names(label))
+    sample_names = names('Sample Name')
+    if study_DF is not None:
+        study_columns = list(study_DF.columns)
+        if 'Sample Name' in study_columns:
+            sample_names &= set(study_DF.iloc[:, study_columns.index('Sample Name')])
+        else:
+            sample_names = set()
+    nodes.update(('Sample Name', x) for x in sample_names)
+    if 'Label' in columns:
+        nodes.update(('Labeled Extract Name', x) for x in names('Labeled Extract Name'))
+    for label in [x for x in columns if x.endswith(' File')]:
+        nodes.update((label, x) for x in names(label))
+    return nodes
+
+
+def detect_table_process_pooling(DF, study_DF=None, protocol_names=None):
+    """Detect process pooling in a study or assay table, without loading it
+    into the model
+
+    Processes are keyed, given inputs and outputs and linked as in
+    isatab.ProcessSequenceFactory, and a process is pooling if it would have
+    more than one in-edge in the graph of the loaded table, as in
+    detect_graph_process_pooling(). Unlike building that graph, a last
+    process that only outputs data files does not stop the detection.
+
+    :param DF: A study or assay table, as loaded by isatab.load_table()
+    :param study_DF: The study table, if DF is an assay table; only samples
+        declared in it are inputs of the assay processes
+    :param protocol_names: Protocol names declared in the study, used to
+        report undeclared protocols as unknown as the loader does
+    :return: A list of the ids of the pooling processes, as returned by
+        detect_graph_process_pooling() (processes loaded from ISA-Tab have
+        no ids)
+    """
+    header = []
+    for column in DF.columns:
+        hits = re.match(r'(.*)\.\d+$', column)
+        header.append(hits.group(1) if hits and '[' not in column else column)
+    DF = DF.copy(deep=False)
+    DF.isatab_header = header
+    DF = isatab.preprocess(DF=DF)
+    columns = list(DF.columns)
+    values = DF.values
+    node_labels = isatab._LABELS_MATERIAL_NODES + isatab._LABELS_DATA_NODES
+    node_cols = [i for i, c in enumerate(columns) if c in node_labels]
+    proc_cols = [i for i, c in enumerate(columns) if c.startswith('Protocol REF')]
+    object_index = [i for i, x in enumerate(DF.isatab_header) if x in node_labels + ['Protocol REF']]
+    nodes = _table_nodes(DF, study_DF)
+
+    def node_at(index, row):
+        node = (columns[index], str(row[index]))
+        return node if node in nodes else None
+
+    processes = OrderedDict()  # process key -> Protocol REF
+    inputs = {}
+    outputs = {}
+    key_columns = []
+    for group_index, start in enumerate(object_index):
+        if not columns[start].startswith('Protocol REF'):
+            continue
+        end = object_index[group_index + 1] if group_index + 1 < len(object_index) else len(columns)
+        keys = _table_process_keys(DF, range(start, end), group_index, node_cols)
+        key_columns.append(keys)
+        output_node_index = isatab.find_gt(node_cols, start)
+        output_proc_index = isatab.find_gt(proc_cols, start)
+        input_node_index = isatab.find_lt(node_cols, start)
+        input_proc_index = isatab.find_lt(proc_cols, start)
+        for key, row in zip(keys, values):
+            if key not in processes:
+                processes[key] = row[start]
+                inputs[key] = set()
+                outputs[key] = set()
+            if output_proc_index < output_node_index > -1:
+                node = node_at(output_node_index, row)
+                if node is not None:
+                    outputs[key].add(node)
+            if input_proc_index < input_node_index > -1:
+                node = node_at(input_node_index, row)
+                if node is not None:
+                    inputs[key].add(node)
+
+    # link the processes of each row, the last row winning as with plink()
+    prev_process = {}
+    next_process = {}
+    for keys in zip(*key_columns):
+        for l, r in zip(keys, keys[1:]):
+            next_process[l] = r
+            prev_process[r] = l
+
+    in_edges = {key: set(('node',) + node for node in inputs[key]) for key in processes}
+    for key in processes:
+        if not inputs[key] and key in prev_process:
+            in_edges[key].add(('process', prev_process[key]))
+        material_outputs = [node for node in outputs[key] if node[0] in isatab._LABELS_MATERIAL_NODES]
+        if not material_outputs and key in next_process:
+            in_edges[next_process[key]].add(('process', key))
+
+    report = []
+    for key, protocol_ref in processes.items():
+        if len(in_edges[key]) > 1:
+            if protocol_names is not None and protocol_ref not in protocol_names:
+                protocol_ref = 'unknown protocol'
+            log.info('Possible process pooling detected on: {}'.format(' '.join(['', protocol_ref])))
+            report.append('')
+    return report
+
+
 def insert_distinct_parameter(table_fp, protocol_ref_to_unpool):
     reader = csv.reader(table_fp, dialect='excel-tab')
     headers = next(reader)  # get column headings
@@ -131,63 +292,113 @@ def contains(small_list, big_list):
     return False
 
 
+ARCHIVE_COMPRESSIONS = ('deflate', 'store', 'auto')
+
+# data file extensions whose contents are already compressed (or, for
+# vendor raw files and mzML, barely compress), so are stored as is
+STORED_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zip', '.7z', '.bam', '.cram', '.sff', '.raw', '.wiff', '.mzml',
+                     '.mzxml', '.jpg', '.jpeg', '.png')
+
+
+def archive_compress_type(filename, compression='store'):
+    """Get the ZIP compression method of a member of an ISArchive
+
+    :param filename: Name of the member
+    :param compression: One of ARCHIVE_COMPRESSIONS: 'store' all members
+        uncompressed, 'deflate' them all, or 'auto' to store the members with
+        one of STORED_EXTENSIONS and deflate the others
+    :return: zipfile.ZIP_DEFLATED or zipfile.ZIP_STORED
+    """
+    if compression not in ARCHIVE_COMPRESSIONS:
+        raise ValueError("Unknown compression {}, expected one of {}".format(compression, ARCHIVE_COMPRESSIONS))
+    if compression == 'store' or (compression == 'auto' and filename.lower().endswith(STORED_EXTENSIONS)):
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def _read_data_filenames(table_path):
+    # the data file names of an assay table, read from its data file columns
+    # without loading the table
+    filenames = set()
+    with open(table_path, encoding='utf-8') as fp:
+        reader = csv.reader((line for line in fp if not line.startswith('#')), dialect='excel-tab')
+        header = next(reader, [])
+        columns = [i for i, label in enumerate(header) if label.strip() in isatab._LABELS_DATA_NODES]
+        for row in reader:
+            for i in columns:
+                if i < len(row) and row[i] != '':
+                    filenames.add(row[i])
+    return sorted(filenames)
+
+
 def create_isatab_archive(inv_fp, target_filename=None, 
-                          filter_by_measurement=None):
+                          filter_by_measurement=None, compression='store', workers=None):
     """Function to create an ISArchive; option to select by assay measurement type
 
+    The files to archive are found from the investigation file and the data
+    file columns of the assay tables, without loading the ISA model. The
+    members are compressed in parallel and the archive written out as they
+    are, so the target can be a pipe; see isatools.io.zipstream.
+
+    :param inv_fp: File pointer to the investigation file
+    :param target_filename: Path of the archive, by default isatab.zip next
+        to the investigation file, or a writable binary file object (which
+        need not be seekable, e.g. a pipe)
+    :param filter_by_measurement: Only archive the assays of this measurement
+        type
+    :param compression: 'store' (default) to write the members uncompressed,
+        'deflate' to compress them, or 'auto' to only compress the ISA-Tab
+        files and the data files that are not already compressed; see
+        archive_compress_type()
+    :param workers: Number of threads compressing the members, by default
+        the number of CPUs
+    :return: List of the names of the archive members, or None if data files
+        are missing, in which case no archive is written
+
     Example usage:
 
         >>> create_isatab_archive(open('/path/to/i_investigation.txt', target_filename='isatab.zip')
         >>> create_isatab_archive(open('/path/to/i.txt', filter_by_measurement='transcription profiling')
+        >>> create_isatab_archive(open('/path/to/i.txt'), compression='auto')
+        >>> create_isatab_archive(open('/path/to/i.txt'), target_filename=sys.stdout.buffer, workers=8)
     """
+    archive_compress_type('', compression)  # fail on a bad compression before loading
     if target_filename is None:
         target_filename = os.path.join(
             os.path.dirname(inv_fp.name), 'isatab.zip')
-    ISA = isatab.load(inv_fp)
+    ISA = isatab.load(inv_fp, skip_load_tables=True)
+    dirname = os.path.dirname(inv_fp.name)
     
+    isa_files_in_isatab = [os.path.basename(inv_fp.name)]
     all_files_in_isatab = []
-    found_files = []
     
     for s in ISA.studies:
         if filter_by_measurement is not None:
-            log.debug('Selecting ', filter_by_measurement)
+            log.debug('Selecting %s', filter_by_measurement)
             selected_assays = [a for a in s.assays if 
                                a.measurement_type.term == filter_by_measurement]
         else:
             selected_assays = s.assays
             
+        isa_files_in_isatab.append(s.filename)
         for a in selected_assays:
-            all_files_in_isatab += [d.filename for d in a.data_files]
-    dirname = os.path.dirname(inv_fp.name)
-    
-    for fname in all_files_in_isatab:
-        if os.path.isfile(os.path.join(dirname, fname)):
-            found_files.append(fname)
-    missing_files = [f for f in all_files_in_isatab if f not in found_files]
+            isa_files_in_isatab.append(a.filename)
+            all_files_in_isatab += _read_data_filenames(os.path.join(dirname, a.filename))
+    missing_files = FileIndex(dirname).missing(all_files_in_isatab)
     
     if len(missing_files) == 0:
         log.debug('Do zip')
-        with ZipFile(target_filename, mode='w') as zip_file:
-            # use relative dir_name to avoid absolute path on file names
-            zip_file.write(inv_fp.name, arcname=os.path.basename(inv_fp.name))
-            
-            for s in ISA.studies:
-                zip_file.write(
-                    os.path.join(dirname, s.filename), arcname=s.filename)
-                
-                for a in selected_assays:
-                    zip_file.write(
-                        os.path.join(dirname, a.filename), arcname=a.filename)
-                    
-            for file in all_files_in_isatab:
-                zip_file.write(os.path.join(dirname, file), arcname=file)
-                
-            log.debug(zip_file.namelist())
-            return zip_file.namelist()
+        # use relative file names as arcnames to avoid absolute paths
+        members = [(os.path.join(dirname, file), file, archive_compress_type(file, compression))
+                   for file in isa_files_in_isatab + all_files_in_isatab]
+        with ZipStreamWriter(target_filename, workers=workers) as zip_stream:
+            zip_stream.write_files(members)
+        log.debug(zip_stream.namelist())
+        return zip_stream.namelist()
         
     else:
         log.debug('Not zipping')
-        log.debug('Missing: ', missing_files)
+        log.debug('Missing: %s', missing_files)
         return None
 
 
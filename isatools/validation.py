@@ -0,0 +1,532 @@
+"""Machinery shared by the ISA-Tab and ISA-JSON validators."""
+from __future__ import absolute_import
+import codecs
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from io import StringIO
+
+from isatools.io.file_index import FileIndex
+
+
+log = logging.getLogger('isatools')
+
+
+def iter_batch(validate_one, items, workers=None):
+    """Run a validation function over a batch of items
+
+    If workers is greater than 1, items are fanned out to a pool of that many
+    processes and results are yielded as soon as they complete, otherwise the
+    items are validated one after another in the calling process.
+
+    :param validate_one: A picklable (i.e. module level) function taking one
+        item of the batch
+    :param items: List of items to validate, e.g. file paths
+    :param workers: Number of worker processes to use
+    :return: Iterator of (index of item in items, result) tuples
+    """
+    if workers is None or workers <= 1:
+        for index, item in enumerate(items):
+            yield index, validate_one(item)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = dict()
+            for index, item in enumerate(items):
+                futures[executor.submit(validate_one, item)] = index
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+
+#: Categories of rules, by the thousands digit of the codes they report
+RULE_CATEGORIES = {
+    'files': 0,
+    'consistency': 1,
+    'format': 3,
+    'configuration': 4,
+    'study_groups': 5
+}
+
+
+_extra_rule_categories = set()
+
+
+def rule(*codes, categories=()):
+    """Register a function as a validation rule
+
+    Records the codes of the findings the rule reports, and the categories
+    it belongs to, so that rules can be selected for a run with
+    RuleSelection. Categories are derived from the codes (see
+    RULE_CATEGORIES); extra ones can be given for rules reporting no codes.
+    """
+    _extra_rule_categories.update(categories)
+
+    def register(func):
+        func.rule_codes = frozenset(codes)
+        func.rule_categories = frozenset(
+            [c for c, digit in RULE_CATEGORIES.items() if any(code // 1000 == digit for code in codes)]
+            + list(categories))
+        return func
+    return register
+
+
+class RuleSelection(object):
+    """A selection of the rules to run in a validation
+
+    :param rules: Iterable of rule codes (e.g. 4002) and rule categories (e.g.
+        'configuration', see RULE_CATEGORIES); a rule is selected if it
+        reports any of the codes or belongs to any of the categories
+    :raises ValueError: If a category is not known
+    """
+
+    def __init__(self, rules):
+        rules = list(rules)
+        self.codes = frozenset(r for r in rules if isinstance(r, int))
+        self.categories = frozenset(r for r in rules if not isinstance(r, int))
+        unknown = self.categories - set(RULE_CATEGORIES) - _extra_rule_categories
+        if len(unknown) > 0:
+            raise ValueError("Unknown rule categories {}, expected rule codes or one of {}".format(
+                sorted(unknown), sorted(set(RULE_CATEGORIES) | _extra_rule_categories)))
+
+    def selects(self, rule):
+        return (not self.codes.isdisjoint(getattr(rule, 'rule_codes', ()))
+                or not self.categories.isdisjoint(getattr(rule, 'rule_categories', ())))
+
+    def __repr__(self):
+        return 'RuleSelection({!r})'.format(sorted(self.codes) + sorted(self.categories))
+
+
+class StopValidation(Exception):
+    """Raised to stop a validation run once it has found enough errors"""
+
+
+class ValidationContext(object):
+    """The state of a single validation run
+
+    Rules record their findings in the context they are passed rather than in
+    module level lists, so that several validations can run concurrently in
+    threads of the same process.
+
+    The context also holds the files parsed during the run (tables, keyed by
+    path), so that rules looking at the same file share a single parse, and
+    the EncodingCheck of each table found when decoding it (encodings, keyed
+    by path), and an index of the files of each directory checked for data
+    files (see file_index).
+    """
+
+    def __init__(self, cache=None, selection=None, max_errors=None, profile=False, hooks=None):
+        self.errors = []
+        self.warnings = []
+        self.info = []
+        self.tables = dict()
+        self.encodings = dict()
+        self.file_indexes = dict()
+        self.cache = cache
+        self.cache_key = ()
+        self.selection = selection
+        self.max_errors = max_errors
+        self.profile = [] if profile else None
+        self.hooks = list(hooks or [])
+        self._frames = []
+
+    def file_index(self, dirname):
+        """Get the FileIndex of a directory, shared by the rules of the run
+
+        :param dirname: Path of the directory
+        :return: A FileIndex of the directory
+        """
+        if dirname not in self.file_indexes:
+            self.file_indexes[dirname] = FileIndex(dirname)
+        return self.file_indexes[dirname]
+
+    @property
+    def profiling(self):
+        """Whether the cost of the rules run in this context is recorded"""
+        return self.profile is not None or len(self.hooks) > 0
+
+    @contextmanager
+    def profiled(self, name, cached=False):
+        """Record the cost of a rule, or of another step of a validation
+
+        On exit a profile record is appended to the profile of the context
+        and passed to each of its hooks. A record is a dict of the rule name,
+        whether its findings were replayed from a cache, the wall time in
+        seconds (including the rules it ran in turn), and the rows, cells
+        and bytes_read the rule itself accounted for, in total and per file.
+        """
+        if not self.profiling:
+            yield
+            return
+        frame = _ProfileFrame(name, cached)
+        self._frames.append(frame)
+        try:
+            yield
+        finally:
+            self._frames.pop()
+            record = frame.record()
+            if self.profile is not None:
+                self.profile.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+    def account(self, filename, rows=0, cells=0, bytes_read=0):
+        """Account for the rows and cells a rule scans or bytes it reads from a file"""
+        if self._frames:
+            self._frames[-1].add(filename, rows, cells, bytes_read)
+
+    def call(self, rule, *args, **kwargs):
+        """Call a rule from within another rule, profiling it on its own
+
+        Tables (DataFrames) passed to the rule are accounted as scanned by it.
+        Once the run has found max_errors errors StopValidation is raised, so
+        rules made up of other rules stop between them.
+        """
+        with self.profiled(rule.__name__):
+            if self._frames:
+                for arg in args:
+                    shape = getattr(arg, 'shape', None)
+                    if shape is not None and len(shape) == 2:
+                        self.account(getattr(arg, 'filename', None), rows=shape[0], cells=shape[0] * shape[1])
+            result = rule(*args, ctx=self, **kwargs)
+        self.check_max_errors()
+        return result
+
+    def selects(self, rule):
+        """Whether a rule is selected to run in this context"""
+        return self.selection is None or self.selection.selects(rule)
+
+    def check_max_errors(self):
+        """Raise StopValidation if the run has found max_errors errors"""
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            raise StopValidation("Stopped after {} errors".format(len(self.errors)))
+
+    def run(self, rule, *args, files=(), params=(), default=None, cacheable=True, **kwargs):
+        """Run a rule function in this context, passing it ctx=self
+
+        Without a cache this is the same as calling the rule. With a cache,
+        the findings of the rule are looked up by the content of the files
+        it reads, the other parameters its findings depend on and the
+        cache_key of the run; if an earlier run of the rule on the same
+        inputs is found, its findings and log messages are replayed and its
+        return value returned instead of running the rule again.
+
+        Rules that are not selected for the run are skipped, and once the
+        run has found max_errors errors StopValidation is raised.
+
+        :param rule: A rule function, taking a ctx keyword argument
+        :param files: Paths to the files that the rule reads
+        :param params: Hashable description of the other inputs of the rule
+            that are not derived from the files, e.g. names and settings
+        :param default: What to return if the rule is not selected
+        :param cacheable: False for rules whose findings depend on more than
+            the content of their files, e.g. on which data files exist, so
+            they always run
+        :return: The return value of the rule
+        """
+        self.check_max_errors()
+        if not self.selects(rule):
+            return default
+        if self.cache is None or not cacheable:
+            with self.profiled(rule.__name__):
+                result = rule(*args, ctx=self, **kwargs)
+        else:
+            key = self.cache.key(rule, files, params, self.cache_key)
+            findings = self.cache.get(key)
+            if findings is not None:
+                with self.profiled(rule.__name__, cached=True):
+                    result = findings.replay(self)
+            else:
+                with self.profiled(rule.__name__), _FindingsRecorder(self) as recorder:
+                    result = rule(*args, ctx=self, **kwargs)
+                self.cache.put(key, recorder.findings(result))
+        self.check_max_errors()
+        return result
+
+
+class _ProfileFrame(object):
+
+    def __init__(self, name, cached):
+        self.name = name
+        self.cached = cached
+        self.files = OrderedDict()
+        self.start = time.perf_counter()
+
+    def add(self, filename, rows, cells, bytes_read):
+        counts = self.files.setdefault(filename, {"rows": 0, "cells": 0, "bytes_read": 0})
+        counts["rows"] += int(rows)
+        counts["cells"] += int(cells)
+        counts["bytes_read"] += int(bytes_read)
+
+    def record(self):
+        return {
+            "rule": self.name,
+            "cached": self.cached,
+            "seconds": time.perf_counter() - self.start,
+            "rows": sum(f["rows"] for f in self.files.values()),
+            "cells": sum(f["cells"] for f in self.files.values()),
+            "bytes_read": sum(f["bytes_read"] for f in self.files.values()),
+            "files": dict(self.files)
+        }
+
+
+def file_size(fp):
+    """Get the size in bytes of an open file, or 0 if it is not a file on disk"""
+    try:
+        return os.fstat(fp.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+# Whether a file decodes with an encoding and, if not, the byte offset, line
+# (from 1) and reason of its first invalid byte sequence
+EncodingCheck = namedtuple('EncodingCheck', ['encoding', 'valid', 'offset', 'line', 'reason'])
+
+
+def check_encoding(fp, encoding='utf-8', block_size=1 << 20, blocks=None):
+    """Check that a file decodes with an encoding, a block at a time
+
+    Decoding stops at the first invalid byte sequence, so a file that is not
+    in the encoding is rejected without reading it all, and a large file is
+    never held in memory as a whole unless its text is asked for.
+
+    :param fp: A binary file object, read from its current position
+    :param encoding: Name of the encoding expected
+    :param block_size: Number of bytes decoded at a time
+    :param blocks: Optional list to append the decoded text blocks to
+    :return: An EncodingCheck
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    offset = 0
+    lines = 0
+    for block in iter(lambda: fp.read(block_size), b''):
+        pending = decoder.getstate()[0]
+        try:
+            text = decoder.decode(block)
+        except UnicodeDecodeError as e:
+            return _invalid_encoding(encoding, e, offset - len(pending), lines)
+        if blocks is not None:
+            blocks.append(text)
+        offset += len(block)
+        lines += block.count(b'\n')
+    pending = decoder.getstate()[0]
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        return _invalid_encoding(encoding, e, offset - len(pending), lines)
+    return EncodingCheck(encoding, True, None, None, None)
+
+
+def _invalid_encoding(encoding, e, offset, lines):
+    line = lines + e.object[:e.start].count(b'\n') + 1
+    return EncodingCheck(encoding, False, offset + e.start, line, e.reason)
+
+
+def read_text(fp, encoding='utf-8', fallback='latin1', block_size=1 << 20):
+    """Read a file as text, checking its encoding as it is decoded
+
+    The file is decoded once with check_encoding(); only if it turns out not
+    to be in the encoding is it read again, with the fallback encoding.
+
+    :param fp: A binary file object
+    :param encoding: Name of the encoding expected
+    :param fallback: Name of the encoding to read the file with otherwise
+    :param block_size: Number of bytes decoded at a time
+    :return: A tuple of a StringIO of the text, with universal newlines and
+        the name of fp, and the EncodingCheck of the file
+    """
+    blocks = []
+    check = check_encoding(fp, encoding=encoding, block_size=block_size, blocks=blocks)
+    if check.valid:
+        text = ''.join(blocks)
+    else:
+        fp.seek(0)
+        text = fp.read().decode(fallback)
+    text_fp = StringIO(text, newline=None)
+    text_fp.name = getattr(fp, 'name', None)
+    return text_fp, check
+
+
+class _Findings(object):
+    """What a rule reported: findings, log records and its return value"""
+
+    def __init__(self, errors, warnings, info, records, result):
+        self.errors = errors
+        self.warnings = warnings
+        self.info = info
+        self.records = records
+        self.result = result
+
+    def replay(self, ctx, logger=log):
+        ctx.errors.extend(copy.deepcopy(self.errors))
+        ctx.warnings.extend(copy.deepcopy(self.warnings))
+        ctx.info.extend(copy.deepcopy(self.info))
+        for levelno, message in self.records:
+            logger.log(levelno, message)
+        return copy.deepcopy(self.result)
+
+
+class _RecordsHandler(logging.Handler):
+
+    def __init__(self):
+        super(_RecordsHandler, self).__init__()
+        self.thread = threading.get_ident()
+        self.records = []
+
+    def filter(self, record):
+        return record.thread == self.thread
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+class _FindingsRecorder(object):
+    """Record the findings and log messages a rule adds to a context"""
+
+    def __init__(self, ctx, logger=log):
+        self._ctx = ctx
+        self._logger = logger
+        self._handler = _RecordsHandler()
+
+    def __enter__(self):
+        self._marks = (len(self._ctx.errors), len(self._ctx.warnings), len(self._ctx.info))
+        self._logger.addHandler(self._handler)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._logger.removeHandler(self._handler)
+
+    def findings(self, result):
+        errors, warnings, info = self._marks
+        return _Findings(copy.deepcopy(self._ctx.errors[errors:]), copy.deepcopy(self._ctx.warnings[warnings:]),
+                         copy.deepcopy(self._ctx.info[info:]), list(self._handler.records), copy.deepcopy(result))
+
+
+class ValidationCache(object):
+    """A bounded, content-addressed cache of validation rule findings
+
+    Passed to a validator, e.g. isatab.validate(fp, cache=cache), it lets
+    later validations of the same or edited files reuse the findings of the
+    rules whose input files have not changed. The least recently used
+    findings are evicted once max_entries are held. File hashes are
+    remembered per path for as long as a file's size and modification time
+    stay the same. A cache may be shared by concurrent validations.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+
+    def file_digest(self, path):
+        """Get the SHA-1 of the content of a file, or None if it can't be read
+
+        :param path: Path to the file
+        :return: Hex digest of the file content
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        sha1 = hashlib.sha1()
+        try:
+            with open(path, 'rb') as fp:
+                for chunk in iter(lambda: fp.read(1 << 20), b''):
+                    sha1.update(chunk)
+        except OSError:
+            return None
+        digest = sha1.hexdigest()
+        with self._lock:
+            self._digests[path] = (signature, digest)
+            self._digests.move_to_end(path)
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+        return digest
+
+    def key(self, rule, files, params, cache_key=()):
+        digests = tuple(self.file_digest(f) for f in files)
+        rule_name = '{}.{}'.format(rule.__module__, rule.__name__)
+        return hashlib.sha1(repr((rule_name, digests, params, cache_key)).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            findings = self._entries.get(key)
+            if findings is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return findings
+
+    def put(self, key, findings):
+        with self._lock:
+            self._entries[key] = findings
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class LogCapture(object):
+    """Capture the messages logged by the current thread to a logger
+
+    The capturing handler is only attached between start() and stop() (or for
+    the duration of a with block), and ignores records emitted by other
+    threads, so validations running concurrently each see their own messages.
+    """
+
+    def __init__(self, logger=log):
+        self._logger = logger
+        self._stream = StringIO()
+        self._handler = logging.StreamHandler(self._stream)
+        self._handler.addFilter(self._is_current_thread)
+        self._thread = None
+
+    def _is_current_thread(self, record):
+        return record.thread == self._thread
+
+    def start(self):
+        self._thread = threading.get_ident()
+        self._logger.addHandler(self._handler)
+        return self
+
+    def stop(self):
+        self._logger.removeHandler(self._handler)
+        self._handler.flush()
+        self._handler.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def getvalue(self):
+        self._handler.flush()
+        return self._stream.getvalue()
+
+    @property
+    def messages(self):
+        return self.getvalue().splitlines()
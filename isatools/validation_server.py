@@ -0,0 +1,295 @@
+"""A long-running local validation service for ISA-Tab and ISA-JSON.
+
+Validating from the command line or from a fresh interpreter pays for the
+imports, parsing the table configurations and loading the JSON schemas every
+time. The server pays for them once and keeps them warm, together with a
+validation.ValidationCache shared by the ISA-Tab jobs, and runs the jobs it
+is sent over HTTP on a pool of worker threads.
+
+Start it with ``validate-server`` (or ``python -m isatools.validation_server``)
+and send jobs as JSON to POST /validate, for example::
+
+    curl -d '{"path": "/path/to/BII-I-1"}' http://127.0.0.1:8778/validate
+
+A job is a dict with the path of an ISA-Tab directory, investigation file or
+ISA-JSON file, and optionally the format ("isatab" or "isajson", found from
+the path otherwise), config_dir, and for ISA-Tab rules, max_errors,
+detect_pooling and check_data_files_exist, as taken by isatab.validate().
+The response is a stream of JSON lines: an "accepted" event, a "progress"
+event with the profile record of each rule as it completes, and a final
+"report" event holding the filename and report of the job, as in a batch
+report entry (or an "error" event). With "progress": false in the job, the
+response is only the {"filename": ..., "report": ...} entry. GET /status
+gives the number of workers, the jobs running and the cache statistics.
+"""
+from __future__ import absolute_import
+import argparse
+import glob
+import itertools
+import json
+import logging
+import os
+import queue
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+
+from isatools import isajson
+from isatools import isatab
+from isatools import validation
+from isatools.io import isatab_configurator
+
+
+log = logging.getLogger('isatools')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8778
+
+_JOB_OPTIONS = {
+    'isatab': ('config_dir', 'rules', 'max_errors', 'detect_pooling', 'check_data_files_exist'),
+    'isajson': ('config_dir',)
+}
+
+
+def parse_job(job):
+    """Check a validation job sent to the server
+
+    :param job: Dict of the job, as decoded from its JSON
+    :return: The job, with its format filled in
+    :raises ValueError: If the job is not a valid validation job
+    """
+    if not isinstance(job, dict) or not isinstance(job.get('path'), str):
+        raise ValueError("A job must be a JSON object with the path to validate")
+    job = dict(job)
+    if 'format' not in job:
+        job['format'] = 'isajson' if job['path'].lower().endswith('.json') else 'isatab'
+    if job['format'] not in _JOB_OPTIONS:
+        raise ValueError("Unknown format {}, expected one of {}".format(job['format'], sorted(_JOB_OPTIONS)))
+    unknown = set(job) - set(_JOB_OPTIONS[job['format']]) - {'path', 'format', 'progress'}
+    if len(unknown) > 0:
+        raise ValueError("Unknown options for {} validation: {}".format(job['format'], sorted(unknown)))
+    return job
+
+
+def run_job(job, cache=None, hooks=None):
+    """Validate the ISA-Tab or ISA-JSON of a job
+
+    :param job: A job, as returned by parse_job()
+    :param cache: Optional validation.ValidationCache for ISA-Tab jobs
+    :param hooks: Optional list of callables, each called with the profile
+        record of every rule once it has run
+    :return: Dict of the filename validated and its report
+    """
+    path = job['path']
+    options = dict((k, v) for k, v in job.items() if k in _JOB_OPTIONS[job['format']])
+    if job['format'] == 'isatab':
+        if os.path.isdir(path):
+            i_files = glob.glob(os.path.join(path, 'i_*.txt'))
+            if len(i_files) != 1:
+                raise ValueError("Could not find an investigation file in {}".format(path))
+            path = i_files[0]
+        with open(path, encoding='utf-8') as fp:
+            report = isatab.validate(fp, cache=cache, hooks=hooks, **options)
+    else:
+        with open(path) as fp:
+            report = isajson.validate(fp, hooks=hooks, **options)
+    return {
+        "filename": path,
+        "report": report
+    }
+
+
+class ValidationServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server running validation jobs on a pool of worker threads
+
+    Validations only share the process wide caches (configurations, JSON
+    schemas and the validation cache), so any number of jobs can run at the
+    same time; workers bounds how many do.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), workers=None, cache=True):
+        """
+        :param address: (host, port) to listen on; port 0 picks a free port
+        :param workers: Number of jobs run at the same time, by default the
+            number of CPUs
+        :param cache: True to share a new validation.ValidationCache between
+            the ISA-Tab jobs, False for none, or a ValidationCache to use
+        """
+        HTTPServer.__init__(self, address, _ValidationRequestHandler)
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        if cache is True:
+            cache = validation.ValidationCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+        self._job_ids = itertools.count(1)
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self, isatab_config_dir=isatab.default_config_dir, isajson_config_dir=isajson.default_config_dir):
+        """Load the table configurations and JSON schemas jobs will need"""
+        isatab_configurator.load_compiled(isatab_config_dir)
+        isajson.get_schema_validator(os.path.join(
+            isajson.BASE_DIR, "resources", "schemas", "isa_model_version_1_0_schemas", "core",
+            "investigation_schema.json"))
+        isajson.get_schema_validator(os.path.join(isajson_config_dir, "schemas", "investigation_schema.json"))
+
+    def submit(self, job, hooks=None):
+        """Queue a job to the workers
+
+        :param job: A job, as returned by parse_job()
+        :param hooks: Optional list of callables, each called with the
+            profile record of every rule once it has run
+        :return: Tuple of the job id and the Future of its result
+        """
+        job_id = next(self._job_ids)
+        future = self.executor.submit(self._run, job_id, job, hooks)
+        return job_id, future
+
+    def _run(self, job_id, job, hooks):
+        with self._lock:
+            self._running += 1
+        try:
+            log.info("Running job {} on {}".format(job_id, job['path']))
+            return run_job(job, cache=self.cache, hooks=hooks)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def status(self):
+        with self._lock:
+            running = self._running
+        status = {
+            "workers": self.workers,
+            "running": running
+        }
+        if self.cache is not None:
+            status["cache"] = {
+                "entries": len(self.cache),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses
+            }
+        return status
+
+    def server_close(self):
+        HTTPServer.server_close(self)
+        self.executor.shutdown(wait=False)
+
+
+class _ValidationRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != '/status':
+            self._send_json(404, {"error": "Not found: {}".format(self.path)})
+        else:
+            self._send_json(200, self.server.status())
+
+    def do_POST(self):
+        if self.path != '/validate':
+            self._send_json(404, {"error": "Not found: {}".format(self.path)})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = parse_job(json.loads(self.rfile.read(length).decode('utf-8')))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if not job.get('progress', True):
+            _, future = self.server.submit(job)
+            try:
+                self._send_json(200, future.result())
+            except Exception as e:
+                self._send_json(500, {"error": "{}: {}".format(type(e).__name__, e)})
+            return
+        events = queue.Queue()
+        job_id, future = self.server.submit(job, hooks=[events.put])
+        future.add_done_callback(lambda _: events.put(None))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            self._write_event({"event": "accepted", "job": job_id})
+            for record in iter(events.get, None):
+                self._write_event({"event": "progress", "job": job_id, "record": record})
+            try:
+                event = dict(future.result(), event="report", job=job_id)
+            except Exception as e:
+                event = {"event": "error", "job": job_id, "error": "{}: {}".format(type(e).__name__, e)}
+            self._write_event(event)
+        except (BrokenPipeError, ConnectionResetError):
+            log.info("Client of job {} went away".format(job_id))
+
+    def _write_event(self, event):
+        self.wfile.write(json.dumps(event).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def _send_json(self, code, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        log.debug("{} - {}".format(self.address_string(), format % args))
+
+
+def iter_server_validate(path, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=None, **options):
+    """Send a validation job to a running server, yielding its events
+
+    :param path: Path of the ISA-Tab directory, investigation file or
+        ISA-JSON file to validate
+    :param host: Host the server listens on
+    :param port: Port the server listens on
+    :param timeout: Socket timeout in seconds
+    :param options: Other options of the job, e.g. format or max_errors
+    :return: Iterator of the event dicts of the job, ending with its report
+    """
+    job = dict(options, path=os.path.abspath(path), progress=True)
+    connection = HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request('POST', '/validate', body=json.dumps(job).encode('utf-8'),
+                           headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        if response.status != 200:
+            raise ValueError(json.loads(response.read().decode('utf-8'))['error'])
+        for line in response:
+            yield json.loads(line.decode('utf-8'))
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    """Run the validation server until interrupted"""
+    p = argparse.ArgumentParser(prog='validate-server',
+                                description='Validate ISA-Tab and ISA-JSON sent over HTTP, with warm caches')
+    p.add_argument('--host', default=DEFAULT_HOST, help='address to listen on [default: %(default)s]')
+    p.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on [default: %(default)s]')
+    p.add_argument('--workers', type=int, default=None, help='number of jobs run at the same time '
+                                                             '[default: number of CPUs]')
+    p.add_argument('--no-cache', dest='cache', action='store_false', default=True,
+                   help='do not replay the findings of unchanged files between ISA-Tab jobs')
+    args = p.parse_args(argv if argv is not None else sys.argv[1:])
+
+    server = ValidationServer((args.host, args.port), workers=args.workers, cache=args.cache)
+    server.warm_up()
+    print("Validation server listening on http://{}:{} with {} workers".format(
+        server.server_address[0], server.server_address[1], server.workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -61,5 +61,10 @@ setup(
         'progressbar2',
         'deepdiff'
     ],
+    entry_points={
+        'console_scripts': [
+            'validate-server = isatools.validation_server:main'
+        ]
+    },
     test_suite='tests'
 )
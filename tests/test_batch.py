@@ -0,0 +1,70 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from isatools import batch
+from isatools.tests import utils
+
+
+def setUpModule():
+    if not os.path.exists(utils.DATA_DIR):
+        raise FileNotFoundError("Could not fine test data directory in {0}. Ensure you have cloned the ISAdatasets "
+                                "repository using "
+                                "git clone -b tests --single-branch git@github.com:ISA-tools/ISAdatasets {0}"
+                                .format(utils.DATA_DIR))
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self._tab_data_dir = utils.TAB_DATA_DIR
+        self._tmp_dir = tempfile.mkdtemp()
+        self._in_dir = os.path.join(self._tmp_dir, 'in')
+        self._out_dir = os.path.join(self._tmp_dir, 'out')
+        os.makedirs(self._in_dir)
+        os.makedirs(self._out_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def test_find_inputs(self):
+        os.makedirs(os.path.join(self._in_dir, 'no-isatab'))
+        shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), os.path.join(self._in_dir, 'BII-I-1'))
+        for name in ('b.zip', 'c.json', 'd.txt'):
+            open(os.path.join(self._in_dir, name), 'w').close()
+        self.assertEqual(batch.find_inputs('isatab2json', self._in_dir, self._out_dir), [
+            (os.path.join(self._in_dir, 'BII-I-1'), os.path.join(self._out_dir, 'BII-I-1.json')),
+            (os.path.join(self._in_dir, 'b.zip'), os.path.join(self._out_dir, 'b.json'))])
+        self.assertEqual(batch.find_inputs('json2isatab', self._in_dir, self._out_dir), [
+            (os.path.join(self._in_dir, 'c.json'), os.path.join(self._out_dir, 'c'))])
+        self.assertEqual(batch.find_inputs('sampletab2json', self._in_dir, self._out_dir), [
+            (os.path.join(self._in_dir, 'd.txt'), os.path.join(self._out_dir, 'd.json'))])
+        self.assertEqual(len(batch.find_inputs('validate', self._in_dir, self._out_dir)), 3)
+
+    def test_read_manifest(self):
+        manifest = io.StringIO('# mirror\n/data/a.json\n\n/data/b.json\t/out/b\n')
+        self.assertEqual(batch.read_manifest(manifest, 'json2isatab', self._out_dir), [
+            ('/data/a.json', os.path.join(self._out_dir, 'a')),
+            ('/data/b.json', '/out/b')])
+
+    def test_run_batch_validate(self):
+        for name in ('a', 'b'):
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), os.path.join(self._in_dir, name))
+        with open(os.path.join(self._in_dir, 'c.zip'), 'w') as zip_fp:
+            zip_fp.write('not a zip file')
+        items = batch.find_inputs('validate', self._in_dir, self._out_dir)
+        summary = batch.run_batch('validate', items, jobs=2)
+        self.assertEqual(summary['command'], 'validate')
+        self.assertEqual([r['input'] for r in summary['items']], [item[0] for item in items])
+        self.assertEqual([r['status'] for r in summary['items']], ['ok', 'ok', 'error'])
+        self.assertEqual((summary['ok'], summary['failed']), (2, 1))
+        self.assertIn('BadZipFile', summary['items'][2]['error'])
+        self.assertTrue(all(r['seconds'] >= 0 for r in summary['items']))
+        with open(os.path.join(self._out_dir, 'a.json')) as report_fp:
+            self.assertIn('errors', json.load(report_fp))
+
+    def test_run_batch_unknown_command(self):
+        with self.assertRaises(ValueError):
+            batch.run_batch('isatab2magetab', [])
@@ -0,0 +1,68 @@
+import unittest
+import os
+import shutil
+import tempfile
+from isatools.io.file_index import FileIndex
+
+
+class TestFileIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self._tmp_dir, 'raw'))
+        for filename in ['i_investigation.txt', os.path.join('raw', 'file1.mzML')]:
+            with open(os.path.join(self._tmp_dir, filename), 'w') as fp:
+                fp.write('data')
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def test_contains(self):
+        index = FileIndex(self._tmp_dir)
+        self.assertIn('i_investigation.txt', index)
+        self.assertIn('raw/file1.mzML', index)
+        self.assertIn('./raw/file1.mzML', index)
+        self.assertNotIn('raw', index)
+        self.assertNotIn('raw/file2.mzML', index)
+        self.assertNotIn('missing/file1.mzML', index)
+        self.assertNotIn('', index)
+
+    def test_resolve(self):
+        index = FileIndex(self._tmp_dir)
+        self.assertEqual(index.resolve('raw/file1.mzML'), os.path.join(self._tmp_dir, 'raw', 'file1.mzML'))
+        self.assertIsNone(index.resolve('raw/file2.mzML'))
+
+    def test_resolve_absolute_path(self):
+        index = FileIndex(self._tmp_dir)
+        filepath = os.path.join(self._tmp_dir, 'raw', 'file1.mzML')
+        self.assertEqual(index.resolve(filepath), filepath)
+        self.assertIsNone(index.resolve(os.path.join(self._tmp_dir, 'raw', 'file2.mzML')))
+        self.assertIsNone(index.resolve(os.path.join(self._tmp_dir, 'raw')))
+        self.assertIn(filepath, FileIndex(tempfile.gettempdir()))
+        self.assertListEqual(index.missing([filepath, 'raw/file1.mzML']), [])
+
+    def test_listdir(self):
+        index = FileIndex(self._tmp_dir)
+        self.assertListEqual(list(index.listdir()), ['i_investigation.txt'])
+        self.assertListEqual(list(index.listdir('raw')), ['file1.mzML'])
+        self.assertDictEqual(index.listdir('missing'), {})
+
+    def test_listdir_is_read_once(self):
+        index = FileIndex(self._tmp_dir)
+        self.assertNotIn('raw/file2.mzML', index)
+        with open(os.path.join(self._tmp_dir, 'raw', 'file2.mzML'), 'w') as fp:
+            fp.write('data')
+        self.assertNotIn('raw/file2.mzML', index)
+        self.assertIn('raw/file2.mzML', FileIndex(self._tmp_dir))
+
+    def test_stat(self):
+        index = FileIndex(self._tmp_dir)
+        size, mtime = index.stat('raw/file1.mzML')
+        self.assertEqual(size, 4)
+        self.assertEqual(mtime, os.path.getmtime(os.path.join(self._tmp_dir, 'raw', 'file1.mzML')))
+        self.assertIsNone(index.stat('raw/file2.mzML'))
+
+    def test_missing(self):
+        index = FileIndex(self._tmp_dir)
+        self.assertListEqual(index.missing(['raw/file2.mzML', 'raw/file1.mzML', 'a.raw', 'raw/file2.mzML']),
+                             ['raw/file2.mzML', 'a.raw'])
@@ -16,6 +16,17 @@ def setUpModule():
                                 .format(utils.DATA_DIR))
 
 
+def _renumber_ids(o, ids=None):
+    # @ids are arbitrary, so number them in the order they first appear
+    ids = dict() if ids is None else ids
+    if isinstance(o, dict):
+        return dict((k, ids.setdefault(v, len(ids)) if k == '@id' and v else _renumber_ids(v, ids))
+                    for k, v in o.items())
+    elif isinstance(o, list):
+        return [_renumber_ids(x, ids) for x in o]
+    return o
+
+
 class TestIsaTab2JsonNewParser(unittest.TestCase):
 
     def setUp(self):
@@ -38,6 +49,20 @@ class TestIsaTab2JsonNewParser(unittest.TestCase):
             report = isajson.validate(actual_json)
             self.assertEqual(len(report['errors']), 0)
 
+    def test_isatab2json_stream_convert_bii_i_1(self):
+        test_case = 'BII-I-1'
+        with open(os.path.join(self._tmp_dir, 'isa.json'), 'w') as out_fp:
+            self.assertTrue(isatab2json.stream_convert(
+                os.path.join(self._tab_data_dir, test_case), out_fp, validate_first=False))
+        with open(os.path.join(self._tmp_dir, 'isa.json')) as actual_json:
+            report = isajson.validate(actual_json)
+            self.assertEqual(len(report['errors']), 0)
+        expected_json = isatab2json.convert(
+            os.path.join(self._tab_data_dir, test_case), validate_first=False,
+            use_new_parser=True)
+        with open(os.path.join(self._tmp_dir, 'isa.json')) as actual_json:
+            self.assertEqual(_renumber_ids(json.load(actual_json)), _renumber_ids(expected_json))
+
     def test_isatab2json_convert_bii_s_3(self):
         test_case = 'BII-S-3'
         actual_json = isatab2json.convert(
@@ -1,4 +1,5 @@
 import unittest
+import csv
 import os
 import shutil
 from isatools.convert import isatab2magetab
@@ -32,6 +33,18 @@ class TestIsaTab2MageTab(unittest.TestCase):
             self.assertTrue(os.path.isfile(os.path.join(self._tmp_dir, 'BII-S-1.transcriptome.sdrf.txt')))
             self.assertTrue(os.path.isfile(os.path.join(self._tmp_dir, 'BII-S-2.microarray.sdrf.txt')))
 
+    def test_isatab2magetab_convert_bii_i_1_sdrf_joins_tables(self):
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as inv_fp:
+            isatab2magetab.convert(inv_fp, self._tmp_dir)
+        headers = []
+        for path in (os.path.join(self._tab_data_dir, 'BII-I-1', 's_BII-S-1.txt'),
+                     os.path.join(self._tab_data_dir, 'BII-I-1', 'a_transcriptome.txt'),
+                     os.path.join(self._tmp_dir, 'BII-S-1.transcriptome.sdrf.txt')):
+            with open(path, encoding='utf-8') as fp:
+                headers.append(next(csv.reader(fp, dialect='excel-tab')))
+        study_header, assay_header, sdrf_header = headers
+        self.assertEqual(sdrf_header, study_header + assay_header[1:])
+
     def test_isatab2magetab_convert_bii_s_3(self):
         with open(os.path.join(self._tab_data_dir, 'BII-S-3', 'i_gilbert.txt')) as inv_fp:
             with self.assertRaises(IOError):
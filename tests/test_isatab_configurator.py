@@ -53,3 +53,37 @@ class TestIsaTabConfigurator(unittest.TestCase):
                          .table_name,'metagenome_seq')
         self.assertEqual(configurator.get_config(
             config_dict, 'metagenome sequencing', 'nucleotide sequencing')[0].header, 'Sample Name')
+
+    def test_compiled_config_lookups(self):
+        from isatools.io import isatab_configurator as configurator
+        config = configurator.compiled(configurator.parse(os.path.join(self._config_dir, 'genome_seq.xml'), True))
+        self.assertIs(configurator.compiled(config), config)
+        self.assertEqual(config.get_isatab_configuration()[0].table_name, 'genome_seq')
+        self.assertEqual(config.fields_by_header['Sample Name'].pos, config.fields[0].pos)
+        self.assertIs(config.fields_by_lower_header['sample name'], config.fields_by_header['Sample Name'])
+        self.assertIn('Sample Name', config.required_headers)
+        self.assertEqual(config.protocol_types[0][1], 'nucleic acid extraction')
+        self.assertListEqual(config.protocol_types_between(-1, 1000), [i[1] for i in config.protocol_types])
+
+    def test_load_compiled_is_cached(self):
+        from isatools.io import isatab_configurator as configurator
+        configs = configurator.load_compiled(self._config_dir)
+        self.assertEqual(len(configs), 30)
+        self.assertIs(configurator.load_compiled(self._config_dir)[('[sample]', '')], configs[('[sample]', '')])
+
+    def test_load_compiled_from_cache_file(self):
+        import shutil
+        import tempfile
+        from isatools.io import isatab_configurator as configurator
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            cache_file = os.path.join(tmp_dir, 'configs.pickle')
+            configs = configurator.load_compiled(self._config_dir, cache_file=cache_file)
+            self.assertTrue(os.path.exists(cache_file))
+            configurator._compiled_configs.clear()
+            cached_configs = configurator.load_compiled(self._config_dir, cache_file=cache_file)
+            self.assertSetEqual(set(cached_configs.keys()), set(configs.keys()))
+            self.assertEqual(cached_configs[('metagenome sequencing', 'nucleotide sequencing')].headers,
+                             configs[('metagenome sequencing', 'nucleotide sequencing')].headers)
+        finally:
+            shutil.rmtree(tmp_dir)
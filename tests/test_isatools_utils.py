@@ -7,8 +7,10 @@ import os
 import shutil
 import tempfile
 import unittest
+import io
 from io import StringIO
 from jsonschema.exceptions import ValidationError
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
 
 
 from isatools import isajson
@@ -51,6 +53,27 @@ class TestIsaGraph(unittest.TestCase):
                         sorted(pooling_list),
                         sorted(['#process/Extraction1', '#process/NMR_assay1']))
 
+    def test_detect_table_process_pooling(self):
+        import pandas as pd
+        study_df = pd.DataFrame(
+            [['source1', 'sample collection', 'sample1'],
+             ['source1', 'sample collection', 'sample2'],
+             ['source2', 'sample collection', 'sample3']],
+            columns=['Source Name', 'Protocol REF', 'Sample Name'])
+        assay_df = pd.DataFrame(
+            [['sample1', 'extraction', 'extract1'],
+             ['sample2', 'extraction', 'extract1'],
+             ['sample3', 'extraction', 'extract2']],
+            columns=['Sample Name', 'Protocol REF', 'Extract Name'])
+        protocol_names = ['sample collection', 'extraction']
+        self.assertListEqual(utils.detect_table_process_pooling(
+            study_df, protocol_names=protocol_names), [])
+        self.assertListEqual(utils.detect_table_process_pooling(
+            assay_df, study_DF=study_df, protocol_names=protocol_names), [''])
+        # samples not declared in the study are not inputs of the assay
+        self.assertListEqual(utils.detect_table_process_pooling(
+            assay_df, study_DF=study_df[2:], protocol_names=protocol_names), [])
+
     def test_detect_graph_process_pooling_batch_on_mtbls(self):
         for i in range(1, 1):
             try:
@@ -166,6 +189,34 @@ class TestISArchiveExport(unittest.TestCase):
                                          'EVHINN114.sff', 'EVHINN111.sff', 
                                          'EVNG8PH03.sff', 'EVHINN109.sff']))
 
+    def test_create_isatab_archive_compression_auto(self):
+        target_filename = os.path.join(self._tmp_dir, 'isatab.zip')
+        with open(os.path.join(
+                test_utils.TAB_DATA_DIR, 'BII-S-3', 'i_gilbert.txt')) as fp:
+            utils.create_isatab_archive(inv_fp=fp, target_filename=target_filename, compression='auto')
+        with ZipFile(target_filename) as zip_file:
+            compress_types = dict((info.filename, info.compress_type) for info in zip_file.infolist())
+        self.assertEqual(compress_types['i_gilbert.txt'], ZIP_DEFLATED)
+        self.assertEqual(compress_types['EVHINN101.sff'], ZIP_STORED)
+
+    def test_create_isatab_archive_to_stream(self):
+        target = io.BytesIO()
+        with open(os.path.join(
+                test_utils.TAB_DATA_DIR, 'BII-S-3', 'i_gilbert.txt')) as fp:
+            result = utils.create_isatab_archive(inv_fp=fp, target_filename=target, workers=2)
+        with ZipFile(io.BytesIO(target.getvalue())) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertListEqual(sorted(zip_file.namelist()), sorted(result))
+
+    def test_archive_compress_type(self):
+        self.assertEqual(utils.archive_compress_type('a_assay.txt'), ZIP_STORED)
+        self.assertEqual(utils.archive_compress_type('a_assay.txt', 'deflate'), ZIP_DEFLATED)
+        self.assertEqual(utils.archive_compress_type('a_assay.txt', 'auto'), ZIP_DEFLATED)
+        self.assertEqual(utils.archive_compress_type('raw/run1.fastq.gz', 'auto'), ZIP_STORED)
+        self.assertEqual(utils.archive_compress_type('run1.mzML', 'auto'), ZIP_STORED)
+        with self.assertRaises(ValueError):
+            utils.archive_compress_type('a_assay.txt', 'bzip2')
+
 
 class TestPubMedIDUtil(unittest.TestCase):
 
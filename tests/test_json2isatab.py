@@ -155,3 +155,13 @@ class TestJson2IsaTab(unittest.TestCase):
         with open(os.path.join(self._tmp_dir, 'a_transcriptome.txt')) as out_fp:
             with open(os.path.join(self._tab_data_dir, 'BII-I-1_written_by_isatab', 'a_transcriptome.txt')) as reference_fp:
                 self.assertTrue(assert_tab_content_equal(out_fp, reference_fp))
+
+    def test_json2isatab_convert_bii_i_1_datafile_staging_symlink(self):
+        json_dir = os.path.join(self._json_data_dir, 'BII-I-1')
+        with open(os.path.join(json_dir, 'BII-I-1.json')) as json_fp:
+            json2isatab.convert(json_fp, self._tmp_dir, validate_first=False, datafile_staging='symlink')
+        data_files = [f for f in os.listdir(json_dir) if not f.endswith('.json') and os.path.isfile(
+            os.path.join(json_dir, f)) and not (f.endswith('.txt') and f[:2] in ('i_', 's_', 'a_'))]
+        for data_file in data_files:
+            self.assertTrue(os.path.islink(os.path.join(self._tmp_dir, data_file)))
+            self.assertTrue(os.path.samefile(os.path.join(self._tmp_dir, data_file), os.path.join(json_dir, data_file)))
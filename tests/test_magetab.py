@@ -1,8 +1,9 @@
 import unittest
 from isatools.tests.utils import MAGETAB_DATA_DIR
 import os
+from io import StringIO
 from isatools.magetab import MageTabParser
-from isatools.model import Investigation
+from isatools.model import Assay, Investigation, OntologyAnnotation
 
 """ Unit tests for MAGE-TAB package - only for sanity check, not comprehensive testing """
 
@@ -73,3 +74,31 @@ class WhenParsedIDF(unittest.TestCase):
     def test_should_load_assay_with_transcription_micro(self):
         self.assertEqual(self.parser.ISA.studies[-1].assays[-1].measurement_type.term, "transcription profiling")
         self.assertEqual(self.parser.ISA.studies[-1].assays[-1].technology_type.term, "DNA microarray")
+
+
+class WhenSplittingAssay(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = MageTabParser()
+        self.parser.ISA.studies[-1].assays = [Assay(measurement_type=OntologyAnnotation(term='transcription profiling'),
+                                                    technology_type=OntologyAnnotation(term='DNA microarray'),
+                                                    filename='a_assay.txt')]
+        self.assay_fp = StringIO('Sample Name\tExtract Name\tMaterial Type\tHybridization Assay Name\n'
+                                 's1\te1\ttotal RNA\th1\n'
+                                 's2\te2\tpolyA RNA\th2\n'
+                                 's3\te3\tprotein\th3\n')
+
+    def test_should_split_by_material(self):
+        assay_files = self.parser.split_assay(self.assay_fp)
+        self.assertEqual([x.filename for x in self.parser.ISA.studies[-1].assays],
+                         ['a_assay-transcription profiling by array.txt'])
+        self.assertEqual(assay_files[0].read(), 'Sample Name\tExtract Name\tMaterial Type\tHybridization Assay Name\n'
+                                                's1\te1\ttotal RNA\th1\n'
+                                                's2\te2\tpolyA RNA\th2\n')
+
+    def test_should_keep_unmatched_assay(self):
+        self.assay_fp = StringIO('Sample Name\tExtract Name\tMaterial Type\tHybridization Assay Name\n'
+                                 's3\te3\tprotein\th3\n')
+        assay_files = self.parser.split_assay(self.assay_fp)
+        self.assertEqual([x.name for x in assay_files], ['a_assay.txt'])
+        self.assertEqual(len(assay_files[0].readlines()), 2)
@@ -1,4 +1,5 @@
 import unittest
+import io
 from isatools.tests import utils
 from isatools import sampletab
 import os
@@ -249,3 +250,35 @@ Sample Name	Sample Accession	Sample Description	Derived From	Group Name	Group Ac
         self.assertIn("""sample1	S1	A sample""", sampletab_dump)
         self.assertIn("""sample2	S2	Another sample	S1""", sampletab_dump)
         self.assertIn("""sample3	S3	Another sample	S1""", sampletab_dump)
+
+    def test_sampletab_dump_load_units_round_trip(self):
+        ISA = Investigation(identifier="TEST-889")
+        efo = OntologySource(name="EFO", file="http://www.ebi.ac.uk/efo/")
+        ISA.ontology_source_references = [efo]
+        study = Study(filename="s_TEST-889.txt")
+        sample_accession_charac = OntologyAnnotation("Sample Accession")
+        age_charac = OntologyAnnotation("age")
+        sex_charac = OntologyAnnotation("sex")
+        year = OntologyAnnotation(term="year", term_source=efo, term_accession="UO_0000036")
+        study.sources = [Source(name="source1", characteristics=[
+            Characteristic(category=sample_accession_charac, value="S1")])]
+        # the first sample's age has no unit, yet the unit columns must follow Characteristic[age]
+        study.samples = [Sample(name="sample{}".format(i), characteristics=[
+            Characteristic(category=sample_accession_charac, value="S{}".format(i)),
+            Characteristic(category=age_charac, value="unknown" if i == 2 else i, unit=None if i == 2 else year),
+            Characteristic(category=sex_charac, value="female")],
+                                derives_from=[study.sources[0]]) for i in range(2, 5)]
+        ISA.studies = [study]
+        sampletab_dump = sampletab.dumps(ISA)
+        self.assertIn("Characteristic[age]\tUnit\tTerm Source REF\tTerm Source ID\tCharacteristic[sex]", sampletab_dump)
+        self.assertIn("sample3\tS3\t\tS1\t\t\t3\tyear\tEFO\tUO_0000036\tfemale", sampletab_dump)
+        ISA = sampletab.load(io.StringIO(sampletab_dump))
+        samples = dict((s.name, s) for s in ISA.studies[0].samples)
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(len(ISA.studies[0].sources), 1)
+        self.assertEqual(len(ISA.studies[0].process_sequence), 1)
+        self.assertEqual(len(ISA.studies[0].process_sequence[0].outputs), 3)
+        age = [c for c in samples["sample4"].characteristics if c.category.term == "age"][0]
+        self.assertEqual(str(age.value), "4")
+        self.assertEqual(age.unit.term, "year")
+        self.assertEqual(age.unit.term_source.name, "EFO")
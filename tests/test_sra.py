@@ -212,4 +212,81 @@ class TestSraExport(unittest.TestCase):
             actual_project_set_xml_obj = etree.fromstring(out_fp.read())
             self.assertTrue(
                 utils.assert_xml_equal(self._expected_project_set_xml_obj,
-                                       actual_project_set_xml_obj))
\ No newline at end of file
+                                       actual_project_set_xml_obj))
+
+
+class TestDatafileHashes(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        for filename, content in [('1.fastq', b''), ('2.fastq', b'ACGT' * 100000)]:
+            with open(os.path.join(self._tmp_dir, filename), 'wb') as fp:
+                fp.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def test_hash_datafiles_several_digests(self):
+        datafilehashes = sra.hash_datafiles(
+            self._tmp_dir, ['1.fastq', '2.fastq'], algorithms=('md5', 'sha256'), workers=2, block_size=4096)
+        self.assertEqual(datafilehashes['1.fastq']['md5'], 'd41d8cd98f00b204e9800998ecf8427e')
+        self.assertEqual(datafilehashes['1.fastq']['sha256'],
+                         'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
+        self.assertEqual(datafilehashes['2.fastq'], sra.hash_file(os.path.join(self._tmp_dir, '2.fastq'),
+                                                                  algorithms=('md5', 'sha256')))
+
+    def test_hash_datafiles_cache(self):
+        sra.hash_datafiles(self._tmp_dir, ['1.fastq', '2.fastq'], cache=True)
+        cache_path = os.path.join(self._tmp_dir, sra.DEFAULT_HASH_CACHE_FILENAME)
+        self.assertTrue(os.path.isfile(cache_path))
+        cache = sra.DatafileHashCache(cache_path)
+        self.assertEqual(len(cache), 2)
+        filepath = os.path.join(self._tmp_dir, '2.fastq')
+        self.assertIsNotNone(cache.get(filepath, os.stat(filepath), ('md5',)))
+        self.assertIsNone(cache.get(filepath, os.stat(filepath), ('md5', 'sha1')))
+        with open(filepath, 'ab') as fp:
+            fp.write(b'ACGT')
+        self.assertIsNone(cache.get(filepath, os.stat(filepath), ('md5',)))
+        datafilehashes = sra.create_datafile_hashes(self._tmp_dir, ['2.fastq'], cache=cache)
+        self.assertEqual(datafilehashes['2.fastq'], sra.hash_file(filepath)['md5'])
+        self.assertEqual(cache.get(filepath, os.stat(filepath), ('md5',))['md5'], datafilehashes['2.fastq'])
+
+
+class TestWriteSraXml(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def test_get_sra_schema_is_cached(self):
+        self.assertIs(sra.get_sra_schema('SRA.run.xsd'), sra.get_sra_schema('SRA.run.xsd'))
+
+    def test_write_sra_xml(self):
+        assays_to_export = [
+            {'run_alias': 'S1:assay:run{}'.format(i), 'exp_alias': 'S1:generic_assay:run{}'.format(i),
+             'data_files': [{'filename': 'run{}.fastq.gz'.format(i), 'filetype': 'fastq',
+                             'checksum': '00000000000000000000000000000000'}]}
+            for i in range(3)]
+        path = os.path.join(self._tmp_dir, 'run_set.xml')
+        with self.assertLogs('isatools', level='ERROR') as cm:
+            sra.write_sra_xml(path, 'run_set.xml', 'SRA.run.xsd', assays_to_export=assays_to_export,
+                              sra_center_name='OXFORD', sra_broker_name='ISAcreator')
+            sra.log.error('end')
+        self.assertEqual(len(cm.output), 1)  # no schema validation errors
+        with open(path) as fp:
+            lines = fp.read().split('\n')
+        self.assertEqual(lines[0], '<?xml version="1.0" ?>')
+        self.assertTrue(lines[1].startswith('<RUN_SET '))
+        self.assertEqual(lines[2], '\t<RUN alias="S1:assay:run0" center_name="OXFORD" broker_name="ISAcreator">')
+        self.assertEqual(lines[-3:], ['</RUN_SET>', '', ''])
+        with open(path, 'rb') as fp:
+            self.assertEqual(len(etree.parse(fp).getroot().findall('RUN')), 3)
+
+    def test_write_sra_xml_invalid(self):
+        path = os.path.join(self._tmp_dir, 'run_set.xml')
+        with self.assertLogs('isatools', level='ERROR') as cm:
+            sra.write_sra_xml(path, 'run_set.xml', 'SRA.run.xsd', assays_to_export=[],
+                              sra_center_name='OXFORD', sra_broker_name='ISAcreator')
+        self.assertIn('Schema validation failed', cm.output[0])
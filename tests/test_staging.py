@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import tempfile
+from isatools.io import staging
+
+
+class TestStager(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        self._source_dir = os.path.join(self._tmp_dir, 'source')
+        self._target_dir = os.path.join(self._tmp_dir, 'target')
+        os.makedirs(self._source_dir)
+        os.makedirs(self._target_dir)
+        self._source_file = os.path.join(self._source_dir, 'file1.raw')
+        with open(self._source_file, 'w') as fp:
+            fp.write('spectra')
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def _read(self, path):
+        with open(path) as fp:
+            return fp.read()
+
+    def test_copy(self):
+        with staging.Stager(self._target_dir) as stager:
+            target = stager.stage(self._source_file)
+        self.assertEqual(target, os.path.join(self._target_dir, 'file1.raw'))
+        self.assertEqual(self._read(target), 'spectra')
+        self.assertFalse(os.path.samefile(target, self._source_file))
+
+    def test_hardlink(self):
+        with staging.Stager(self._target_dir, mode='hardlink') as stager:
+            target = stager.stage(self._source_file)
+        self.assertTrue(os.path.samefile(target, self._source_file))
+
+    def test_symlink(self):
+        with staging.Stager(self._target_dir, mode='symlink') as stager:
+            target = stager.stage(self._source_file)
+        self.assertTrue(os.path.islink(target))
+        self.assertEqual(os.readlink(target), os.path.abspath(self._source_file))
+
+    def test_reflink_or_copy(self):
+        # falls back to a copy where the filesystem cannot clone files
+        with staging.Stager(self._target_dir, mode='reflink') as stager:
+            target = stager.stage(self._source_file)
+        self.assertFalse(os.path.islink(target))
+        self.assertEqual(self._read(target), 'spectra')
+
+    def test_manifest(self):
+        with staging.Stager(self._target_dir, mode='manifest') as stager:
+            self.assertEqual(stager.stage(self._source_file), self._source_file)
+        self.assertFalse(os.path.exists(os.path.join(self._target_dir, 'file1.raw')))
+        self.assertEqual(self._read(os.path.join(self._target_dir, staging.MANIFEST_FILENAME)),
+                         'Name\tPath\nfile1.raw\t{}\n'.format(os.path.abspath(self._source_file)))
+
+    def test_copy_over_link_keeps_source(self):
+        with staging.Stager(self._target_dir, mode='hardlink') as stager:
+            stager.stage(self._source_file)
+        with open(self._source_file, 'w') as fp:
+            fp.write('new spectra')
+        with staging.Stager(self._target_dir) as stager:
+            target = stager.stage(self._source_file)
+        self.assertFalse(os.path.samefile(target, self._source_file))
+        self.assertEqual(self._read(self._source_file), 'new spectra')
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            staging.Stager(self._target_dir, mode='move')
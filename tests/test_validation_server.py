@@ -0,0 +1,86 @@
+import unittest
+import json
+import os
+import threading
+from http.client import HTTPConnection
+from isatools import isatab
+from isatools import validation_server
+from isatools.tests import utils
+
+
+def setUpModule():
+    if not os.path.exists(utils.DATA_DIR):
+        raise FileNotFoundError("Could not fine test data directory in {0}. Ensure you have cloned the ISAdatasets "
+                                "repository using "
+                                "git clone -b tests --single-branch git@github.com:ISA-tools/ISAdatasets {0}"
+                                .format(utils.DATA_DIR))
+
+
+class TestValidationServer(unittest.TestCase):
+
+    def setUp(self):
+        self._tab_data_dir = utils.TAB_DATA_DIR
+        self.server = validation_server.ValidationServer(('127.0.0.1', 0), workers=2)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _request(self, method, path, body=None):
+        connection = HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            return response.status, json.loads(response.read().decode('utf-8'))
+        finally:
+            connection.close()
+
+    def test_validate_isatab(self):
+        path = os.path.join(self._tab_data_dir, 'BII-I-1')
+        events = list(validation_server.iter_server_validate(path, port=self.port))
+        self.assertEqual(events[0]['event'], 'accepted')
+        self.assertEqual(events[-1]['event'], 'report')
+        self.assertTrue(all(e['event'] == 'progress' for e in events[1:-1]))
+        self.assertGreater(len(events), 2)
+        with open(os.path.join(path, 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp)
+        self.assertEqual(events[-1]['report']['errors'], report['errors'])
+        self.assertEqual(events[-1]['report']['warnings'], report['warnings'])
+
+    def test_validate_isatab_replays_cache(self):
+        path = os.path.join(self._tab_data_dir, 'BII-I-1')
+        list(validation_server.iter_server_validate(path, port=self.port))
+        events = list(validation_server.iter_server_validate(path, port=self.port))
+        self.assertTrue(any(e['record']['cached'] for e in events if e['event'] == 'progress'))
+        self.assertGreater(self.server.status()['cache']['hits'], 0)
+
+    def test_validate_without_progress(self):
+        job = {"path": os.path.join(self._tab_data_dir, 'BII-I-1'), "progress": False}
+        status, body = self._request('POST', '/validate', json.dumps(job).encode('utf-8'))
+        self.assertEqual(status, 200)
+        self.assertTrue(body['filename'].endswith('i_investigation.txt'))
+        self.assertTrue(body['report']['validation_finished'])
+
+    def test_bad_job(self):
+        status, body = self._request('POST', '/validate', b'{"path": 1}')
+        self.assertEqual(status, 400)
+        status, body = self._request('POST', '/validate', b'{"path": "x", "format": "magetab"}')
+        self.assertEqual(status, 400)
+        with self.assertRaises(ValueError):
+            list(validation_server.iter_server_validate('x', port=self.port, bogus=True))
+
+    def test_missing_path(self):
+        events = list(validation_server.iter_server_validate(
+            os.path.join(self._tab_data_dir, 'missing'), port=self.port))
+        self.assertEqual(events[-1]['event'], 'error')
+
+    def test_status(self):
+        status, body = self._request('GET', '/status')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['workers'], 2)
+        self.assertEqual(body['running'], 0)
+        self.assertIn('cache', body)
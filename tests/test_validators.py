@@ -263,6 +263,26 @@ class TestValidateIsaJson(unittest.TestCase):
                     "Validation error missing when should report error - data has incorrectly reported everything is "
                     "OK but not reported PATO as being unused")
 
+    def test_validate_isajson_does_not_leak_log_handlers(self):
+        isa_log = logging.getLogger('isatools')
+        num_handlers = len(isa_log.handlers)
+        for _ in range(3):
+            with open(os.path.join(self._unit_json_data_dir, 'invalid.json')) as fp:
+                report = isajson.validate(fp)
+        self.assertEqual(len(isa_log.handlers), num_handlers)
+        self.assertIn('(F) There was an error when trying to parse the JSON', report['log'])
+
+    def test_validate_isajson_concurrent_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def validate_file(filename):
+            with open(os.path.join(self._unit_json_data_dir, filename)) as fp:
+                return isajson.validate(fp)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ok_report, fail_report = executor.map(validate_file, ['minimal_syntax.json', 'invalid_isajson.json'])
+        self.assertNotIn(3, [e['code'] for e in ok_report['errors']])
+        self.assertIn(3, [e['code'] for e in fail_report['errors']])
+
     def test_validate_isajson_load_config(self):
         """Tests against 4001"""
         try:
@@ -304,6 +324,23 @@ class TestValidateIsaJson(unittest.TestCase):
                 self.fail("Validation passed against transcription_seq.json configuration, when it should have failed")
 
 
+class TestIsaJsonSchemaValidatorCache(unittest.TestCase):
+
+    def setUp(self):
+        self._investigation_schema_path = os.path.join(
+            isajson.BASE_DIR, 'resources', 'schemas', 'isa_model_version_1_0_schemas', 'core',
+            'investigation_schema.json')
+
+    def test_get_schema_validator_is_cached(self):
+        validator = isajson.get_schema_validator(self._investigation_schema_path)
+        self.assertIs(validator, isajson.get_schema_validator(self._investigation_schema_path))
+
+    def test_get_schema_validator_resolves_refs_from_store(self):
+        validator = isajson.get_schema_validator(self._investigation_schema_path)
+        self.assertTrue(validator.is_valid({'studies': [{'assays': [{'filename': 'a_assay.txt'}]}]}))
+        self.assertFalse(validator.is_valid({'studies': [{'assays': [{'filename': 1}]}]}))
+
+
 class TestValidateIsaTab(unittest.TestCase):
 
     def setUp(self):
@@ -337,6 +374,252 @@ class TestValidateIsaTab(unittest.TestCase):
                 self.fail("Validation error and warnings are missing when should report some with BII-S-7")
 
 
+    def test_validate_isatab_does_not_leak_log_handlers(self):
+        isa_log = logging.getLogger('isatools')
+        num_handlers = len(isa_log.handlers)
+        for _ in range(3):
+            with open(os.path.join(self._tab_data_dir, 'BII-S-3', 'i_gilbert.txt')) as fp:
+                report = isatab.validate(fp, log_level=logging.WARNING)
+        self.assertEqual(len(isa_log.handlers), num_handlers)
+        self.assertTrue(len(report['log']) > 0)
+
+    def test_validate_isatab_concurrent_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def validate_bii_i_1(_):
+            with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+                return isatab.validate(fp)
+        expected = validate_bii_i_1(None)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            reports = list(executor.map(validate_bii_i_1, range(4)))
+        for report in reports:
+            self.assertListEqual(report['errors'], expected['errors'])
+            self.assertListEqual(report['warnings'], expected['warnings'])
+
+    def test_validate_isatab_with_cache(self):
+        from isatools.validation import ValidationCache
+        cache = ValidationCache()
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            expected = isatab.validate(fp, cache=cache)
+        self.assertEqual(cache.hits, 0)
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp, cache=cache)
+        self.assertEqual(cache.hits, cache.misses)
+        self.assertListEqual(report['errors'], expected['errors'])
+        self.assertListEqual(report['warnings'], expected['warnings'])
+        self.assertListEqual(report['info'], expected['info'])
+        self.assertListEqual(report['log'], expected['log'])
+
+    def test_validate_isatab_with_cache_reruns_rules_on_changed_files(self):
+        from isatools.validation import ValidationCache
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tab_dir = os.path.join(tmp_dir, 'BII-I-1')
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), tab_dir)
+            cache = ValidationCache(max_entries=100)
+            with open(os.path.join(tab_dir, 'i_investigation.txt')) as fp:
+                isatab.validate(fp, cache=cache)
+            num_rules = cache.misses
+            with open(os.path.join(tab_dir, 'a_proteome.txt'), 'a') as fp:
+                fp.write('\n')
+            with open(os.path.join(tab_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, cache=cache)
+            self.assertTrue(report['validation_finished'])
+            self.assertTrue(0 < cache.misses - num_rules < num_rules)
+            self.assertLessEqual(len(cache), 100)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validate_isatab_rule_selection(self):
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp, rules=[1003, 'files'], detect_pooling=False)
+        self.assertTrue(report['validation_finished'])
+        for finding in report['errors'] + report['warnings']:
+            self.assertIn(finding['code'], [1003, 5, 6, 8])
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            self.assertRaises(ValueError, isatab.validate, fp, rules=['no such category'])
+
+    def test_validate_isatab_rule_selection_reports_each_code(self):
+        def validate_codes(rules=None):
+            with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, rules=rules, detect_pooling=False)
+            return {finding['code'] for finding in report['errors'] + report['warnings'] + report['info']}
+        codes = validate_codes()
+        self.assertIn(1007, codes)
+        for code in codes:
+            self.assertIn(code, validate_codes(rules=[code]), "rule {} not reported when selected".format(code))
+
+    def test_validate_isatab_max_errors(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tab_dir = os.path.join(tmp_dir, 'BII-I-1')
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), tab_dir)
+            os.remove(os.path.join(tab_dir, 'a_proteome.txt'))
+            with open(os.path.join(tab_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, max_errors=1)
+            self.assertFalse(report['validation_finished'])
+            self.assertGreaterEqual(len(report['errors']), 1)
+            self.assertListEqual(report['info'], [])  # no table was checked
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validate_isatab_max_errors_on_invalid_table(self):
+        import csv
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tab_dir = os.path.join(tmp_dir, 'BII-I-1')
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), tab_dir)
+            with open(os.path.join(tab_dir, 's_BII-S-1.txt'), newline='') as fp:
+                rows = list(csv.reader(fp, delimiter='\t'))
+            for row in rows[1:]:
+                for j, label in enumerate(rows[0]):
+                    row[j] = 'undeclared protocol' if label.startswith('Protocol REF') else ''
+            with open(os.path.join(tab_dir, 's_BII-S-1.txt'), 'w', newline='') as fp:
+                csv.writer(fp, delimiter='\t', quoting=csv.QUOTE_ALL).writerows(rows)
+            with open(os.path.join(tab_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp, max_errors=1)
+            self.assertFalse(report['validation_finished'])
+            self.assertGreaterEqual(len(report['errors']), 1)
+            self.assertLessEqual(len(report['errors']), 2)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validation_context_call_stops_at_max_errors(self):
+        from isatools.validation import ValidationContext, StopValidation
+
+        def check_cell(ctx=None):
+            ctx.errors.append({"message": "Invalid cell", "supplemental": "", "code": 4011})
+
+        def check_table(ctx=None):
+            for _ in range(10):
+                ctx.call(check_cell)
+
+        ctx = ValidationContext(max_errors=2)
+        self.assertRaises(StopValidation, ctx.run, check_table)
+        self.assertEqual(len(ctx.errors), 2)
+
+    def test_validate_isatab_table_not_utf8(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tab_dir = os.path.join(tmp_dir, 'BII-I-1')
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), tab_dir)
+            with open(os.path.join(tab_dir, 's_BII-S-1.txt'), 'ab') as fp:
+                fp.write(b'caf\xe9\n')
+            with open(os.path.join(tab_dir, 'i_investigation.txt')) as fp:
+                report = isatab.validate(fp)
+            encoding_warnings = [w for w in report['warnings'] if w['code'] == 10]
+            self.assertEqual(len(encoding_warnings), 1)
+            self.assertIn('In file s_BII-S-1.txt', encoding_warnings[0]['supplemental'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_validate_isatab_investigation_not_utf8(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            tab_dir = os.path.join(tmp_dir, 'BII-I-1')
+            shutil.copytree(os.path.join(self._tab_data_dir, 'BII-I-1'), tab_dir)
+            with open(os.path.join(tab_dir, 'i_investigation.txt'), 'ab') as fp:
+                fp.write(b'# caf\xe9\n')
+            for encoding in ('latin-1', 'utf-8'):
+                with open(os.path.join(tab_dir, 'i_investigation.txt'), encoding=encoding) as fp:
+                    report = isatab.validate(fp)
+                self.assertTrue(report['validation_finished'])
+                self.assertListEqual([e for e in report['errors'] if e['code'] == 0], [])
+                encoding_warnings = [w for w in report['warnings'] if w['code'] == 10]
+                self.assertEqual(len(encoding_warnings), 1)
+                self.assertIn('Invalid UTF-8 byte sequence', encoding_warnings[0]['supplemental'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_check_encoding(self):
+        from io import BytesIO
+        from isatools import validation
+        check = validation.check_encoding(BytesIO('a\nbé\n'.encode('utf-8')), block_size=3)
+        self.assertTrue(check.valid)
+        check = validation.check_encoding(BytesIO(b'a\nb\xe9\nc'), block_size=3)
+        self.assertFalse(check.valid)
+        self.assertEqual((check.offset, check.line), (3, 2))
+        text_fp, check = validation.read_text(BytesIO(b'a\r\nb\xe9\n'))
+        self.assertFalse(check.valid)
+        self.assertEqual(text_fp.read(), 'a\nbé\n')
+
+    def test_validate_isatab_profile(self):
+        records = []
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp, profile=True, hooks=[records.append])
+        self.assertListEqual(report['profile'], records)
+        rules = [record['rule'] for record in records]
+        self.assertIn('load_investigation', rules)
+        self.assertIn('check_study_table', rules)
+        self.assertIn('check_field_values', rules)
+        study_table = records[rules.index('check_study_table')]
+        self.assertGreater(study_table['rows'], 0)
+        self.assertGreater(study_table['cells'], 0)
+        self.assertIn('s_BII-S-1.txt', study_table['files'])
+        self.assertGreater(records[rules.index('load_investigation')]['bytes_read'], 0)
+
+    def test_validate_isatab_no_profile_by_default(self):
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp)
+        self.assertNotIn('profile', report)
+
+    def test_validate_isatab_check_data_files_exist(self):
+        """Tests against 0011"""
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp)
+        self.assertNotIn(11, [w['code'] for w in report['warnings']])
+        with open(os.path.join(self._tab_data_dir, 'BII-I-1', 'i_investigation.txt')) as fp:
+            report = isatab.validate(fp, check_data_files_exist=True)
+        self.assertIn(11, [w['code'] for w in report['warnings']])
+
+    def test_get_table_parses_each_table_once_per_run(self):
+        from isatools.validation import ValidationContext
+        ctx = ValidationContext()
+        dir_context = os.path.join(self._tab_data_dir, 'BII-I-1')
+        study_df = isatab.get_table(dir_context, 's_BII-S-1.txt', ctx=ctx)
+        self.assertIs(study_df, isatab.get_table(dir_context, 's_BII-S-1.txt', ctx=ctx))
+        self.assertIsNot(study_df, isatab.get_table(dir_context, 's_BII-S-1.txt', ctx=ValidationContext()))
+        with self.assertRaises(FileNotFoundError):
+            isatab.get_table(dir_context, 's_missing.txt', ctx=ctx)
+        with self.assertRaises(FileNotFoundError):
+            isatab.get_table(dir_context, 's_missing.txt', ctx=ctx)
+
+
+class TestIsaTabColumnChecks(unittest.TestCase):
+
+    def setUp(self):
+        from isatools.io import isatab_configurator
+        configs = isatab_configurator.load(isatab.default_config_dir)
+        self._config = configs[('protein-dna binding site identification', 'nucleotide sequencing')]
+
+    def test_check_field_values_reports_up_to_first_invalid_cell(self):
+        import pandas as pd
+        from isatools.validation import ValidationContext
+        table = pd.DataFrame([['SINGLE', '1.5'], ['PAIRED', 'x'], ['DOUBLE', 'y']],
+                             columns=['Parameter Value[library layout]', 'Parameter Value[DNA fragment size]'])
+        table.filename = 'a_test.txt'
+        ctx = ValidationContext()
+        self.assertFalse(isatab.check_field_values(table, self._config, ctx=ctx))
+        self.assertListEqual([w['supplemental'] for w in ctx.warnings],
+                             ["Invalid value 'x' for type 'double' of the field "
+                              "'Parameter Value[DNA fragment size]'"])
+
+    def test_check_field_values_valid_columns(self):
+        import pandas as pd
+        from isatools.validation import ValidationContext
+        table = pd.DataFrame([['single', '1.5'], ['PAIRED', ' 2 '], ['', '']],
+                             columns=['Parameter Value[library layout]', 'Parameter Value[DNA fragment size]'])
+        table.filename = 'a_test.txt'
+        ctx = ValidationContext()
+        self.assertTrue(isatab.check_field_values(table, self._config, ctx=ctx))
+        self.assertListEqual(ctx.warnings, [])
+
+    def test_column_has_value(self):
+        import pandas as pd
+        column = pd.Series(['x', '', ' ', 'Unnamed: 2', float('nan')])
+        self.assertListEqual(list(isatab.column_has_value(column)), [isatab.cell_has_value(c) for c in column])
+
+
 class TestStudyGroupsValidationIsaTab(unittest.TestCase):
 
     def setUp(self):
@@ -458,6 +741,15 @@ class TestBatchValidateIsaTab(unittest.TestCase):
         batch_report = isatab.batch_validate(self._bii_tab_dir_list)
         self.assertTrue(len([f['filename'] for f in batch_report['batch_report']]) == len(self._bii_tab_dir_list))
 
+    def test_batch_validate_bii_in_process_pool(self):
+        batch_report = isatab.batch_validate(self._bii_tab_dir_list, workers=2)
+        self.assertListEqual([os.path.dirname(f['filename']) for f in batch_report['batch_report']],
+                             self._bii_tab_dir_list)
+
+    def test_iter_batch_validate_bii_in_process_pool(self):
+        entries = list(isatab.iter_batch_validate(self._bii_tab_dir_list, workers=2))
+        self.assertEqual(len(entries), len(self._bii_tab_dir_list))
+
 
 class TestBatchValidateIsaJson(unittest.TestCase):
 
@@ -476,3 +768,11 @@ class TestBatchValidateIsaJson(unittest.TestCase):
     def test_batch_validate_bii(self):
         batch_report = isajson.batch_validate(self._bii_json_files)
         self.assertListEqual([f['filename'] for f in batch_report['batch_report']], self._bii_json_files)
+
+    def test_batch_validate_bii_in_process_pool(self):
+        batch_report = isajson.batch_validate(self._bii_json_files, workers=2)
+        self.assertListEqual([f['filename'] for f in batch_report['batch_report']], self._bii_json_files)
+
+    def test_iter_batch_validate_bii_in_process_pool(self):
+        entries = list(isajson.iter_batch_validate(self._bii_json_files, workers=2))
+        self.assertListEqual(sorted(f['filename'] for f in entries), sorted(self._bii_json_files))
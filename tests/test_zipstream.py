@@ -0,0 +1,108 @@
+import unittest
+import io
+import os
+import pathlib
+import random
+import shutil
+import tempfile
+import zlib
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+from isatools.io import zipstream
+
+
+class _Pipe(io.RawIOBase):
+    """A writable stream that cannot seek or tell, like a pipe"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.data += b
+        return len(b)
+
+
+class TestZipStreamWriter(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp_dir = tempfile.mkdtemp()
+        rng = random.Random(0)
+        self._files = dict()
+        for name, size in (('empty.txt', 0), ('small.txt', 10), ('seq.fastq', 300000)):
+            data = ''.join(rng.choice('ACGT\n') for _ in range(size)).encode('ascii')
+            self._files[name] = data
+            with open(os.path.join(self._tmp_dir, name), 'wb') as fp:
+                fp.write(data)
+        self._files['run1.raw'] = bytes(rng.getrandbits(8) for _ in range(200000))
+        with open(os.path.join(self._tmp_dir, 'run1.raw'), 'wb') as fp:
+            fp.write(self._files['run1.raw'])
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp_dir)
+
+    def _members(self):
+        return [(os.path.join(self._tmp_dir, name), 'data/' + name,
+                 ZIP_STORED if name.endswith('.raw') else ZIP_DEFLATED) for name in sorted(self._files)]
+
+    def test_crc32_combine(self):
+        a, b = b'ISA-Tab ' * 1000, b'ISA-JSON' * 3
+        self.assertEqual(zipstream.crc32_combine(zlib.crc32(a), zlib.crc32(b), len(b)), zlib.crc32(a + b))
+        self.assertEqual(zipstream.crc32_combine(zlib.crc32(a), zlib.crc32(b''), 0), zlib.crc32(a))
+
+    def test_write_files(self):
+        target = os.path.join(self._tmp_dir, 'isatab.zip')
+        with zipstream.ZipStreamWriter(target, workers=3, chunk_size=1 << 16) as zip_stream:
+            zip_stream.write_files(self._members())
+        self.assertEqual(zip_stream.namelist(), [m[1] for m in self._members()])
+        with ZipFile(target) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            for path, arcname, compress_type in self._members():
+                self.assertEqual(zip_file.read(arcname), self._files[os.path.basename(path)])
+                self.assertEqual(zip_file.getinfo(arcname).compress_type, compress_type)
+            self.assertLess(zip_file.getinfo('data/seq.fastq').compress_size, 300000)
+
+    def test_write_files_to_path_like(self):
+        target = pathlib.Path(self._tmp_dir, 'isatab.zip')
+        with zipstream.ZipStreamWriter(target) as zip_stream:
+            zip_stream.write_files(self._members())
+        with ZipFile(str(target)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(len(zip_file.namelist()), 4)
+        with self.assertRaises(FileNotFoundError):
+            with zipstream.ZipStreamWriter(target) as zip_stream:
+                zip_stream.write_files([(os.path.join(self._tmp_dir, 'missing.txt'), 'missing.txt', ZIP_DEFLATED)])
+        self.assertFalse(target.exists())
+
+    def test_write_files_to_pipe(self):
+        pipe = _Pipe()
+        with zipstream.ZipStreamWriter(pipe, workers=2, chunk_size=1 << 16) as zip_stream:
+            zip_stream.write_files(self._members()[:2])
+            zip_stream.write_files(self._members()[2:])
+        self.assertFalse(pipe.closed)
+        with ZipFile(io.BytesIO(bytes(pipe.data))) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(len(zip_file.namelist()), 4)
+
+    def test_duplicate_members_skipped(self):
+        target = os.path.join(self._tmp_dir, 'isatab.zip')
+        with zipstream.ZipStreamWriter(target) as zip_stream:
+            zip_stream.write_files(self._members() + self._members()[:1])
+        with ZipFile(target) as zip_file:
+            self.assertEqual(len(zip_file.namelist()), 4)
+
+    def test_failed_write_removes_archive(self):
+        target = os.path.join(self._tmp_dir, 'isatab.zip')
+        members = self._members() + [(os.path.join(self._tmp_dir, 'missing.txt'), 'data/missing.txt', ZIP_DEFLATED)]
+        with self.assertRaises(FileNotFoundError):
+            with zipstream.ZipStreamWriter(target, chunk_size=1 << 16) as zip_stream:
+                zip_stream.write_files(members)
+        self.assertFalse(os.path.exists(target))
+
+    def test_failed_write_to_pipe_leaves_pipe_open(self):
+        pipe = _Pipe()
+        with self.assertRaises(FileNotFoundError):
+            with zipstream.ZipStreamWriter(pipe) as zip_stream:
+                zip_stream.write_files([(os.path.join(self._tmp_dir, 'missing.txt'), 'missing.txt', ZIP_DEFLATED)])
+        self.assertFalse(pipe.closed)